@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Backfill topic/difficulty onto existing user_answers documents.
+
+Answers written before topic and difficulty were stamped at write time only
+carry a question_id. This script copies both fields from each question onto
+its answers with one update_many per question, so the analytics pipelines can
+group on user_answers directly. It is safe to re-run: only answers that are
+still missing the fields (or whose question changed) are touched.
+"""
+
+import argparse
+import asyncio
+from database.mongo import questions_collection, user_answers_collection
+
+async def backfill_answer_metadata(dry_run: bool = False) -> int:
+    """Stamp topic/difficulty from every question onto its answers"""
+    updated = 0
+    cursor = questions_collection.find({}, {"topic": 1, "difficulty": 1})
+
+    async for question in cursor:
+        if not question.get("topic") or not question.get("difficulty"):
+            continue
+
+        # Answers reference questions by their string id; older rows may hold the ObjectId
+        answer_filter = {
+            "question_id": {"$in": [question["_id"], str(question["_id"])]},
+            "$or": [
+                {"topic": {"$ne": question["topic"]}},
+                {"difficulty": {"$ne": question["difficulty"]}}
+            ]
+        }
+
+        if dry_run:
+            updated += await user_answers_collection.count_documents(answer_filter)
+            continue
+
+        result = await user_answers_collection.update_many(
+            answer_filter,
+            {"$set": {"topic": question["topic"], "difficulty": question["difficulty"]}}
+        )
+        updated += result.modified_count
+
+    return updated
+
+async def main():
+    """Main function to run the backfill"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Only count the answers that would change")
+    args = parser.parse_args()
+
+    try:
+        updated = await backfill_answer_metadata(dry_run=args.dry_run)
+        if args.dry_run:
+            print(f"ℹ️  {updated} answers would be updated")
+        else:
+            print(f"✅ {updated} answers updated")
+
+        missing = await user_answers_collection.count_documents({"topic": None})
+        if missing:
+            print(f"⚠️  {missing} answers still have no topic (their question no longer exists)")
+    except Exception as e:
+        print(f"❌ Error backfilling answers: {e}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-user vs batched question recommendations.
+
+By default everything runs in memory on synthetic skill states and question
+pools, so it measures the compute side alone: the per-user path (summary and
+threshold rules per learner) against the vectorized batch path. With
+--database it also times both public APIs against the configured MongoDB for
+the learners who already have skill state in --topic, which adds the query
+round trips (one per learner vs one per batch).
+
+    python -m benchmarks.bench_recommendations --users 10000
+    python -m benchmarks.bench_recommendations --database --topic mathematics
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from services.adaptive_logic import EPOCH, adaptive_logic
+from services.question_pool import question_pool_index
+from models.quiz import SkillStateModel
+
+def synthetic_states(users: int, seed: int):
+    """Skill state documents for users learners, shaped like the batch query's output"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    states = []
+    for index in range(users):
+        for difficulty in adaptive_logic.difficulty_levels:
+            if rng.random() < 0.4:
+                continue
+            answered = rng.randint(1, 40)
+            outcomes = [
+                {"is_correct": rng.random() < 0.6, "timestamp": start + timedelta(minutes=rng.randint(0, 100000))}
+                for _ in range(min(answered, adaptive_logic.recent_window))
+            ]
+            outcomes.sort(key=lambda outcome: outcome["timestamp"])
+            states.append(SkillStateModel(
+                f"user-{index}", "benchmark", difficulty,
+                total_answered=answered,
+                correct_count=sum(outcome["is_correct"] for outcome in outcomes),
+                consecutive_correct=rng.randint(0, 5),
+                consecutive_incorrect=rng.randint(0, 3),
+                recent_outcomes=outcomes
+            ).to_dict())
+    return states
+
+def run_in_memory(users: int, questions: int, num_questions: int, seed: int) -> None:
+    states = synthetic_states(users, seed)
+    user_ids = [f"user-{index}" for index in range(users)]
+    for index in range(questions):
+        question_pool_index.add({
+            "_id": ObjectId(),
+            "topic": "benchmark",
+            "difficulty": adaptive_logic.difficulty_levels[index % len(adaptive_logic.difficulty_levels)]
+        })
+
+    # Per-user path: what get_question_recommendations does after its query
+    by_user = {}
+    for state in states:
+        by_user.setdefault(state["user_id"], []).append(state)
+    started = time.perf_counter()
+    single = []
+    for user_id in user_ids:
+        topic_states = {state["difficulty"]: SkillStateModel.from_dict(state) for state in by_user.get(user_id, [])}
+        current = adaptive_logic._summarize_performance(topic_states).get("recent_difficulty", "medium")
+        difficulty = adaptive_logic._next_difficulty(topic_states.get(current), current)
+        question_pool_index.sample("benchmark", difficulty, num_questions, user_id)
+        single.append(difficulty)
+    single_seconds = time.perf_counter() - started
+
+    # Batch path: what get_batch_recommendations does after its query
+    rows = [
+        {**state, "recent_times": [(outcome["timestamp"] - EPOCH) / timedelta(milliseconds=1)
+                                   for outcome in state["recent_outcomes"]]}
+        for state in states
+    ]
+    started = time.perf_counter()
+    difficulties = adaptive_logic._next_difficulties(user_ids, rows)
+    for user_id, difficulty in zip(user_ids, difficulties):
+        question_pool_index.sample("benchmark", difficulty, num_questions, user_id)
+    batch_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for expected, actual in zip(single, difficulties) if expected != actual)
+    print(f"In memory, {users} users, {len(states)} skill states, {questions} questions:")
+    print(f"  per-user: {single_seconds * 1000:8.1f} ms  {users / single_seconds:10.0f} users/s")
+    print(f"  batch:    {batch_seconds * 1000:8.1f} ms  {users / batch_seconds:10.0f} users/s")
+    if mismatches:
+        print(f"❌ {mismatches} users got a different difficulty from the two paths")
+    else:
+        print("✅ Both paths chose the same difficulty for every user")
+
+async def run_database(topic: str, users: int, num_questions: int) -> None:
+    from database.connection import connection_manager
+    from database.mongo import skill_state_collection
+
+    try:
+        await question_pool_index.refresh()
+        user_ids = await skill_state_collection.distinct("user_id", {"topic": topic})
+        user_ids = user_ids[:users]
+        if not user_ids:
+            print(f"⚠️  No skill state for topic '{topic}'")
+            return
+
+        started = time.perf_counter()
+        for user_id in user_ids:
+            await adaptive_logic.get_question_recommendations(user_id, topic, num_questions)
+        single_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await adaptive_logic.get_batch_recommendations(user_ids, topic, num_questions)
+        batch_seconds = time.perf_counter() - started
+
+        print(f"MongoDB, topic '{topic}', {len(user_ids)} users:")
+        print(f"  per-user: {single_seconds * 1000:8.1f} ms  {len(user_ids) / single_seconds:10.0f} users/s")
+        print(f"  batch:    {batch_seconds * 1000:8.1f} ms  {len(user_ids) / batch_seconds:10.0f} users/s")
+    finally:
+        await connection_manager.close()
+
+def main():
+    """Main function to run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000, help="Number of learners")
+    parser.add_argument("--questions", type=int, default=3000, help="Synthetic questions (in-memory run)")
+    parser.add_argument("--num-questions", type=int, default=10, help="Questions recommended per learner")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", action="store_true", help="Also time both APIs against MongoDB")
+    parser.add_argument("--topic", default="mathematics", help="Topic for the --database run")
+    args = parser.parse_args()
+
+    run_in_memory(args.users, args.questions, args.num_questions, args.seed)
+    if args.database:
+        asyncio.run(run_database(args.topic, args.users, args.num_questions))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization: stdlib JSON via jsonable_encoder vs orjson.
+
+Times building the response body of three hot endpoints on synthetic
+payloads shaped like the real ones. "before" is the previous pipeline: the
+route ran jsonable_encoder (ObjectIds to strings), FastAPI encoded the
+returned dict again and JSONResponse rendered it with the json module; for
+login, the route built UserOut/Token models and the response_model
+validated and dumped them once more. "after" renders the trusted dicts
+directly with utils.responses.ORJSONResponse. Both bodies are checked to
+decode to the same JSON.
+
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --days 90 --page-size 100
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from schemas.user import Token, UserOut
+from utils.responses import ORJSONResponse
+
+TOPICS = ["mathematics", "physics", "chemistry", "biology", "history"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+def analytics_payload(rng: random.Random, days: int, recent: int):
+    """A /quiz/analytics body: totals, per-topic/difficulty stats, recent answers and daily trends"""
+    now = datetime.utcnow()
+    return {
+        "total_quizzes": 120,
+        "total_questions_answered": 1200,
+        "average_score": 64.5,
+        "accuracy_rate": 0.645,
+        "topic_performance": [
+            {"_id": topic, "total_questions": 240, "correct_answers": rng.randint(100, 240),
+             "accuracy": rng.random(), "average_time": rng.uniform(5, 60)}
+            for topic in TOPICS
+        ],
+        "difficulty_performance": [
+            {"_id": difficulty, "total_questions": 400, "correct_answers": rng.randint(100, 400),
+             "accuracy": rng.random()}
+            for difficulty in DIFFICULTIES
+        ],
+        "recent_activity": [
+            {"_id": ObjectId(), "question_content": f"Question {index}", "topic": rng.choice(TOPICS),
+             "difficulty": rng.choice(DIFFICULTIES), "is_correct": rng.random() < 0.6,
+             "time_taken": rng.randint(5, 60), "timestamp": now - timedelta(minutes=index * 7)}
+            for index in range(recent)
+        ],
+        "improvement_trends": {
+            "daily_performance": [
+                {"_id": {"date": (now - timedelta(days=day)).strftime("%Y-%m-%d"), "topic": topic},
+                 "total_questions": rng.randint(1, 40), "correct_answers": rng.randint(0, 40),
+                 "accuracy": rng.random(), "average_time": rng.uniform(5, 60)}
+                for day in range(days) for topic in TOPICS
+            ],
+            "overall_trend": "improving"
+        },
+        "section_timings": {
+            name: {"status": "ok", "duration_ms": rng.uniform(1, 20)}
+            for name in ("rollup_facets", "recent_activity")
+        }
+    }
+
+def question_page_payload(rng: random.Random, page_size: int):
+    """A /questions/ page with answers included"""
+    now = datetime.utcnow()
+    return {
+        "questions": [
+            {"id": str(ObjectId()), "content": f"What is question {index}? " * 4,
+             "option_a": "First option", "option_b": "Second option", "option_c": "Third option",
+             "option_d": "Fourth option", "correct_option": rng.choice("ABCD"),
+             "topic": rng.choice(TOPICS), "difficulty": rng.choice(DIFFICULTIES),
+             "explanation": "Because of the reasons given in chapter three.",
+             "created_at": now - timedelta(minutes=index)}
+            for index in range(page_size)
+        ],
+        "next_cursor": str(ObjectId())
+    }
+
+def stored_user():
+    return {"_id": ObjectId(), "name": "Benchmark User", "email": "benchmark@example.com", "role": "student",
+            "created_at": datetime.utcnow(), "updated_at": None, "password_hash": "x" * 60}
+
+def encode_before(payload) -> bytes:
+    encoded = jsonable_encoder(payload, custom_encoder={ObjectId: str})
+    return JSONResponse(jsonable_encoder(encoded)).body
+
+def encode_after(payload) -> bytes:
+    return ORJSONResponse(payload).body
+
+TOKEN = TypeAdapter(Token)
+
+def login_before(user_data) -> bytes:
+    user_out = UserOut(
+        id=str(user_data["_id"]),
+        name=user_data["name"],
+        email=user_data["email"],
+        role=user_data["role"],
+        created_at=user_data["created_at"],
+        updated_at=user_data.get("updated_at")
+    )
+    token = Token(access_token="token", token_type="bearer", user=user_out)
+    # response_model=Token: validate the returned model again, then dump it for JSON
+    validated = TOKEN.validate_python(token, from_attributes=True)
+    return JSONResponse(TOKEN.dump_python(validated, mode="json")).body
+
+def login_after(user_data) -> bytes:
+    return ORJSONResponse({
+        "access_token": "token",
+        "token_type": "bearer",
+        "user": {
+            "id": str(user_data["_id"]),
+            "name": user_data["name"],
+            "email": user_data["email"],
+            "role": user_data["role"],
+            "created_at": user_data["created_at"],
+            "updated_at": user_data.get("updated_at")
+        }
+    }).body
+
+def best_of(function, payload, repeat: int, number: int) -> float:
+    """Fastest mean seconds per call over repeat rounds of number calls"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function(payload)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+def main():
+    """Main function to run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=30, help="Days of trend points in the analytics payload")
+    parser.add_argument("--recent", type=int, default=50, help="Recent answers in the analytics payload")
+    parser.add_argument("--page-size", type=int, default=100, help="Questions per page")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=200, help="Calls per round")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [
+        ("analytics", encode_before, encode_after, analytics_payload(rng, args.days, args.recent)),
+        ("question page", encode_before, encode_after, question_page_payload(rng, args.page_size)),
+        ("login", login_before, login_after, stored_user()),
+    ]
+    print(f"{'payload':<14} {'bytes':>8} {'before':>10} {'after':>10} {'speedup':>8}")
+    for name, before, after, payload in cases:
+        before_body, after_body = before(payload), after(payload)
+        if json.loads(before_body) != json.loads(after_body):
+            print(f"❌ {name}: the two pipelines produce different JSON")
+            continue
+        before_seconds = best_of(before, payload, args.repeat, args.number)
+        after_seconds = best_of(after, payload, args.repeat, args.number)
+        print(f"{name:<14} {len(after_body):>8} {before_seconds * 1e6:>8.1f}µs {after_seconds * 1e6:>8.1f}µs "
+              f"{before_seconds / after_seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass ($facet) vs multi-query user dashboard.
+
+Seeds synthetic answer histories of growing size for throwaway users, then
+times AnalyticsService.get_user_analytics in both modes. Needs a running
+MongoDB (MONGO_URI). The answers also increment the shared daily/hourly topic
+rollups, so everything is written to a scratch database (--database-name)
+that must be empty and is dropped at the end unless --keep-data is given.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_user_analytics --sizes 100,1000,10000 --repeats 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+TOPICS = ["mathematics", "science", "history", "geography", "literature"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+async def seed_user(user_id: str, answers: int, days: int) -> None:
+    """Write a synthetic history for one user through the normal rollup path"""
+    from models.quiz import UserAnswerModel
+
+    now = datetime.utcnow()
+    batch = []
+    for i in range(answers):
+        batch.append(UserAnswerModel(
+            user_id=user_id,
+            quiz_id=f"{user_id}-quiz-{i // 10}",
+            question_id=f"bench-question-{random.randrange(500)}",
+            selected_option=random.choice("ABCD"),
+            is_correct=random.random() < 0.65,
+            time_taken=random.randint(5, 90),
+            timestamp=now - timedelta(days=random.uniform(0, days)),
+            topic=random.choice(TOPICS),
+            difficulty=random.choice(DIFFICULTIES)
+        ))
+        if len(batch) == 1000:
+            await _write(batch)
+            batch = []
+    if batch:
+        await _write(batch)
+
+async def _write(answers) -> None:
+    from database.mongo import user_answers_collection
+    from services.rollups import rollup_service
+
+    await user_answers_collection.insert_many([answer.to_dict() for answer in answers], ordered=False)
+    await rollup_service.record_answers(answers)
+
+async def time_mode(service, user_id: str, repeats: int) -> list:
+    """Wall-clock milliseconds of each get_user_analytics call"""
+    await service.get_user_analytics(user_id)  # warm-up
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await service.get_user_analytics(user_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare $facet and multi-query user analytics")
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="Answers per user, comma separated")
+    parser.add_argument("--days", type=int, default=180, help="Days the synthetic history is spread over")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed calls per mode and size")
+    parser.add_argument("--database-name", default="adaptive_quiz_bench",
+                        help="Scratch database; must be empty, and is dropped afterwards unless --keep-data")
+    parser.add_argument("--keep-data", action="store_true", help="Leave the synthetic data in place")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the scratch database is chosen before the app modules load
+    os.environ["DATABASE_NAME"] = args.database_name
+    from database.connection import connection_manager
+    from database.mongo import daily_user_rollup_collection
+    from services.analytics import AnalyticsService
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    multi_query = AnalyticsService(single_pass=False, section_timeout=60)
+    single_pass = AnalyticsService(single_pass=True, section_timeout=60)
+    user_ids = [f"bench-analytics-{size}" for size in sizes]
+
+    if await connection_manager.db.list_collection_names():
+        print(f"❌ Database '{args.database_name}' is not empty; the benchmark needs a scratch database")
+        await connection_manager.close()
+        sys.exit(2)
+
+    print(f"{'answers/user':>12} {'rollup rows':>11} {'multi p50':>10} {'multi p95':>10} "
+          f"{'facet p50':>10} {'facet p95':>10} {'speedup':>8}")
+    try:
+        for size, user_id in zip(sizes, user_ids):
+            await seed_user(user_id, size, args.days)
+            rows = await daily_user_rollup_collection.count_documents({"user_id": user_id})
+
+            multi = await time_mode(multi_query, user_id, args.repeats)
+            facet = await time_mode(single_pass, user_id, args.repeats)
+
+            print(f"{size:>12} {rows:>11} {statistics.median(multi):>8.2f}ms {percentile(multi, 95):>8.2f}ms "
+                  f"{statistics.median(facet):>8.2f}ms {percentile(facet, 95):>8.2f}ms "
+                  f"{statistics.median(multi) / statistics.median(facet):>7.2f}x")
+    finally:
+        if not args.keep_data:
+            await connection_manager.client.drop_database(args.database_name)
+        await connection_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Reproducible in-process load test of the API.
+
+Boots the FastAPI app inside this process (lifespan included) on an in-memory
+mongomock-motor database, or on a scratch database of a real MongoDB server
+with --backend mongodb, and seeds synthetic users, questions and answer
+history at the requested scale. Virtual users then run a weighted, seeded
+mix of flows concurrently (login, quiz start/answer/submit, teacher batch
+recommendations, user and admin analytics) through httpx's ASGI transport,
+so no server or network sits in between. The report gives throughput and
+p50/p95/p99 latency per endpoint; with --baseline the run is compared to a
+stored report and the exit status is 1 when an endpoint regressed.
+
+    python -m benchmarks.load_test --users 200 --questions 1000 --duration 30
+    python -m benchmarks.load_test --baseline load_test_baseline.json --save-baseline
+    python -m benchmarks.load_test --baseline load_test_baseline.json --tolerance 0.2
+    python -m benchmarks.load_test --backend mongodb --mongo-uri mongodb://localhost:27017
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+PASSWORD = "LoadTest123"
+TOPICS = ["mathematics", "physics", "chemistry", "biology", "history"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+OPTIONS = ["A", "B", "C", "D"]
+DEFAULT_MIX = "login=1,quiz=4,recommendations=1,analytics=2,admin_analytics=0.5"
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """"login=1,quiz=4" -> {"login": 1.0, "quiz": 4.0}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name.strip()}'; choose from {', '.join(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return {name: weight for name, weight in weights.items() if weight > 0}
+
+def install_backend(args) -> None:
+    """Point the app at the chosen database; must run before anything imports the app"""
+    os.environ["ENSURE_INDEXES_ON_STARTUP"] = "True" if args.backend == "mongodb" else "False"
+    os.environ["STORAGE_BACKEND"] = "mongo"
+    if args.backend == "mongodb":
+        os.environ["MONGO_URI"] = args.mongo_uri
+        os.environ["DATABASE_NAME"] = args.database_name
+        return
+
+    try:
+        import mongomock.collection
+        import mongomock_motor
+    except ImportError:
+        print("❌ The in-memory backend needs mongomock-motor (pip install mongomock-motor), "
+              "or use --backend mongodb")
+        sys.exit(2)
+    import database.connection as connection
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    connection.connection_manager.client = connection.client = client
+    connection.connection_manager.db = connection.db = client[args.database_name]
+
+    # mongomock predates two options the app passes through pymongo: the command
+    # comment (used to label queries for /metrics) and UpdateOne's sort
+    def without_comment(method):
+        def call(self, *positional, **options):
+            options.pop("comment", None)
+            return method(self, *positional, **options)
+        return call
+
+    for name in ("find", "find_one", "aggregate", "count_documents", "estimated_document_count", "distinct",
+                 "bulk_write", "insert_one", "insert_many", "update_one", "update_many", "delete_one",
+                 "delete_many", "find_one_and_update"):
+        setattr(mongomock.collection.Collection, name,
+                without_comment(getattr(mongomock.collection.Collection, name)))
+
+    add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+    def add_update_without_sort(self, *positional, sort=None, **options):
+        return add_update(self, *positional, **options)
+
+    mongomock.collection.BulkOperationBuilder.add_update = add_update_without_sort
+
+async def seed(args, rng: random.Random) -> Dict[str, Any]:
+    """Synthetic users, questions and answer history; returns the virtual users' credentials"""
+    from bson import ObjectId
+    from database.mongo import questions_collection, quiz_attempts_collection, user_answers_collection
+    from models.quiz import QuestionModel, QuizAttemptModel, UserAnswerModel
+    from models.user import UserInDB
+    from services.adaptive_logic import adaptive_logic
+    from services.auth_service import users_collection
+    from services.rollups import rollup_service
+    from utils.auth import create_access_token, get_password_hash
+
+    if await questions_collection.count_documents({}, limit=1):
+        raise RuntimeError(f"Database '{args.database_name}' is not empty; load tests need a scratch database")
+
+    # One bcrypt hash for everyone: seeding 10k users shouldn't take 10k * 250 ms
+    password_hash = get_password_hash(PASSWORD)
+    accounts = [("student", index) for index in range(args.users)] + [("teacher", 0), ("admin", 0)]
+    users = []
+    for role, index in accounts:
+        user = UserInDB(
+            _id=str(ObjectId()),
+            name=f"Load {role} {index}",
+            email=f"load-{role}-{index}@example.com",
+            password_hash=password_hash,
+            role=role
+        )
+        await users_collection.insert_one(user.to_dict())
+        users.append({
+            "id": user.id,
+            "email": user.email,
+            "role": role,
+            "token": create_access_token(data={"sub": user.email, "role": role})
+        })
+
+    questions = [
+        QuestionModel(
+            content=f"Load test question {index}",
+            option_a="Option A", option_b="Option B", option_c="Option C", option_d="Option D",
+            correct_option=rng.choice(OPTIONS),
+            topic=TOPICS[index % len(TOPICS)],
+            difficulty=DIFFICULTIES[(index // len(TOPICS)) % len(DIFFICULTIES)],
+            _id=ObjectId()
+        )
+        for index in range(args.questions)
+    ]
+    for start in range(0, len(questions), 1000):
+        await questions_collection.insert_many([
+            {"_id": question._id, **question.to_dict()} for question in questions[start:start + 1000]
+        ])
+
+    # History: a few past quizzes per student spread over the last 30 days, written
+    # the way the ingestion service writes them (raw docs, rollups, skill state)
+    students = [user for user in users if user["role"] == "student"]
+    now = datetime.utcnow()
+    answers: List[UserAnswerModel] = []
+    attempts: List[QuizAttemptModel] = []
+    for user in students:
+        for _ in range(args.history_quizzes):
+            started_at = now - timedelta(minutes=rng.randint(10, 30 * 24 * 60))
+            picked = rng.sample(questions, min(10, len(questions)))
+            quiz_answers = []
+            for offset, question in enumerate(picked):
+                selected = question.correct_option if rng.random() < 0.6 else rng.choice(OPTIONS)
+                quiz_answers.append(UserAnswerModel(
+                    user["id"], "", str(question._id), selected, selected == question.correct_option,
+                    time_taken=rng.randint(5, 60),
+                    timestamp=started_at + timedelta(seconds=30 * offset),
+                    topic=question.topic, difficulty=question.difficulty
+                ))
+            attempt = QuizAttemptModel(
+                user["id"], picked[0].topic, picked[0].difficulty, [str(question._id) for question in picked],
+                started_at=started_at, ended_at=started_at + timedelta(minutes=5),
+                score=sum(answer.is_correct for answer in quiz_answers), _id=ObjectId()
+            )
+            for answer in quiz_answers:
+                answer.quiz_id = str(attempt._id)
+            answers.extend(quiz_answers)
+            attempts.append(attempt)
+
+    for start in range(0, len(answers), 5000):
+        chunk = answers[start:start + 5000]
+        await user_answers_collection.insert_many([answer.to_dict() for answer in chunk])
+        await rollup_service.record_answers(chunk)
+        await adaptive_logic.record_answers(chunk)
+    for start in range(0, len(attempts), 5000):
+        chunk = attempts[start:start + 5000]
+        await quiz_attempts_collection.insert_many([{"_id": attempt._id, **attempt.to_dict()} for attempt in chunk])
+        await rollup_service.record_attempts(chunk)
+
+    return {
+        "students": students,
+        "teacher": next(user for user in users if user["role"] == "teacher"),
+        "admin": next(user for user in users if user["role"] == "admin"),
+        "answers": len(answers),
+        "attempts": len(attempts)
+    }
+
+class Recorder:
+    """Latency samples per endpoint, ignored during the warm-up"""
+
+    def __init__(self, warmup_until: float):
+        self.warmup_until = warmup_until
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    async def request(self, client, name: str, method: str, url: str, **options):
+        started = time.perf_counter()
+        response = await client.request(method, url, **options)
+        finished = time.perf_counter()
+        if started >= self.warmup_until:
+            if self.started is None:
+                self.started = started
+            self.finished = finished
+            self.latencies.setdefault(name, []).append(finished - started)
+            if response.status_code >= 400:
+                statuses = self.errors.setdefault(name, {})
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        return response
+
+def _auth(user: Dict[str, Any]) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {user['token']}"}
+
+async def scenario_login(client, recorder: Recorder, data, rng: random.Random, args) -> None:
+    user = rng.choice(data["students"])
+    await recorder.request(client, "POST /auth/login", "POST", "/auth/login",
+                           data={"username": user["email"], "password": PASSWORD})
+
+async def scenario_quiz(client, recorder: Recorder, data, rng: random.Random, args) -> None:
+    user = rng.choice(data["students"])
+    response = await recorder.request(client, "POST /quiz/start", "POST", "/quiz/start", headers=_auth(user), json={
+        "topic": rng.choice(TOPICS), "difficulty": rng.choice(DIFFICULTIES), "num_questions": args.quiz_questions
+    })
+    if response.status_code != 200:
+        return
+    quiz = response.json()
+    question_ids = [question["id"] for question in quiz["questions"]]
+    # Answer the first questions one at a time, then submit the rest together
+    answered = min(2, len(question_ids))
+    for question_id in question_ids[:answered]:
+        await recorder.request(client, "POST /quiz/{quiz_id}/answer", "POST", f"/quiz/{quiz['quiz_id']}/answer",
+                               headers=_auth(user), json={
+                                   "question_id": question_id,
+                                   "selected_option": rng.choice(OPTIONS),
+                                   "time_taken": rng.randint(5, 60)
+                               })
+    remaining = question_ids[answered:]
+    await recorder.request(client, "POST /quiz/submit", "POST", "/quiz/submit", headers=_auth(user), json={
+        "quiz_id": quiz["quiz_id"],
+        "question_ids": remaining,
+        "selected_options": [rng.choice(OPTIONS) for _ in remaining],
+        "time_taken_per_question": [rng.randint(5, 60) for _ in remaining]
+    })
+
+async def scenario_recommendations(client, recorder: Recorder, data, rng: random.Random, args) -> None:
+    students = rng.sample(data["students"], min(args.batch_users, len(data["students"])))
+    await recorder.request(client, "POST /quiz/recommendations/batch", "POST", "/quiz/recommendations/batch",
+                           headers=_auth(data["teacher"]), json={
+                               "user_ids": [student["id"] for student in students],
+                               "topic": rng.choice(TOPICS),
+                               "num_questions": 10
+                           })
+
+async def scenario_analytics(client, recorder: Recorder, data, rng: random.Random, args) -> None:
+    await recorder.request(client, "GET /quiz/analytics", "GET", "/quiz/analytics",
+                           headers=_auth(rng.choice(data["students"])))
+
+async def scenario_admin_analytics(client, recorder: Recorder, data, rng: random.Random, args) -> None:
+    await recorder.request(client, "GET /quiz/admin/analytics", "GET", "/quiz/admin/analytics",
+                           headers=_auth(data["admin"]), params={"days": 30})
+
+SCENARIOS = {
+    "login": scenario_login,
+    "quiz": scenario_quiz,
+    "recommendations": scenario_recommendations,
+    "analytics": scenario_analytics,
+    "admin_analytics": scenario_admin_analytics,
+}
+
+async def virtual_user(worker: int, client, recorder: Recorder, data, weights: Dict[str, float], args,
+                       deadline: float) -> None:
+    # Each virtual user has its own seeded RNG and, with --iterations, a fixed share
+    # of the scenarios, so the same arguments replay the same request sequence
+    rng = random.Random(args.seed * 1000 + worker)
+    names = list(weights)
+    iterations = None
+    if args.iterations:
+        iterations = args.iterations // args.concurrency + (1 if worker < args.iterations % args.concurrency else 0)
+    while time.perf_counter() < deadline and (iterations is None or iterations > 0):
+        if iterations is not None:
+            iterations -= 1
+        name = rng.choices(names, weights=list(weights.values()))[0]
+        await SCENARIOS[name](client, recorder, data, rng, args)
+
+def summarize(recorder: Recorder) -> Dict[str, Dict[str, float]]:
+    import numpy as np
+
+    elapsed = (recorder.finished - recorder.started) if recorder.started is not None else 0.0
+    endpoints = {}
+    for name, samples in sorted(recorder.latencies.items()):
+        latencies = np.asarray(samples) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        endpoints[name] = {
+            "count": len(samples),
+            "errors": sum(recorder.errors.get(name, {}).values()),
+            "error_statuses": recorder.errors.get(name, {}),
+            "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(float(latencies.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(latencies.max()), 3)
+        }
+    total = sum(endpoint["count"] for endpoint in endpoints.values())
+    return {"elapsed_seconds": round(elapsed, 3), "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0.0, "endpoints": endpoints}
+
+def print_report(summary: Dict[str, Any]) -> None:
+    print(f"\n{summary['requests']} requests in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['rps']:.1f} req/s)")
+    print(f"{'endpoint':<34} {'count':>7} {'errors':>6} {'req/s':>8} "
+          f"{'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    for name, endpoint in summary["endpoints"].items():
+        print(f"{name:<34} {endpoint['count']:>7} {endpoint['errors']:>6} {endpoint['rps']:>8.1f} "
+              f"{endpoint['mean_ms']:>8.1f} {endpoint['p50_ms']:>8.1f} {endpoint['p95_ms']:>8.1f} "
+              f"{endpoint['p99_ms']:>8.1f}")
+        if endpoint["error_statuses"]:
+            print(f"    ⚠️  error statuses: {endpoint['error_statuses']}")
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Endpoints whose p95 rose, or whose throughput fell, by more than tolerance"""
+    if baseline.get("config") != report["config"]:
+        print("⚠️  The baseline was recorded with a different configuration; the comparison is indicative only")
+    regressions = []
+    print(f"\nAgainst the baseline from {baseline.get('recorded_at', 'an unknown date')} "
+          f"(tolerance {tolerance:.0%}):")
+    for name, current in report["summary"]["endpoints"].items():
+        previous = baseline.get("summary", {}).get("endpoints", {}).get(name)
+        if previous is None:
+            print(f"  {name:<34} new endpoint, no baseline")
+            continue
+        p95_change = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        rps_change = current["rps"] / previous["rps"] - 1 if previous["rps"] else 0.0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        print(f"  {'❌' if regressed else '✅'} {name:<32} p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms "
+              f"({p95_change:+.0%}), {previous['rps']:.1f} -> {current['rps']:.1f} req/s ({rps_change:+.0%})")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+async def run(args) -> int:
+    import httpx
+    from main import app
+    from database.connection import connection_manager
+
+    rng = random.Random(args.seed)
+    weights = parse_mix(args.mix)
+    async with app.router.lifespan_context(app):
+        try:
+            print(f"Seeding {args.users} users, {args.questions} questions and "
+                  f"{args.history_quizzes} past quizzes per user...")
+            started = time.perf_counter()
+            data = await seed(args, rng)
+            print(f"✅ Seeded in {time.perf_counter() - started:.1f}s "
+                  f"({data['answers']} answers, {data['attempts']} attempts)")
+
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+                started = time.perf_counter()
+                recorder = Recorder(warmup_until=started + args.warmup)
+                deadline = started + args.warmup + args.duration if not args.iterations else float("inf")
+                mode = f"{args.iterations} iterations" if args.iterations else f"{args.duration}s"
+                print(f"Running {mode} with {args.concurrency} virtual users (mix: {args.mix})...")
+                await asyncio.gather(*(
+                    virtual_user(worker, client, recorder, data, weights, args, deadline)
+                    for worker in range(args.concurrency)
+                ))
+        finally:
+            if args.backend == "mongodb" and not args.keep_data:
+                await connection_manager.client.drop_database(args.database_name)
+
+    summary = summarize(recorder)
+    print_report(summary)
+    report = {
+        "recorded_at": datetime.utcnow().isoformat(),
+        "config": {
+            key: getattr(args, key) for key in (
+                "backend", "users", "questions", "history_quizzes", "concurrency", "duration",
+                "iterations", "mix", "quiz_questions", "batch_users", "seed"
+            )
+        },
+        "summary": summary
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"ℹ️  Report written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    if args.save_baseline:
+        with open(args.baseline, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    with open(args.baseline) as source:
+        baseline = json.load(source)
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} endpoint(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+def main():
+    """Main function to run the load test"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["mongomock", "mongodb"], default="mongomock",
+                        help="In-memory mongomock-motor, or a scratch database on --mongo-uri")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017", help="Server for --backend mongodb")
+    parser.add_argument("--database-name", default="adaptive_quiz_loadtest",
+                        help="Scratch database; must be empty, and is dropped afterwards unless --keep-data")
+    parser.add_argument("--keep-data", action="store_true", help="Leave the seeded MongoDB database in place")
+    parser.add_argument("--users", type=int, default=200, help="Seeded students")
+    parser.add_argument("--questions", type=int, default=1000, help="Seeded questions across all topics")
+    parser.add_argument("--history-quizzes", type=int, default=5, help="Past quizzes seeded per student")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds of load")
+    parser.add_argument("--iterations", type=int, default=0,
+                        help="Run this many scenarios in total instead of a fixed duration")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of load excluded from the report")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Scenario weights, e.g. quiz=4,analytics=1")
+    parser.add_argument("--quiz-questions", type=int, default=10, help="Questions per started quiz")
+    parser.add_argument("--batch-users", type=int, default=50, help="Learners per batch recommendation request")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the full report as JSON")
+    parser.add_argument("--baseline", help="Baseline report to compare against (or to write with --save-baseline)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed relative p95 increase / throughput drop before failing")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.iterations:
+        args.warmup = 0.0
+    install_backend(args)
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Calibrate IRT item parameters from the full user_answers history.
+
+Fits question difficulty (and, with IRT_MODEL=2pl, discrimination) together
+with every learner's ability per topic, then stores the item parameters on
+the questions under "irt" and resets user_ability to the fitted abilities.
+The online ability updates used with ADAPTIVE_ESTIMATOR=irt continue from
+there. Run it periodically (e.g. nightly) as the answer history grows.
+With --from-snapshot the history is read from the columnar snapshot
+written by snapshot_answers.py instead of from MongoDB.
+"""
+
+import argparse
+import asyncio
+from database.connection import connection_manager
+from services.ability import ability_engine
+from services.snapshot import answer_snapshot
+
+async def main():
+    """Main function to run the calibration"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--topic", help="Only calibrate this topic; default is every topic")
+    parser.add_argument("--min-responses", type=int, default=20,
+                        help="Answers a question needs before its fitted parameters are stored")
+    parser.add_argument("--iterations", type=int, default=50, help="Maximum fitting passes")
+    parser.add_argument("--dry-run", action="store_true", help="Fit and report without writing anything")
+    parser.add_argument("--from-snapshot", action="store_true",
+                        help="Read answers from the snapshot (ANSWER_SNAPSHOT_DIR) instead of user_answers")
+    args = parser.parse_args()
+
+    try:
+        print(f"Calibrating {ability_engine.model} item parameters...")
+        result = await ability_engine.calibrate(
+            topic=args.topic,
+            min_responses=args.min_responses,
+            iterations=args.iterations,
+            dry_run=args.dry_run,
+            snapshot=answer_snapshot if args.from_snapshot else None
+        )
+        print(f"✅ {result['responses']} answers: {result['items']} questions calibrated, "
+              f"{result['abilities']} learner abilities")
+        if args.dry_run:
+            print("ℹ️  Dry run: nothing was written")
+    except Exception as e:
+        print(f"❌ Error calibrating items: {e}")
+    finally:
+        await connection_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
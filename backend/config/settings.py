@@ -12,13 +12,59 @@ class Settings:
     
     # Database settings
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-    DATABASE_NAME: str = os.getenv("DATABASE_NAME", "cursorai_db")
+    DATABASE_NAME: str = os.getenv("DATABASE_NAME", "adaptive_quiz_db")
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+    # How long a request waits for a free pooled connection before failing (0 = forever)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    # Build missing registered indexes (database/indexes.py) in the background at startup
+    ENSURE_INDEXES_ON_STARTUP: bool = os.getenv("ENSURE_INDEXES_ON_STARTUP", "True").lower() == "true"
+    
+    # Storage backend for QuestionService/AuthService: "mongo" or "embedded". Everything else
+    # (quizzes, grading, pools, analytics, export/import) needs MongoDB and answers 503 when embedded
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "mongo").lower()
+    EMBEDDED_DATA_DIR: str = os.getenv("EMBEDDED_DATA_DIR", "data")
+    EMBEDDED_COMPACTION_THRESHOLD: int = int(os.getenv("EMBEDDED_COMPACTION_THRESHOLD", "1000"))
+    EMBEDDED_COMPACTION_INTERVAL_SECONDS: float = float(os.getenv("EMBEDDED_COMPACTION_INTERVAL_SECONDS", "60"))
+    EMBEDDED_FSYNC: bool = os.getenv("EMBEDDED_FSYNC", "False").lower() == "true"
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     
+    # Request-path caches (per process)
+    TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    TOKEN_CACHE_TTL_SECONDS: float = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    
+    # Active quiz sessions (per process); a quiz must be submitted within the TTL
+    QUIZ_SESSION_TTL_SECONDS: float = float(os.getenv("QUIZ_SESSION_TTL_SECONDS", "3600"))
+    QUIZ_SESSION_MAX_ENTRIES: int = int(os.getenv("QUIZ_SESSION_MAX_ENTRIES", "10000"))
+    
+    # Buffered ingestion of quiz answers/attempts
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+    INGEST_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("INGEST_FLUSH_INTERVAL_SECONDS", "1.0"))
+    INGEST_MAX_BUFFERED: int = int(os.getenv("INGEST_MAX_BUFFERED", "10000"))
+    INGEST_MAX_RETRIES: int = int(os.getenv("INGEST_MAX_RETRIES", "5"))
+    
+    # In-memory question pools and per-user recently seen questions
+    QUESTION_POOL_REFRESH_SECONDS: float = float(os.getenv("QUESTION_POOL_REFRESH_SECONDS", "300"))
+    SEEN_QUESTIONS_MAX_USERS: int = int(os.getenv("SEEN_QUESTIONS_MAX_USERS", "100000"))
+    SEEN_QUESTIONS_TTL_SECONDS: float = float(os.getenv("SEEN_QUESTIONS_TTL_SECONDS", "604800"))
+    
+    # Difficulty selection: "streak" (bucket thresholds) or "irt" (continuous ability, see services/ability.py)
+    ADAPTIVE_ESTIMATOR: str = os.getenv("ADAPTIVE_ESTIMATOR", "streak").lower()
+    # IRT model ("rasch" or "2pl") and the online ability step size, which shrinks towards the minimum
+    IRT_MODEL: str = os.getenv("IRT_MODEL", "rasch").lower()
+    IRT_ABILITY_K: float = float(os.getenv("IRT_ABILITY_K", "0.6"))
+    IRT_MIN_ABILITY_K: float = float(os.getenv("IRT_MIN_ABILITY_K", "0.1"))
+    
+    # Answer keys cached for grading (invalidated when a question changes)
+    ANSWER_KEY_CACHE_MAX_ENTRIES: int = int(os.getenv("ANSWER_KEY_CACHE_MAX_ENTRIES", "50000"))
+    ANSWER_KEY_CACHE_TTL_SECONDS: float = float(os.getenv("ANSWER_KEY_CACHE_TTL_SECONDS", "600"))
+    
     # OpenAI settings (for future integration)
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
@@ -33,11 +79,46 @@ class Settings:
     # Security settings
     PASSWORD_MIN_LENGTH: int = 8
     EMAIL_VERIFICATION_REQUIRED: bool = False
+    # bcrypt runs on a dedicated thread pool; requests beyond workers + queue get a 429
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
     
     # Quiz settings
     DEFAULT_QUIZ_QUESTIONS: int = 10
     MAX_QUIZ_QUESTIONS: int = 50
     QUIZ_TIME_LIMIT_MINUTES: int = 30
+    MAX_RECOMMENDATION_BATCH_USERS: int = int(os.getenv("MAX_RECOMMENDATION_BATCH_USERS", "10000"))
+    
+    # Prometheus metrics (/metrics and the request/DB latency histograms)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    # On-demand request profiling (configured at runtime through /admin/profiling)
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "50"))
+    
+    # Conditional GET: question listings and analytics send ETags and answer If-None-Match with 304.
+    # Writes by other workers/scripts are picked up within the staleness window; Cache-Control is per route
+    ETAG_MAX_STALENESS_SECONDS: float = float(os.getenv("ETAG_MAX_STALENESS_SECONDS", "60"))
+    CACHE_CONTROL_QUESTIONS: str = os.getenv("CACHE_CONTROL_QUESTIONS", "private, no-cache")
+    CACHE_CONTROL_ANALYTICS: str = os.getenv("CACHE_CONTROL_ANALYTICS", "private, no-cache")
+    CACHE_CONTROL_ADMIN_ANALYTICS: str = os.getenv("CACHE_CONTROL_ADMIN_ANALYTICS", "private, no-cache")
+    
+    # Streaming exports of answers/attempts: documents per cursor batch (and per chunk), gzip level
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    EXPORT_GZIP_LEVEL: int = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+    
+    # Bulk question import (import_questions.py, POST /admin/questions/import): rows per batch, errors reported
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+    
+    # Columnar answer-history snapshot (snapshot_answers.py): directory, how far behind now it stops, part size
+    ANSWER_SNAPSHOT_DIR: str = os.getenv("ANSWER_SNAPSHOT_DIR", "snapshots/answers")
+    ANSWER_SNAPSHOT_LAG_SECONDS: float = float(os.getenv("ANSWER_SNAPSHOT_LAG_SECONDS", "300"))
+    ANSWER_SNAPSHOT_ROWS_PER_PART: int = int(os.getenv("ANSWER_SNAPSHOT_ROWS_PER_PART", "1000000"))
+    
+    # Analytics settings
+    ANALYTICS_MAX_CONCURRENCY: int = int(os.getenv("ANALYTICS_MAX_CONCURRENCY", "4"))
+    ANALYTICS_SECTION_TIMEOUT_SECONDS: float = float(os.getenv("ANALYTICS_SECTION_TIMEOUT_SECONDS", "2.0"))
+    ANALYTICS_SINGLE_PASS: bool = os.getenv("ANALYTICS_SINGLE_PASS", "False").lower() == "true"
 
 # Create settings instance
 settings = Settings() 
\ No newline at end of file
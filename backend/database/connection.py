@@ -1,9 +1,179 @@
+import asyncio
+import threading
+from typing import Any, Dict
 from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
+from pymongo import monitoring
 
-load_dotenv()
-MONGO_URI = os.getenv("MONGO_URI")
+from config.settings import settings
+from utils.metrics import db_command_duration
 
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["adaptive_quiz_db"]
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by the driver's connection monitoring events"""
+
+    def __init__(self):
+        # Events arrive on driver threads
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.pool_clears = 0
+
+    def _record_wait(self, duration: float) -> None:
+        self.checkout_wait_total += duration
+        self.checkout_wait_max = max(self.checkout_wait_max, duration)
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self._record_wait(event.duration)
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+            self._record_wait(event.duration)
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.open_connections -= 1
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.checkout_failures
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_checkout_wait_ms": round(self.checkout_wait_total / attempts * 1000, 3) if attempts else 0.0,
+                "max_checkout_wait_ms": round(self.checkout_wait_max * 1000, 3),
+                "pool_clears": self.pool_clears
+            }
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    Per-operation command latency for /metrics.
+
+    Services name their hot queries with the driver's comment option (e.g.
+    comment="analytics.topic_performance"); other commands are labelled by
+    command and collection. The driver reports the duration on the succeeded
+    or failed event, so only the label is kept between the two.
+    """
+
+    def __init__(self):
+        self._operations: Dict[int, str] = {}
+
+    def started(self, event) -> None:
+        command = event.command
+        comment = command.get("comment")
+        if isinstance(comment, str):
+            operation = comment
+        else:
+            target = command.get(event.command_name)
+            if not isinstance(target, str):
+                target = command.get("collection")  # getMore
+            operation = f"{event.command_name} {target}" if isinstance(target, str) else event.command_name
+        # dict set/pop are atomic, and request ids are unique per client
+        self._operations[event.request_id] = operation
+
+    def succeeded(self, event) -> None:
+        operation = self._operations.pop(event.request_id, event.command_name)
+        db_command_duration.observe(event.duration_micros / 1e6, operation, "success")
+
+    def failed(self, event) -> None:
+        operation = self._operations.pop(event.request_id, event.command_name)
+        db_command_duration.observe(event.duration_micros / 1e6, operation, "failure")
+
+class MongoConnectionManager:
+    """Owns the application's single Motor client and its connection pool"""
+
+    def __init__(self, uri: str, database_name: str, max_pool_size: int = 100, min_pool_size: int = 0,
+                 wait_queue_timeout_ms: int = 0):
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.wait_queue_timeout_ms = wait_queue_timeout_ms
+        self.pool_metrics = PoolMetrics()
+        self.command_metrics = CommandMetrics()
+        # connect=False: no sockets are opened at import time, only in start() or on first use
+        self.client = AsyncIOMotorClient(
+            uri,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            waitQueueTimeoutMS=wait_queue_timeout_ms or None,
+            event_listeners=[self.pool_metrics, self.command_metrics],
+            connect=False
+        )
+        self.db = self.client[database_name]
+        self.started = False
+
+    async def start(self) -> bool:
+        """Warm the pool with concurrent pings so the first requests skip the connection handshakes"""
+        try:
+            await asyncio.gather(*(
+                self.client.admin.command("ping") for _ in range(max(1, self.min_pool_size))
+            ))
+        except Exception as e:
+            print(f"❌ MongoDB warm-up failed: {e}")
+            return False
+        self.started = True
+        print("✅ MongoDB connection successful")
+        return True
+
+    async def close(self) -> None:
+        """Close every pooled connection"""
+        self.client.close()
+        self.started = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool configuration plus live checkout metrics"""
+        return {
+            "started": self.started,
+            "max_pool_size": self.max_pool_size,
+            "min_pool_size": self.min_pool_size,
+            "wait_queue_timeout_ms": self.wait_queue_timeout_ms,
+            **self.pool_metrics.snapshot()
+        }
+
+# Global instance shared by analytics, adaptive logic, storage and the scripts
+connection_manager = MongoConnectionManager(
+    settings.MONGO_URI,
+    settings.DATABASE_NAME,
+    max_pool_size=settings.MONGO_MAX_POOL_SIZE,
+    min_pool_size=settings.MONGO_MIN_POOL_SIZE,
+    wait_queue_timeout_ms=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+)
+client = connection_manager.client
+db = connection_manager.db
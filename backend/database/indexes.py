@@ -0,0 +1,208 @@
+"""
+Declarative index registry for every MongoDB collection the services query.
+
+INDEXES is the single source of truth: the app applies it in the background
+at startup, and manage_indexes.py applies or audits it from the command line.
+Indexes keep the driver's default names (e.g. "user_id_1_timestamp_-1") so
+deployments seeded by older versions are recognised rather than rebuilt.
+
+PLAN_CHECKS lists a representative shape of each hot service query; the
+plan checker explains them and reports any that fall back to a COLLSCAN.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from database.connection import db
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "questions": [
+        # adaptive_logic.get_question_recommendations
+        IndexModel([("topic", ASCENDING), ("difficulty", ASCENDING)]),
+        # QuestionService.get_questions_by_tags (multikey)
+        IndexModel([("tags", ASCENDING)]),
+        # QuestionService.get_all_questions keyset pages, with and without a difficulty filter
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("difficulty", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+        # Import dedup (services/question_import.py); questions without a hash are not indexed
+        IndexModel([("content_hash", ASCENDING)], unique=True,
+                   partialFilterExpression={"content_hash": {"$exists": True}}),
+    ],
+    "user_answers": [
+        # Recent activity and adaptive_logic.rebuild_skill_state
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING)]),
+        # RollupService.rebuild(since=...)
+        IndexModel([("timestamp", ASCENDING)]),
+        # backfill_answer_metadata.py
+        IndexModel([("question_id", ASCENDING)]),
+    ],
+    "quiz_attempts": [
+        IndexModel([("user_id", ASCENDING), ("started_at", DESCENDING)]),
+        # Admin recent quizzes and RollupService.rebuild(since=...)
+        IndexModel([("started_at", DESCENDING)]),
+    ],
+    "user_skill_state": [
+        IndexModel([("user_id", ASCENDING), ("topic", ASCENDING), ("difficulty", ASCENDING)], unique=True),
+    ],
+    "user_ability": [
+        IndexModel([("user_id", ASCENDING), ("topic", ASCENDING)], unique=True),
+    ],
+    # Unique rollup keys are required by the $merge in RollupService.rebuild
+    "analytics_daily_topic": [
+        IndexModel([("date", ASCENDING), ("topic", ASCENDING), ("difficulty", ASCENDING)], unique=True),
+    ],
+    "analytics_hourly_topic": [
+        IndexModel([("hour", ASCENDING), ("topic", ASCENDING), ("difficulty", ASCENDING)], unique=True),
+    ],
+    "analytics_daily_user": [
+        IndexModel([("date", ASCENDING), ("user_id", ASCENDING), ("topic", ASCENDING),
+                    ("difficulty", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)]),
+    ],
+}
+
+_SAMPLE_USER = "plan-check-user"
+_SAMPLE_DATE = datetime(2000, 1, 1)
+
+PLAN_CHECKS: List[Dict[str, Any]] = [
+    {"name": "auth: user by email", "collection": "users",
+     "filter": {"email": "plan-check@example.com"}},
+    {"name": "adaptive: recommendations", "collection": "questions",
+     "filter": {"topic": "plan-check", "difficulty": "medium"}},
+    {"name": "questions: by tags", "collection": "questions",
+     "filter": {"tags": {"$in": ["plan-check"]}}},
+    {"name": "questions: keyset page", "collection": "questions",
+     "filter": {"created_at": {"$gte": _SAMPLE_DATE}}, "sort": [("created_at", 1), ("_id", 1)]},
+    {"name": "questions: keyset page by difficulty", "collection": "questions",
+     "filter": {"difficulty": "easy"}, "sort": [("created_at", 1), ("_id", 1)]},
+    {"name": "import: questions by content hash", "collection": "questions",
+     "filter": {"content_hash": {"$in": ["plan-check"]}}},
+    {"name": "analytics: recent activity", "collection": "user_answers",
+     "filter": {"user_id": _SAMPLE_USER, "timestamp": {"$gte": _SAMPLE_DATE}}, "sort": [("timestamp", -1)]},
+    {"name": "adaptive: rebuild skill state", "collection": "user_answers",
+     "filter": {"user_id": _SAMPLE_USER, "topic": {"$ne": None}}, "sort": [("timestamp", 1)]},
+    {"name": "rollups: rebuild answers since", "collection": "user_answers",
+     "filter": {"timestamp": {"$gte": _SAMPLE_DATE}}},
+    {"name": "backfill: answers by question", "collection": "user_answers",
+     "filter": {"question_id": {"$in": ["plan-check"]}}},
+    {"name": "export: answers by time", "collection": "user_answers",
+     "filter": {"timestamp": {"$gte": _SAMPLE_DATE, "$lt": _SAMPLE_DATE}}, "sort": [("timestamp", 1)]},
+    {"name": "analytics: user attempts", "collection": "quiz_attempts",
+     "filter": {"user_id": _SAMPLE_USER}, "sort": [("started_at", -1)]},
+    {"name": "analytics: recent quizzes", "collection": "quiz_attempts",
+     "filter": {}, "sort": [("started_at", -1)], "limit": 10},
+    {"name": "export: attempts by time", "collection": "quiz_attempts",
+     "filter": {"started_at": {"$gte": _SAMPLE_DATE, "$lt": _SAMPLE_DATE}}, "sort": [("started_at", 1)]},
+    {"name": "adaptive: topic skill states", "collection": "user_skill_state",
+     "filter": {"user_id": _SAMPLE_USER, "topic": "plan-check"}},
+    {"name": "adaptive: learner ability", "collection": "user_ability",
+     "filter": {"user_id": _SAMPLE_USER, "topic": "plan-check"}},
+    {"name": "analytics: user rollups", "collection": "analytics_daily_user",
+     "filter": {"user_id": _SAMPLE_USER}},
+    {"name": "analytics: active users", "collection": "analytics_daily_user",
+     "filter": {"date": {"$gte": _SAMPLE_DATE}, "answers": {"$gt": 0}}},
+    {"name": "analytics: popular topics", "collection": "analytics_daily_topic",
+     "filter": {"date": {"$gte": _SAMPLE_DATE}}},
+    {"name": "analytics: hourly activity", "collection": "analytics_hourly_topic",
+     "filter": {"hour": {"$gte": _SAMPLE_DATE}}},
+]
+
+def _index_signature(spec: Dict) -> tuple:
+    """The parts of an index definition that must match for it to count as present"""
+    return (tuple(spec["key"].items()), bool(spec.get("unique", False)))
+
+def _find_stages(plan: Any, stage: str) -> bool:
+    """Whether a stage name appears anywhere in an explain plan tree"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == stage:
+            return True
+        return any(_find_stages(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_find_stages(item, stage) for item in plan)
+    return False
+
+class IndexManager:
+    """Applies INDEXES to the database and audits it"""
+
+    def __init__(self, database=db, indexes: Dict[str, List[IndexModel]] = INDEXES):
+        self.db = database
+        self.indexes = indexes
+
+    async def diff(self, collections: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, List[str]]]:
+        """Per collection: registered indexes that are missing, unregistered ones that exist, and name clashes"""
+        report = {}
+        for name in collections or self.indexes:
+            existing = {}
+            async for index in self.db[name].list_indexes():
+                if index["name"] != "_id_":
+                    existing[index["name"]] = index
+
+            wanted = {model.document["name"]: model.document for model in self.indexes.get(name, [])}
+            report[name] = {
+                "missing": [index for index in wanted if index not in existing],
+                "extra": [index for index in existing if index not in wanted],
+                "conflicting": [
+                    index for index in wanted
+                    if index in existing and _index_signature(existing[index]) != _index_signature(wanted[index])
+                ]
+            }
+        return report
+
+    async def apply(self, collections: Optional[Iterable[str]] = None,
+                    drop_extra: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Create missing registered indexes (idempotent)
+
+        Conflicting definitions are left alone for an operator to resolve; unregistered
+        indexes are only dropped when drop_extra is set. Returns the created, dropped
+        and failed index names per collection.
+        """
+        report = await self.diff(collections)
+        results = {}
+        for name, changes in report.items():
+            result = {"created": [], "dropped": [], "failed": {}}
+            models = [model for model in self.indexes.get(name, [])
+                      if model.document["name"] in changes["missing"]]
+            # One at a time, so a conflict fails only its own index and the rest still get built
+            for model in models:
+                try:
+                    result["created"].extend(await self.db[name].create_indexes([model]))
+                except OperationFailure as e:
+                    # Usually an equivalent index under another name, or duplicates under a unique one
+                    result["failed"][model.document["name"]] = str(e)
+            if drop_extra:
+                for index in changes["extra"]:
+                    await self.db[name].drop_index(index)
+                    result["dropped"].append(index)
+            results[name] = result
+        return results
+
+    async def explain(self, check: Dict[str, Any]) -> Dict:
+        """queryPlanner explain output for one plan check"""
+        find = {"find": check["collection"], "filter": check.get("filter", {})}
+        if check.get("sort"):
+            find["sort"] = dict(check["sort"])
+        if check.get("limit"):
+            find["limit"] = check["limit"]
+        return await self.db.command({"explain": find, "verbosity": "queryPlanner"})
+
+    async def check_plans(self, checks: List[Dict[str, Any]] = PLAN_CHECKS) -> List[Dict[str, Any]]:
+        """Explain every registered query and flag collection scans and in-memory sorts"""
+        results = []
+        for check in checks:
+            plan = (await self.explain(check))["queryPlanner"]["winningPlan"]
+            results.append({
+                "name": check["name"],
+                "collection": check["collection"],
+                "collscan": _find_stages(plan, "COLLSCAN"),
+                "in_memory_sort": _find_stages(plan, "SORT")
+            })
+        return results
+
+# Global instance
+index_manager = IndexManager()
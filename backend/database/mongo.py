@@ -5,3 +5,10 @@ users_collection = db["users"]
 questions_collection = db["questions"]
 quiz_attempts_collection = db["quiz_attempts"]
 user_answers_collection = db["user_answers"]
+skill_state_collection = db["user_skill_state"]
+ability_collection = db["user_ability"]
+
+# Pre-aggregated analytics rollups
+daily_topic_rollup_collection = db["analytics_daily_topic"]
+hourly_topic_rollup_collection = db["analytics_hourly_topic"]
+daily_user_rollup_collection = db["analytics_daily_user"]
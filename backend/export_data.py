@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Export user_answers or quiz_attempts as NDJSON or CSV for offline analysis.
+
+Streams from MongoDB in cursor batches (EXPORT_BATCH_SIZE) straight to the
+output file, so memory use does not grow with the size of the export.
+Without --output the data goes to stdout.
+
+    python export_data.py answers --start 2025-01-01 --end 2025-02-01 --gzip -o answers.ndjson.gz
+    python export_data.py attempts --format csv --topic mathematics -o attempts.csv
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+from database.connection import connection_manager
+from services.export import EXPORTS, FORMATS, export_service
+
+async def main():
+    """Main function to run the export"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("collection", choices=sorted(EXPORTS), help="What to export")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Only rows at or after this time (UTC, ISO 8601)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Only rows before this time (UTC, ISO 8601)")
+    parser.add_argument("--topic", help="Only this topic")
+    parser.add_argument("--user-id", help="Only this user")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    query = export_service.query(args.collection, args.start, args.end, args.topic, args.user_id)
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    # Progress goes to stderr so stdout can be piped
+    log = sys.stderr
+    try:
+        started = time.perf_counter()
+        written = 0
+        async for chunk in export_service.stream(args.collection, args.format, query, gzip=args.gzip):
+            output.write(chunk)
+            written += len(chunk)
+        output.flush()
+        print(f"✅ Exported {args.collection} ({written / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s",
+              file=log)
+    except Exception as e:
+        print(f"❌ Error exporting {args.collection}: {e}", file=log)
+    finally:
+        if args.output:
+            output.close()
+        await connection_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
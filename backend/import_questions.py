@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Bulk import quiz questions from NDJSON or CSV files.
+
+Rows are validated against QuestionCreate (schemas/question.py) and written
+in batches of IMPORT_BATCH_SIZE with unordered bulk upserts; questions whose
+normalized text already exists are skipped (or overwritten with --update).
+Files ending in .gz are decompressed on the fly; without a file, stdin is read.
+
+    python import_questions.py questions.ndjson
+    python import_questions.py questions.csv.gz --update
+    python import_questions.py --backfill-hashes
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from database.connection import connection_manager
+from database.indexes import index_manager
+from services.question_import import FORMATS, gunzip, question_import_service
+
+READ_SIZE = 1 << 20
+
+async def read_chunks(source):
+    """A binary file as an async stream of chunks, read off the event loop"""
+    while True:
+        chunk = await asyncio.to_thread(source.read, READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+async def main():
+    """Main function to run the import"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file", nargs="?", help="Input file (default: stdin)")
+    parser.add_argument("--format", choices=sorted(FORMATS), help="Input format (default: from the file extension)")
+    parser.add_argument("--gzip", action="store_true", help="The input is gzip compressed (implied by .gz)")
+    parser.add_argument("--update", action="store_true", help="Overwrite questions that already exist")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and count without writing")
+    parser.add_argument("--backfill-hashes", action="store_true",
+                        help="Hash questions stored before imports existed, so they count as duplicates")
+    parser.add_argument("--errors", help="Write every reported row error to this JSON file")
+    args = parser.parse_args()
+
+    name = (args.file or "").removesuffix(".gz")
+    compressed = args.gzip or (args.file or "").endswith(".gz")
+    format = args.format or ("csv" if name.endswith(".csv") else "ndjson")
+    try:
+        # The unique content_hash index is what keeps concurrent imports from duplicating questions
+        await index_manager.apply(["questions"])
+
+        if args.backfill_hashes:
+            updated = await question_import_service.backfill_hashes()
+            print(f"✅ Hashed {updated} existing questions")
+            if not args.file:
+                return
+
+        started = time.perf_counter()
+        with open(args.file, "rb") if args.file else sys.stdin.buffer as source:
+            chunks = read_chunks(source)
+            if compressed:
+                chunks = gunzip(chunks)
+            report = await question_import_service.import_stream(
+                chunks, format, update=args.update, dry_run=args.dry_run
+            )
+        elapsed = time.perf_counter() - started
+
+        prefix = "ℹ️  Dry run:" if args.dry_run else "✅"
+        print(f"{prefix} {report['rows']} rows in {elapsed:.1f}s: {report['inserted']} inserted, "
+              f"{report['updated']} updated, {report['duplicates']} duplicates, {report['invalid']} invalid")
+        for error in report["errors"][:20]:
+            print(f"⚠️  line {error['line']}: {error['error']}")
+        if report["invalid"] > 20:
+            print(f"⚠️  ... {report['invalid'] - 20} more invalid rows")
+        if args.errors:
+            with open(args.errors, "w") as output:
+                json.dump(report["errors"], output, indent=2)
+            print(f"ℹ️  Row errors written to {args.errors}")
+    except Exception as e:
+        print(f"❌ Error importing questions: {e}")
+    finally:
+        await connection_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,58 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routes import auth, quiz, user, question
+from routes import auth, quiz, user, question, profiling, export, question_import
+from config.settings import settings
+from database.connection import connection_manager
+from database.indexes import index_manager
+from services.ingestion import ingestion_service
+from services.grading import grading_service
+from services.question_pool import question_pool_index
+from services.quiz_session import quiz_session_service
+from services.user_cache import user_cache
+from storage import get_backend
+from utils.auth import token_cache
+from utils.metrics import MetricsMiddleware, cache_collector, metrics
+from utils.password_pool import password_pool
+from utils.profiling import ProfilingMiddleware
+from utils.responses import ORJSONResponse
+
+def _index_build_done(task: asyncio.Task) -> None:
+    # Nothing awaits the startup index build, so its failures are reported here
+    if task.cancelled():
+        return
+    if task.exception() is not None:
+        print(f"⚠️  Index build failed: {task.exception()!r}")
+        return
+    for collection, result in task.result().items():
+        for index, error in result["failed"].items():
+            print(f"⚠️  Index {collection}.{index} was not built: {error}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared MongoDB pool (unless running fully embedded) and load the storage backend
+    index_build = None
+    if settings.STORAGE_BACKEND == "mongo":
+        await connection_manager.start()
+        if settings.ENSURE_INDEXES_ON_STARTUP:
+            # Index builds can take a while on big collections; serve requests meanwhile
+            index_build = asyncio.create_task(index_manager.apply())
+            index_build.add_done_callback(_index_build_done)
+        question_pool_index.start()
+    backend = get_backend()
+    await backend.start()
+    ingestion_service.start()
+    yield
+    # Drain buffered answers/attempts before the connections go away
+    await ingestion_service.close()
+    await question_pool_index.close()
+    if index_build is not None and not index_build.done():
+        index_build.cancel()
+    await backend.close()
+    await connection_manager.close()
+    password_pool.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
@@ -8,7 +60,10 @@ app = FastAPI(
     description="A comprehensive learning platform with adaptive quizzes, AI integration, and user management",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson renders every JSON response; hot routes return ORJSONResponse directly to skip re-validation
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -20,11 +75,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling of one route; a single attribute check per request while disabled
+app.add_middleware(ProfilingMiddleware)
+
+# Request latency/status histograms for /metrics (outermost, so CORS time is included)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+def _requires_mongo():
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="This endpoint requires STORAGE_BACKEND=mongo; the embedded backend only serves users and questions"
+    )
+
+# Quiz sessions, grading, question pools, analytics, export and import read MongoDB directly
+# (database/mongo.py), so they are refused rather than served without the embedded data
+MONGO_ONLY = [] if settings.STORAGE_BACKEND == "mongo" else [Depends(_requires_mongo)]
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(quiz.router, prefix="/quiz", tags=["Quiz"])
+app.include_router(quiz.router, prefix="/quiz", tags=["Quiz"], dependencies=MONGO_ONLY)
 app.include_router(user.router, prefix="/users", tags=["Users"])
 app.include_router(question.router, prefix="/questions", tags=["Questions"])
+app.include_router(profiling.router, prefix="/admin/profiling", tags=["Admin"])
+app.include_router(export.router, prefix="/admin/export", tags=["Admin"], dependencies=MONGO_ONLY)
+app.include_router(question_import.router, prefix="/admin/questions", tags=["Admin"], dependencies=MONGO_ONLY)
 
 # Root endpoint
 @app.get("/")
@@ -39,7 +114,46 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "API is running"}
+    return {
+        "status": "healthy",
+        "message": "API is running",
+        "database_pool": connection_manager.stats(),
+        "ingestion": ingestion_service.stats(),
+        "question_pools": question_pool_index.stats()
+    }
+
+def _runtime_gauges():
+    """Pool, buffer and queue levels read at scrape time"""
+    pool = connection_manager.stats()
+    ingestion = ingestion_service.stats()
+    password = password_pool.stats()
+    return [
+        ("mongo_pool_open_connections", "gauge", "Open connections in the MongoDB pool",
+         [({}, pool["open_connections"])]),
+        ("mongo_pool_checked_out", "gauge", "MongoDB connections currently checked out",
+         [({}, pool["checked_out"])]),
+        ("mongo_pool_checkout_failures_total", "counter", "MongoDB connection checkouts that timed out or failed",
+         [({}, pool["checkout_failures"])]),
+        ("ingest_buffered_documents", "gauge", "Documents waiting in the ingestion buffers",
+         [({"collection": name}, stats["buffered"]) for name, stats in ingestion.items()]),
+        ("ingest_dropped_documents_total", "counter", "Documents dropped after exhausting write retries",
+         [({"collection": name}, stats["dropped"]) for name, stats in ingestion.items()]),
+        ("password_hash_in_flight", "gauge", "bcrypt calls running or queued", [({}, password["in_flight"])]),
+    ]
+
+# Prometheus scrape endpoint (per worker process)
+if settings.METRICS_ENABLED:
+    metrics.register_collector(cache_collector({
+        "token": token_cache.stats,
+        "user": user_cache.stats,
+        "answer_key": grading_service.key_table.stats,
+        "quiz_session": quiz_session_service.store.stats
+    }))
+    metrics.register_collector(_runtime_gauges)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Apply and audit the MongoDB indexes registered in database/indexes.py.
+
+    python manage_indexes.py status              # missing / extra / conflicting indexes
+    python manage_indexes.py apply               # create missing indexes
+    python manage_indexes.py apply --drop-extra  # ...and drop unregistered ones
+    python manage_indexes.py check-plans         # fail if a registered query does a COLLSCAN
+
+status and check-plans exit with code 1 when they find a problem, so both
+can gate a deployment.
+"""
+
+import argparse
+import asyncio
+import sys
+from database.connection import connection_manager
+from database.indexes import index_manager
+
+async def status() -> bool:
+    """Print the registry diff; True if every registered index is present"""
+    healthy = True
+    for collection, changes in (await index_manager.diff()).items():
+        if not any(changes.values()):
+            print(f"✅ {collection}")
+            continue
+        for index in changes["missing"]:
+            print(f"❌ {collection}: missing {index}")
+            healthy = False
+        for index in changes["conflicting"]:
+            print(f"❌ {collection}: {index} exists with different options")
+            healthy = False
+        for index in changes["extra"]:
+            print(f"⚠️  {collection}: unregistered index {index}")
+    return healthy
+
+async def apply(drop_extra: bool) -> bool:
+    """Create missing indexes; True if none failed"""
+    healthy = True
+    for collection, result in (await index_manager.apply(drop_extra=drop_extra)).items():
+        for index in result["created"]:
+            print(f"✅ {collection}: created {index}")
+        for index in result["dropped"]:
+            print(f"🗑️  {collection}: dropped {index}")
+        for index, error in result["failed"].items():
+            print(f"❌ {collection}: could not create {index}: {error}")
+            healthy = False
+    return healthy
+
+async def check_plans() -> bool:
+    """Explain the registered queries; True if none scans a whole collection"""
+    healthy = True
+    for result in await index_manager.check_plans():
+        if result["collscan"]:
+            print(f"❌ {result['name']} ({result['collection']}): COLLSCAN")
+            healthy = False
+        elif result["in_memory_sort"]:
+            print(f"⚠️  {result['name']} ({result['collection']}): index scan with in-memory sort")
+        else:
+            print(f"✅ {result['name']}")
+    return healthy
+
+async def main():
+    """Main function to run the index commands"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["status", "apply", "check-plans"])
+    parser.add_argument("--drop-extra", action="store_true", help="With apply: drop indexes that are not registered")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "status":
+            healthy = await status()
+        elif args.command == "apply":
+            healthy = await apply(args.drop_extra)
+        else:
+            healthy = await check_plans()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        healthy = False
+    finally:
+        await connection_manager.close()
+
+    if not healthy:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -126,6 +126,8 @@ class UserAnswerModel:
         is_correct: bool,
         time_taken: Optional[int] = None,
         timestamp: Optional[datetime] = None,
+        topic: Optional[str] = None,
+        difficulty: Optional[str] = None,
         _id: Optional[ObjectId] = None
     ):
         self._id = _id
@@ -136,6 +138,9 @@ class UserAnswerModel:
         self.is_correct = is_correct
         self.time_taken = time_taken
         self.timestamp = timestamp or datetime.utcnow()
+        # Copied from the question at write time so analytics can group without a $lookup
+        self.topic = topic
+        self.difficulty = difficulty
 
     def to_dict(self):
         return {
@@ -145,9 +150,21 @@ class UserAnswerModel:
             "selected_option": self.selected_option,
             "is_correct": self.is_correct,
             "time_taken": self.time_taken,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "topic": self.topic,
+            "difficulty": self.difficulty
         }
 
+    @classmethod
+    def from_question(cls, question: dict, **kwargs):
+        """Create an answer with topic/difficulty stamped from its question document"""
+        return cls(
+            question_id=str(question["_id"]),
+            topic=question.get("topic"),
+            difficulty=question.get("difficulty"),
+            **kwargs
+        )
+
     @classmethod
     def from_dict(cls, data: dict):
         return cls(
@@ -158,9 +175,76 @@ class UserAnswerModel:
             selected_option=data["selected_option"],
             is_correct=data["is_correct"],
             time_taken=data.get("time_taken"),
-            timestamp=data.get("timestamp")
+            timestamp=data.get("timestamp"),
+            topic=data.get("topic"),
+            difficulty=data.get("difficulty")
         )
 
     @property
     def id(self):
         return str(self._id) if self._id else None
+
+class SkillStateModel:
+    def __init__(
+        self,
+        user_id: str,
+        topic: str,
+        difficulty: str,
+        total_answered: int = 0,
+        correct_count: int = 0,
+        consecutive_correct: int = 0,
+        consecutive_incorrect: int = 0,
+        recent_outcomes: Optional[List[Dict[str, Any]]] = None,
+        updated_at: Optional[datetime] = None,
+        _id: Optional[ObjectId] = None
+    ):
+        self._id = _id
+        self.user_id = user_id
+        self.topic = topic
+        self.difficulty = difficulty
+        self.total_answered = total_answered
+        self.correct_count = correct_count
+        self.consecutive_correct = consecutive_correct
+        self.consecutive_incorrect = consecutive_incorrect
+        self.recent_outcomes = recent_outcomes or []
+        self.updated_at = updated_at or datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "topic": self.topic,
+            "difficulty": self.difficulty,
+            "total_answered": self.total_answered,
+            "correct_count": self.correct_count,
+            "consecutive_correct": self.consecutive_correct,
+            "consecutive_incorrect": self.consecutive_incorrect,
+            "recent_outcomes": self.recent_outcomes,
+            "updated_at": self.updated_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(
+            _id=data.get("_id"),
+            user_id=data["user_id"],
+            topic=data["topic"],
+            difficulty=data["difficulty"],
+            total_answered=data.get("total_answered", 0),
+            correct_count=data.get("correct_count", 0),
+            consecutive_correct=data.get("consecutive_correct", 0),
+            consecutive_incorrect=data.get("consecutive_incorrect", 0),
+            recent_outcomes=data.get("recent_outcomes"),
+            updated_at=data.get("updated_at")
+        )
+
+    @property
+    def rolling_accuracy(self) -> float:
+        """Accuracy over the last-N outcomes kept on the document"""
+        if not self.recent_outcomes:
+            return 0.0
+        correct = sum(1 for outcome in self.recent_outcomes if outcome["is_correct"])
+        return correct / len(self.recent_outcomes)
+
+    @property
+    def id(self):
+        return str(self._id) if self._id else None
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Rebuild the analytics rollup collections from raw history.
+
+The daily/hourly rollups are normally maintained incrementally as answers and
+attempts are written. Run this after a backfill, a bulk import, or to repair
+drift: it deletes the affected rollup documents and regenerates them from
+user_answers and quiz_attempts on the server with $group + $merge.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from services.rollups import rollup_service
+
+async def main():
+    """Main function to run the rebuild"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--since",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+        help="Only rebuild days on or after this date (YYYY-MM-DD); default is full history"
+    )
+    args = parser.parse_args()
+
+    try:
+        print("Rebuilding analytics rollups...")
+        rebuilt = await rollup_service.rebuild(since=args.since)
+        for collection, count in rebuilt.items():
+            print(f"✅ {collection}: {count} documents")
+    except Exception as e:
+        print(f"❌ Error rebuilding rollups: {e}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
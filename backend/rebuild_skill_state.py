@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rebuild user_skill_state from the raw answer history.
+
+Skill state is normally updated as quizzes are submitted, so users who
+answered questions before it existed (or whose state drifted) start at the
+default difficulty. This replays each user's user_answers in time order and
+rewrites their skill state documents. Run backfill_answer_metadata.py first:
+answers without a topic are skipped.
+"""
+
+import argparse
+import asyncio
+from database.connection import connection_manager
+from database.mongo import user_answers_collection
+from services.adaptive_logic import adaptive_logic
+
+async def main():
+    """Main function to run the rebuild"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user", action="append", dest="users", metavar="USER_ID",
+                        help="Only rebuild this user (repeatable); default is every user with answers")
+    args = parser.parse_args()
+
+    try:
+        user_ids = args.users or await user_answers_collection.distinct("user_id", {"topic": {"$ne": None}})
+        print(f"Rebuilding skill state for {len(user_ids)} users...")
+        states = 0
+        for done, user_id in enumerate(user_ids, start=1):
+            states += await adaptive_logic.rebuild_skill_state(user_id)
+            if done % 1000 == 0:
+                print(f"ℹ️  {done}/{len(user_ids)} users")
+        print(f"✅ {states} skill state documents for {len(user_ids)} users")
+    except Exception as e:
+        print(f"❌ Error rebuilding skill state: {e}")
+    finally:
+        await connection_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,11 +5,27 @@ from datetime import datetime
 
 from schemas.user import UserCreate, UserLogin, UserOut, UserUpdate, Token, UserProfile
 from models.user import UserInDB
-from utils.auth import get_password_hash, verify_password, create_access_token, get_current_user, require_role
-from config.database import users_collection
+from utils.auth import get_password_hash_async, verify_password_async, create_access_token, get_current_user, require_role, token_cache
+from utils.role_auth import require_admin
+from utils.password_pool import password_pool
+from utils.responses import ORJSONResponse
+from services.auth_service import AuthService, users_collection
+from services.user_cache import user_cache
+from services.versions import data_versions
 
 router = APIRouter()
 
+def _user_out(user_data: dict) -> dict:
+    """UserOut fields of a stored user, returned without re-validating what the database holds"""
+    return {
+        "id": str(user_data["_id"]),
+        "name": user_data["name"],
+        "email": user_data["email"],
+        "role": user_data["role"],
+        "created_at": user_data["created_at"],
+        "updated_at": user_data.get("updated_at")
+    }
+
 @router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def register_user(user: UserCreate):
     """
@@ -32,16 +48,17 @@ async def register_user(user: UserCreate):
     user_data = UserInDB(
         name=user.name,
         email=user.email,
-        password_hash=get_password_hash(user.password),
+        password_hash=await get_password_hash_async(user.password),
         role=user.role.value
     )
     
     # Insert into database
-    result = await users_collection.insert_one(user_data.to_dict())
+    user_id = await users_collection.insert_one(user_data.to_dict())
+    data_versions.bump("users")
     
     return {
         "message": "User registered successfully",
-        "user_id": str(result.inserted_id),
+        "user_id": user_id,
         "email": user.email
     }
 
@@ -63,7 +80,7 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     # Verify password
-    if not verify_password(form_data.password, user_data["password_hash"]):
+    if not await verify_password_async(form_data.password, user_data["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -82,42 +99,25 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
         data={"sub": user_data["email"], "role": user_data["role"]}
     )
     
-    # Create user response
-    user_out = UserOut(
-        id=str(user_data["_id"]),
-        name=user_data["name"],
-        email=user_data["email"],
-        role=user_data["role"],
-        created_at=user_data["created_at"],
-        updated_at=user_data.get("updated_at")
-    )
-    
-    return Token(
-        access_token=access_token,
-        token_type="bearer",
-        user=user_out
-    )
+    return ORJSONResponse({
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": _user_out(user_data)
+    })
 
 @router.get("/me", response_model=UserOut)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """
     Get current user information
     """
-    user_data = await users_collection.find_one({"email": current_user["email"]})
+    user_data = await AuthService.get_user_by_email(current_user["email"])
     if not user_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    return UserOut(
-        id=str(user_data["_id"]),
-        name=user_data["name"],
-        email=user_data["email"],
-        role=user_data["role"],
-        created_at=user_data["created_at"],
-        updated_at=user_data.get("updated_at")
-    )
+    return ORJSONResponse(_user_out(user_data))
 
 @router.put("/me", response_model=UserOut)
 async def update_current_user(
@@ -127,7 +127,7 @@ async def update_current_user(
     """
     Update current user information
     """
-    user_data = await users_collection.find_one({"email": current_user["email"]})
+    user_data = await AuthService.get_user_by_email(current_user["email"])
     if not user_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -161,35 +161,30 @@ async def update_current_user(
     update_data["updated_at"] = datetime.utcnow()
     
     # Update user
-    result = await users_collection.update_one(
+    modified_count = await users_collection.update_one(
         {"_id": user_data["_id"]},
         {"$set": update_data}
     )
     
-    if result.modified_count == 0:
+    if modified_count == 0:
+        user_cache.invalidate(email=user_data["email"], user_id=str(user_data["_id"]))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update user"
         )
     
-    # Get updated user data
+    # Get updated user data and refresh the cache (drops the old email if it changed)
     updated_user = await users_collection.find_one({"_id": user_data["_id"]})
+    user_cache.put(updated_user)
     
-    return UserOut(
-        id=str(updated_user["_id"]),
-        name=updated_user["name"],
-        email=updated_user["email"],
-        role=updated_user["role"],
-        created_at=updated_user["created_at"],
-        updated_at=updated_user.get("updated_at")
-    )
+    return ORJSONResponse(_user_out(updated_user))
 
 @router.get("/profile", response_model=UserProfile)
 async def get_user_profile(current_user: dict = Depends(get_current_user)):
     """
     Get current user profile with statistics
     """
-    user_data = await users_collection.find_one({"email": current_user["email"]})
+    user_data = await AuthService.get_user_by_email(current_user["email"])
     if not user_data:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -213,3 +208,14 @@ async def get_user_profile(current_user: dict = Depends(get_current_user)):
         created_at=user_data["created_at"],
         updated_at=user_data.get("updated_at")
     )
+
+@router.get("/cache/stats")
+async def get_cache_stats(current_user: dict = Depends(require_admin())):
+    """
+    Get hit/miss counters of the authentication caches (Admin only)
+    """
+    return {
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_pool": password_pool.stats()
+    }
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Optional
+
+from utils.role_auth import require_admin
+from services.export import FORMATS, export_service, naive_utc
+from schemas.export import ExportCollection, ExportFormat
+
+router = APIRouter()
+
+@router.get("/{collection}")
+async def export_collection(
+    collection: ExportCollection,
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson (one document per line) or csv"),
+    start: Optional[datetime] = Query(None, description="Only rows at or after this time (UTC)"),
+    end: Optional[datetime] = Query(None, description="Only rows before this time (UTC)"),
+    topic: Optional[str] = None,
+    user_id: Optional[str] = None,
+    gzip: bool = Query(False, description="Download as a .gz file"),
+    current_user: dict = Depends(require_admin())
+):
+    """
+    Stream the full user_answers or quiz_attempts history (Admin only)
+
+    Rows are sent in time order while they are read, so the export can be
+    any size; the server holds one batch at a time.
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    query = export_service.query(collection.value, start, end, topic, user_id)
+    filename = export_service.filename(collection.value, format.value, gzip)
+    return StreamingResponse(
+        export_service.stream(collection.value, format.value, query, gzip=gzip),
+        media_type="application/gzip" if gzip else FORMATS[format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
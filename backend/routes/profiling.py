@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+from typing import Optional
+
+from utils.role_auth import require_admin
+from utils.profiling import request_profiler
+from schemas.profiling import ProfilingConfig
+
+router = APIRouter()
+
+@router.get("/")
+async def get_profiling_status(current_user: dict = Depends(require_admin())):
+    """Current profiler configuration and the profiles in the ring buffer (Admin only)"""
+    return {**request_profiler.status(), "profiles": request_profiler.summaries()}
+
+@router.put("/")
+async def configure_profiling(config: ProfilingConfig, current_user: dict = Depends(require_admin())):
+    """
+    Start profiling a route template, e.g. "/auth/login" (Admin only)
+
+    Takes effect immediately and lasts until disabled or the worker restarts;
+    with several uvicorn workers each one must be configured.
+    """
+    try:
+        return request_profiler.configure(config.route, config.method, config.mode.value,
+                                          config.sample_rate, config.interval_ms)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.delete("/")
+async def disable_profiling(
+    clear: bool = Query(False, description="Also drop the stored profiles"),
+    current_user: dict = Depends(require_admin())
+):
+    """Stop profiling (Admin only)"""
+    request_profiler.disable()
+    if clear:
+        request_profiler.clear()
+    return request_profiler.status()
+
+@router.get("/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_stacks(
+    profile_id: Optional[int] = Query(None, description="One profile; default merges every sampled profile"),
+    current_user: dict = Depends(require_admin())
+):
+    """Sampled stacks in collapsed format, ready for flamegraph.pl or speedscope (Admin only)"""
+    return request_profiler.collapsed(profile_id)
+
+@router.get("/{profile_id}/pstats", response_class=PlainTextResponse)
+async def get_pstats(
+    profile_id: int,
+    sort: str = Query("cumulative", description="pstats sort key"),
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: dict = Depends(require_admin())
+):
+    """A cProfile profile as a pstats report (Admin only)"""
+    try:
+        report = request_profiler.pstats_text(profile_id, sort, limit)
+    except KeyError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown sort key '{sort}'")
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="cProfile profile not found")
+    return report
+
+@router.get("/{profile_id}/pstats.prof")
+async def download_pstats(profile_id: int, current_user: dict = Depends(require_admin())):
+    """A cProfile profile as a .prof file for snakeviz or pstats.Stats (Admin only)"""
+    dump = request_profiler.pstats_dump(profile_id)
+    if dump is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="cProfile profile not found")
+    return Response(dump, media_type="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.prof"'})
@@ -1,15 +1,71 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Optional
+
+from config.settings import settings
+from utils.auth import get_current_user
+from utils.conditional import cache_headers, not_modified
+from utils.responses import ORJSONResponse
+from services.question_service import QuestionService
+from schemas.quiz import QuestionDifficulty
 
 router = APIRouter()
 
 @router.get("/")
-async def get_questions():
-    """Get all questions"""
-    return {"message": "Question management endpoints coming soon!"}
+async def get_questions(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    difficulty: Optional[QuestionDifficulty] = None,
+    include_answers: bool = Query(False, description="Include correct answers (admin/teacher only)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    List questions page by page
+    
+    Pages are ordered by creation time; pass `next_cursor` back as `cursor` to
+    continue. A null `next_cursor` marks the last page. Pages carry an ETag;
+    If-None-Match gets a 304 while no question changed.
+    """
+    if include_answers and current_user.get("role") not in ["admin", "teacher"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. Admin or teacher role required."
+        )
+    
+    difficulty = difficulty.value if difficulty else None
+    etag = QuestionService.listing_etag(
+        limit=limit, cursor=cursor, include_answers=include_answers, difficulty=difficulty
+    )
+    cached = not_modified(request, etag, settings.CACHE_CONTROL_QUESTIONS)
+    if cached:
+        return cached
+    
+    page = await QuestionService.get_all_questions(
+        limit=limit,
+        cursor=cursor,
+        include_answers=include_answers,
+        difficulty=difficulty
+    )
+    for question in page["questions"]:
+        question["id"] = str(question.pop("_id"))
+    return ORJSONResponse(page, headers=cache_headers(etag, settings.CACHE_CONTROL_QUESTIONS))
+
+@router.get("/count")
+async def get_question_count(
+    request: Request,
+    difficulty: Optional[QuestionDifficulty] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the number of questions, optionally for one difficulty"""
+    difficulty = difficulty.value if difficulty else None
+    etag = QuestionService.listing_etag(count=True, difficulty=difficulty)
+    cached = not_modified(request, etag, settings.CACHE_CONTROL_QUESTIONS)
+    if cached:
+        return cached
+    count = await QuestionService.get_question_count(difficulty)
+    return ORJSONResponse({"count": count}, headers=cache_headers(etag, settings.CACHE_CONTROL_QUESTIONS))
 
 @router.post("/")
 async def create_question():
     """Create a new question (Admin only)"""
     return {"message": "Question creation endpoint coming soon!"}
-
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query, Request
+
+from utils.role_auth import require_admin
+from utils.responses import ORJSONResponse
+from services.question_import import gunzip, question_import_service
+from schemas.question import ImportFormat
+
+router = APIRouter()
+
+@router.post("/import")
+async def import_questions(
+    request: Request,
+    format: ImportFormat = Query(ImportFormat.NDJSON, description="ndjson (one question per line) or csv with a header row"),
+    update: bool = Query(False, description="Overwrite questions that already exist instead of skipping them"),
+    dry_run: bool = Query(False, description="Validate and count without writing"),
+    current_user: dict = Depends(require_admin())
+):
+    """
+    Bulk import questions from the raw request body (Admin only)
+
+    Rows are QuestionCreate fields (content, option_a..option_d,
+    correct_option, difficulty, topic, explanation). The body is processed
+    while it uploads, in batches, so it can be any size; send it with
+    Content-Encoding: gzip to compress it. Questions whose text already exists
+    count as duplicates; invalid rows are listed by line number.
+    """
+    chunks = request.stream()
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        chunks = gunzip(chunks)
+    report = await question_import_service.import_stream(chunks, format.value, update=update, dry_run=dry_run)
+    return ORJSONResponse(report)
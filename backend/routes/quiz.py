@@ -1,6 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from typing import List
 
+from utils.auth import get_current_user
+from utils.role_auth import require_admin, require_admin_or_teacher
+from utils.conditional import cache_headers, not_modified
+from utils.responses import ORJSONResponse
+from config.settings import settings
+from services.auth_service import AuthService
+from services.adaptive_logic import adaptive_logic
+from services.analytics import analytics_service
+from services.quiz_session import quiz_session_service
+from schemas.quiz import (
+    QuizAnswer, QuizProgress, QuizResult, QuizStart, QuizSubmission,
+    RecommendationBatch, RecommendationBatchRequest
+)
+
 router = APIRouter()
 
 @router.get("/")
@@ -9,11 +23,109 @@ async def get_quizzes():
     return {"message": "Quiz endpoints coming soon!"}
 
 @router.post("/start")
-async def start_quiz():
-    """Start a new quiz"""
-    return {"message": "Quiz start endpoint coming soon!"}
-
-@router.post("/submit")
-async def submit_quiz():
-    """Submit quiz answers"""
-    return {"message": "Quiz submit endpoint coming soon!"}
+async def start_quiz(quiz_start: QuizStart, current_user: dict = Depends(get_current_user)):
+    """
+    Start a new quiz
+
+    The questions are picked once and returned without their answers; the
+    answer key stays on the server until the quiz is submitted or expires.
+    """
+    if not 1 <= quiz_start.num_questions <= settings.MAX_QUIZ_QUESTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"num_questions must be between 1 and {settings.MAX_QUIZ_QUESTIONS}"
+        )
+    user_id = await _current_user_id(current_user)
+    quiz = await quiz_session_service.start_quiz(user_id, quiz_start)
+    return ORJSONResponse(quiz)
+
+@router.post("/{quiz_id}/answer", response_model=QuizProgress)
+async def answer_question(quiz_id: str, answer: QuizAnswer, current_user: dict = Depends(get_current_user)):
+    """Record one answer of an active quiz"""
+    user_id = await _current_user_id(current_user)
+    return ORJSONResponse(quiz_session_service.answer(user_id, quiz_id, answer))
+
+@router.get("/{quiz_id}/progress", response_model=QuizProgress)
+async def get_quiz_progress(quiz_id: str, current_user: dict = Depends(get_current_user)):
+    """Get the progress of an active quiz"""
+    user_id = await _current_user_id(current_user)
+    return ORJSONResponse(quiz_session_service.progress(user_id, quiz_id))
+
+@router.post("/submit", response_model=QuizResult)
+async def submit_quiz(submission: QuizSubmission, current_user: dict = Depends(get_current_user)):
+    """
+    Submit quiz answers
+
+    Answers recorded through /quiz/{quiz_id}/answer count too; answers in the
+    submission replace them.
+    """
+    user_id = await _current_user_id(current_user)
+    return ORJSONResponse(await quiz_session_service.submit_quiz(user_id, submission))
+
+@router.post("/recommendations/batch", response_model=RecommendationBatch)
+async def get_batch_recommendations(
+    batch: RecommendationBatchRequest,
+    current_user: dict = Depends(require_admin_or_teacher())
+):
+    """
+    Recommend questions for many learners at once (admin/teacher)
+
+    Used to assign practice to a class or to pre-generate recommendations;
+    every user gets their next difficulty and a set of questions.
+    """
+    if not batch.user_ids or len(batch.user_ids) > settings.MAX_RECOMMENDATION_BATCH_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"user_ids must contain 1 to {settings.MAX_RECOMMENDATION_BATCH_USERS} users"
+        )
+    if not 1 <= batch.num_questions <= settings.MAX_QUIZ_QUESTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"num_questions must be between 1 and {settings.MAX_QUIZ_QUESTIONS}"
+        )
+    recommendations = await adaptive_logic.get_batch_recommendations(batch.user_ids, batch.topic, batch.num_questions)
+    return ORJSONResponse({"topic": batch.topic, "recommendations": recommendations})
+
+async def _current_user_id(current_user: dict) -> str:
+    user_data = await AuthService.get_user_by_email(current_user["email"])
+    if not user_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return str(user_data["_id"])
+
+@router.get("/analytics")
+async def get_quiz_analytics(request: Request, current_user: dict = Depends(get_current_user)):
+    """
+    Get the current user's quiz analytics
+
+    Sections are computed concurrently; `section_timings` reports the status and
+    duration of each one. Send the returned ETag as If-None-Match to get a 304
+    while nothing changed.
+    """
+    user_id = await _current_user_id(current_user)
+    etag = analytics_service.user_analytics_etag(user_id)
+    cached = not_modified(request, etag, settings.CACHE_CONTROL_ANALYTICS)
+    if cached:
+        return cached
+    analytics = await analytics_service.get_user_analytics(user_id)
+    return ORJSONResponse(analytics, headers=cache_headers(etag, settings.CACHE_CONTROL_ANALYTICS))
+
+@router.get("/admin/analytics")
+async def get_platform_analytics(
+    request: Request,
+    days: int = Query(30, ge=1, le=365, description="Number of days shown on the dashboard"),
+    current_user: dict = Depends(require_admin())
+):
+    """
+    Get platform analytics (Admin only)
+
+    Supports If-None-Match like /quiz/analytics.
+    """
+    etag = analytics_service.admin_analytics_etag(days)
+    cached = not_modified(request, etag, settings.CACHE_CONTROL_ADMIN_ANALYTICS)
+    if cached:
+        return cached
+    analytics = await analytics_service.get_admin_analytics(days)
+    return ORJSONResponse(analytics, headers=cache_headers(etag, settings.CACHE_CONTROL_ADMIN_ANALYTICS))
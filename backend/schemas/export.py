@@ -0,0 +1,9 @@
+from enum import Enum
+
+class ExportCollection(str, Enum):
+    ANSWERS = "answers"
+    ATTEMPTS = "attempts"
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
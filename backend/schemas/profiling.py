@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+
+class ProfilerMode(str, Enum):
+    SAMPLING = "sampling"
+    CPROFILE = "cprofile"
+
+class ProfilingConfig(BaseModel):
+    route: str
+    method: Optional[str] = None
+    mode: ProfilerMode = ProfilerMode.SAMPLING
+    sample_rate: float = 1.0
+    interval_ms: float = 5.0
@@ -18,6 +18,10 @@ class QuestionCreate(BaseModel):
     topic: str
     explanation: Optional[str] = None
 
+class ImportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
 class QuestionOut(BaseModel):
     id: str
     content: str
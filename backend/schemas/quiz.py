@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -8,6 +8,11 @@ class QuizStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
 
+class QuestionDifficulty(str, Enum):
+    EASY = "easy"
+    MEDIUM = "medium"
+    HARD = "hard"
+
 class QuizCreate(BaseModel):
     title: str
     topic: str
@@ -16,7 +21,7 @@ class QuizCreate(BaseModel):
 
 class QuizStart(BaseModel):
     topic: str
-    difficulty: str = "medium"
+    difficulty: QuestionDifficulty = QuestionDifficulty.MEDIUM
     num_questions: int = 10
 
 class QuizAnswer(BaseModel):
@@ -25,9 +30,10 @@ class QuizAnswer(BaseModel):
     time_taken: Optional[int] = None
 
 class QuizSubmission(BaseModel):
+    quiz_id: str
     question_ids: List[str]
     selected_options: List[str]
-    time_taken_per_question: Optional[List[int]] = None
+    time_taken_per_question: Optional[List[Optional[int]]] = None
 
 class QuizResult(BaseModel):
     id: str
@@ -41,6 +47,7 @@ class QuizResult(BaseModel):
     ended_at: Optional[datetime] = None
     topic: str
     difficulty: str
+    by_difficulty: Optional[Dict[str, Dict[str, Any]]] = None
 
 class QuizProgress(BaseModel):
     quiz_id: str
@@ -50,6 +57,19 @@ class QuizProgress(BaseModel):
     score_so_far: int
     time_elapsed: int
 
+class RecommendationBatchRequest(BaseModel):
+    user_ids: List[str]
+    topic: str
+    num_questions: int = 10
+
+class RecommendationSet(BaseModel):
+    difficulty: str
+    question_ids: List[str]
+
+class RecommendationBatch(BaseModel):
+    topic: str
+    recommendations: Dict[str, RecommendationSet]
+
 class QuizAnalytics(BaseModel):
     total_quizzes: int
     average_score: float
@@ -58,3 +78,49 @@ class QuizAnalytics(BaseModel):
     accuracy_rate: float
     topics_covered: List[str]
     time_spent_studying: int  # in minutes
+
+class QuestionType(str, Enum):
+    MULTIPLE_CHOICE = "multiple_choice"
+    TRUE_FALSE = "true_false"
+    SHORT_ANSWER = "short_answer"
+
+class QuestionCreate(BaseModel):
+    title: str
+    content: str
+    question_type: QuestionType
+    difficulty: QuestionDifficulty
+    options: Optional[List[str]] = None
+    correct_answer: str
+    explanation: Optional[str] = None
+    points: int = 1
+    tags: Optional[List[str]] = None
+
+class QuestionUpdate(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+    question_type: Optional[QuestionType] = None
+    difficulty: Optional[QuestionDifficulty] = None
+    options: Optional[List[str]] = None
+    correct_answer: Optional[str] = None
+    explanation: Optional[str] = None
+    points: Optional[int] = None
+    tags: Optional[List[str]] = None
+
+class QuestionOut(BaseModel):
+    id: str
+    title: str
+    content: str
+    question_type: str
+    difficulty: str
+    options: Optional[List[str]] = None
+    points: int = 1
+    tags: List[str] = []
+    created_at: Optional[datetime] = None
+
+class QuestionWithAnswer(QuestionOut):
+    correct_answer: str
+    explanation: Optional[str] = None
+
+class QuestionPage(BaseModel):
+    questions: List[QuestionOut]
+    next_cursor: Optional[str] = None
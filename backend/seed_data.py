@@ -5,20 +5,12 @@ This script creates sample questions and an admin user for testing.
 """
 
 import asyncio
-import os
 from datetime import datetime
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
+from database.connection import connection_manager, db
 from utils.hash import hash_password
-
-# Load environment variables
-load_dotenv()
-
-# Database connection
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["adaptive_quiz_db"]
+from database.indexes import index_manager
+from services.question_import import question_import_service
 
 # Sample questions data
 SAMPLE_QUESTIONS = [
@@ -213,6 +205,11 @@ SAMPLE_QUESTIONS = [
     }
 ]
 
+async def sample_rows():
+    """SAMPLE_QUESTIONS as numbered import rows"""
+    for number, question in enumerate(SAMPLE_QUESTIONS, start=1):
+        yield number, question
+
 async def seed_database():
     """Seed the database with sample data"""
     print("Starting database seeding...")
@@ -234,26 +231,19 @@ async def seed_database():
     else:
         print("ℹ️  Admin user already exists")
     
-    # Insert sample questions
-    questions_inserted = 0
-    for question in SAMPLE_QUESTIONS:
-        # Check if question already exists (by content)
-        existing_question = await db.questions.find_one({"content": question["content"]})
-        if not existing_question:
-            question["created_at"] = datetime.utcnow()
-            await db.questions.insert_one(question)
-            questions_inserted += 1
+    # Create the registered indexes (database/indexes.py); the unique content_hash
+    # index must exist before questions are imported
+    await index_manager.apply()
+    print("✅ Database indexes created")
     
-    print(f"✅ {questions_inserted} new questions inserted")
-    print(f"ℹ️  Total questions in database: {await db.questions.count_documents({})}")
+    # Import the sample questions that don't exist yet (by content hash) in one batch;
+    # questions seeded before content hashes existed are hashed first so they are recognised
+    await question_import_service.backfill_hashes()
+    report = await question_import_service.import_rows(sample_rows())
     
-    # Create indexes for better performance
-    await db.users.create_index("email", unique=True)
-    await db.questions.create_index("topic")
-    await db.questions.create_index("difficulty")
-    await db.questions.create_index([("topic", 1), ("difficulty", 1)])
+    print(f"✅ {report['inserted']} new questions inserted")
+    print(f"ℹ️  Total questions in database: {await db.questions.count_documents({})}")
     
-    print("✅ Database indexes created")
     print("🎉 Database seeding completed successfully!")
 
 async def main():
@@ -263,7 +253,7 @@ async def main():
     except Exception as e:
         print(f"❌ Error seeding database: {e}")
     finally:
-        client.close()
+        await connection_manager.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
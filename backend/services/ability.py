@@ -0,0 +1,369 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from config.settings import settings
+from database.mongo import ability_collection, questions_collection, user_answers_collection
+from models.quiz import UserAnswerModel
+from services.question_pool import question_pool_index
+from services.snapshot import AnswerSnapshot
+from utils.cache import TTLCache
+import numpy as np
+
+# Item difficulty assumed for a question that has not been calibrated yet
+DIFFICULTY_PRIORS = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+def _probability(ability, difficulty, discrimination=1.0):
+    """Chance of a correct answer under the logistic (Rasch/2PL) model"""
+    return 1.0 / (1.0 + np.exp(-discrimination * (ability - difficulty)))
+
+class ItemBank:
+    """
+    One topic's questions sorted by item difficulty.
+
+    Ordinals come from the question pool index, so the pool's per-user seen
+    bitmaps can be checked without another lookup.
+    """
+
+    def __init__(self, question_ids: List[str], difficulties: np.ndarray, discriminations: np.ndarray):
+        order = np.argsort(difficulties, kind="stable")
+        self.question_ids = [question_ids[index] for index in order]
+        self.difficulties = difficulties[order]
+        self.discriminations = discriminations[order]
+        self.ordinals = np.array([question_pool_index.ordinal(question_id) for question_id in self.question_ids],
+                                 dtype=np.int64)
+        self.positions = {question_id: position for position, question_id in enumerate(self.question_ids)}
+
+    def parameters(self, question_id: str) -> Tuple[float, float]:
+        """(difficulty, discrimination) of a question; unknown ones sit at the prior"""
+        position = self.positions.get(question_id)
+        if position is None:
+            return 0.0, 1.0
+        return float(self.difficulties[position]), float(self.discriminations[position])
+
+    def nearest(self, ability: float, limit: int, seen=None) -> List[int]:
+        """
+        Positions of up to limit questions closest in difficulty to ability
+
+        A binary search finds where the ability falls in the sorted difficulties,
+        then two cursors walk outwards, so the cost is O(log n + limit + skipped).
+        """
+        picked = []
+        right = int(np.searchsorted(self.difficulties, ability))
+        left = right - 1
+        size = len(self.difficulties)
+        while len(picked) < limit and (left >= 0 or right < size):
+            take_left = right >= size or (left >= 0 and
+                                          ability - self.difficulties[left] <= self.difficulties[right] - ability)
+            position = left if take_left else right
+            if take_left:
+                left -= 1
+            else:
+                right += 1
+            if seen is None or int(self.ordinals[position]) not in seen:
+                picked.append(position)
+        return picked
+
+class AbilityEngine:
+    """
+    Item response theory estimates as an alternative to the streak thresholds.
+
+    Each learner has a continuous ability per topic (user_ability), updated
+    online after every answer with an Elo-style step towards the Rasch/2PL
+    prediction error; the step shrinks as the learner answers more questions.
+    Question difficulty (and 2PL discrimination) live on the question under
+    "irt" and are fitted offline from the whole answer history by calibrate();
+    uncalibrated questions sit at their difficulty bucket's prior.
+    """
+
+    def __init__(self, model: str, ability_k: float, min_ability_k: float, cache_ttl_seconds: float):
+        self.model = model
+        self.ability_k = ability_k
+        self.min_ability_k = min_ability_k
+        self._banks = TTLCache(1000, cache_ttl_seconds)
+
+    async def item_bank(self, topic: str) -> ItemBank:
+        """The topic's item bank, loaded once per cache TTL"""
+        bank = self._banks.get(topic)
+        if bank is None:
+            question_ids, difficulties, discriminations = [], [], []
+            async for question in questions_collection.find({"topic": topic}, {"difficulty": 1, "irt": 1},
+                                                          comment="ability.item_bank"):
+                irt = question.get("irt") or {}
+                question_ids.append(str(question["_id"]))
+                difficulties.append(irt.get("difficulty", DIFFICULTY_PRIORS.get(question.get("difficulty"), 0.0)))
+                discriminations.append(irt.get("discrimination", 1.0) if self.model == "2pl" else 1.0)
+            bank = ItemBank(question_ids, np.array(difficulties, dtype=np.float64),
+                            np.array(discriminations, dtype=np.float64))
+            self._banks.set(topic, bank)
+        return bank
+
+    def invalidate(self, topic: Optional[str] = None) -> None:
+        """Drop a topic's item bank (or all of them) after questions change"""
+        if topic is None:
+            self._banks.clear()
+        else:
+            self._banks.invalidate(topic)
+
+    async def get_ability(self, user_id: str, topic: str) -> Dict[str, Any]:
+        state = await ability_collection.find_one({"user_id": user_id, "topic": topic}, comment="ability.get_ability")
+        return {"ability": state["ability"] if state else 0.0, "answered": state["answered"] if state else 0}
+
+    async def record_answers(self, answers: List[UserAnswerModel]) -> None:
+        """Apply one online ability update per answer, one $inc per (user, topic)"""
+        answers = [answer for answer in answers if answer.topic]
+        if not answers:
+            return
+        keys = {(answer.user_id, answer.topic) for answer in answers}
+        cursor = ability_collection.find({
+            "user_id": {"$in": list({user_id for user_id, _ in keys})},
+            "topic": {"$in": list({topic for _, topic in keys})}
+        })
+        states = {(state["user_id"], state["topic"]): state async for state in cursor}
+
+        updates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for answer in answers:
+            key = (answer.user_id, answer.topic)
+            if key not in updates:
+                state = states.get(key) or {}
+                updates[key] = {"start": state.get("ability", 0.0), "ability": state.get("ability", 0.0),
+                                "answered": state.get("answered", 0), "count": 0, "timestamp": answer.timestamp}
+            update = updates[key]
+            difficulty, discrimination = (await self.item_bank(answer.topic)).parameters(answer.question_id)
+            update["ability"] = self._step(update["ability"], update["answered"] + update["count"],
+                                           answer.is_correct, difficulty, discrimination)
+            update["count"] += 1
+            update["timestamp"] = max(update["timestamp"], answer.timestamp)
+
+        # $inc by the delta, so concurrent submissions for one learner both count
+        await ability_collection.bulk_write([
+            UpdateOne(
+                {"user_id": user_id, "topic": topic},
+                {"$inc": {"ability": update["ability"] - update["start"], "answered": update["count"]},
+                 "$set": {"updated_at": update["timestamp"]}},
+                upsert=True
+            )
+            for (user_id, topic), update in updates.items()
+        ], ordered=False, comment="ability.record_answers")
+
+    def _step(self, ability: float, answered: int, is_correct: bool, difficulty: float, discrimination: float) -> float:
+        """One Elo/Rasch update: move by K times the prediction error"""
+        k = max(self.min_ability_k, self.ability_k / np.sqrt(1 + answered))
+        expected = _probability(ability, difficulty, discrimination)
+        return float(ability + k * discrimination * (float(is_correct) - expected))
+
+    async def recommend(self, user_id: str, topic: str, count: int) -> List[str]:
+        """
+        The count most informative questions for the learner's current ability
+
+        Under Rasch the information a^2 * p * (1 - p) peaks where difficulty equals
+        ability, so the nearest difficulties are the answer; under 2PL a wider
+        window of near candidates is ranked by information. Questions the user saw
+        recently are skipped while enough others remain.
+        """
+        bank = await self.item_bank(topic)
+        if count <= 0 or not bank.question_ids:
+            return []
+        ability = (await self.get_ability(user_id, topic))["ability"]
+        return self._select(bank, ability, count, user_id)
+
+    async def recommend_many(self, user_ids: List[str], topic: str, count: int) -> Dict[str, Dict[str, Any]]:
+        """recommend() for many learners with one ability query and one item bank"""
+        bank = await self.item_bank(topic)
+        cursor = ability_collection.find({"user_id": {"$in": user_ids}, "topic": topic}, {"user_id": 1, "ability": 1},
+                                         comment="ability.recommend_many")
+        abilities = {state["user_id"]: state["ability"] async for state in cursor}
+        return {
+            user_id: {
+                "difficulty": self._bucket(abilities.get(user_id, 0.0)),
+                "question_ids": (self._select(bank, abilities.get(user_id, 0.0), count, user_id)
+                                 if count > 0 and bank.question_ids else [])
+            }
+            for user_id in user_ids
+        }
+
+    def _select(self, bank: ItemBank, ability: float, count: int, user_id: str) -> List[str]:
+        window = count if self.model == "rasch" else 4 * count
+
+        positions = bank.nearest(ability, window, question_pool_index.seen(user_id))
+        if len(positions) < count:
+            positions += [position for position in bank.nearest(ability, count + len(positions))
+                          if position not in positions][:count - len(positions)]
+        positions = np.array(positions, dtype=np.int64)
+        expected = _probability(ability, bank.difficulties[positions], bank.discriminations[positions])
+        information = bank.discriminations[positions] ** 2 * expected * (1 - expected)
+        ranked = positions[np.argsort(-information, kind="stable")][:count]
+        return [bank.question_ids[position] for position in ranked]
+
+    async def difficulty_bucket(self, user_id: str, topic: str) -> str:
+        """The difficulty bucket whose prior is closest to the learner's ability"""
+        return self._bucket((await self.get_ability(user_id, topic))["ability"])
+
+    def _bucket(self, ability: float) -> str:
+        return min(DIFFICULTY_PRIORS, key=lambda level: abs(DIFFICULTY_PRIORS[level] - ability))
+
+    async def calibrate(self, topic: Optional[str] = None, min_responses: int = 20,
+                        iterations: int = 50, dry_run: bool = False,
+                        snapshot: Optional[AnswerSnapshot] = None) -> Dict[str, int]:
+        """
+        Fit item (and ability) parameters from the whole user_answers history
+
+        Joint maximum a posteriori estimation: each pass takes one Newton step for
+        every ability and then every item parameter, all as NumPy bincount
+        reductions over the response arrays. Normal priors (abilities around 0,
+        difficulties around their bucket prior) keep all-correct and all-wrong
+        learners and items finite. Items with fewer than min_responses answers keep
+        their current parameters. With a snapshot (services/snapshot.py) the
+        history is read from its memory-mapped columns instead of MongoDB.
+        """
+        if snapshot is not None:
+            history = self._snapshot_responses(snapshot, topic)
+        else:
+            history = await self._database_responses(topic)
+        if history is None:
+            return {"responses": 0, "items": 0, "abilities": 0}
+        people, person_codes, item_ids, item_codes, outcomes, priors = history
+
+        abilities, difficulties, discriminations = fit_item_parameters(
+            person_codes, item_codes, outcomes, priors, two_parameter=self.model == "2pl", iterations=iterations
+        )
+        responses = np.bincount(item_codes, minlength=len(item_ids))
+        answered = np.bincount(person_codes, minlength=len(people))
+
+        calibrated = [index for index in range(len(item_ids)) if responses[index] >= min_responses]
+        if not dry_run:
+            calibrated_at = datetime.utcnow()
+            if calibrated:
+                await questions_collection.bulk_write([
+                    UpdateOne(
+                        {"_id": ObjectId(item_ids[index]) if ObjectId.is_valid(item_ids[index]) else item_ids[index]},
+                        {"$set": {"irt": {
+                            "difficulty": float(difficulties[index]),
+                            "discrimination": float(discriminations[index]),
+                            "responses": int(responses[index]),
+                            "calibrated_at": calibrated_at
+                        }}}
+                    )
+                    for index in calibrated
+                ], ordered=False)
+            await ability_collection.bulk_write([
+                UpdateOne(
+                    {"user_id": person.split("\0", 1)[0], "topic": person.split("\0", 1)[1]},
+                    {"$set": {"ability": float(abilities[index]), "answered": int(answered[index]),
+                              "updated_at": calibrated_at}},
+                    upsert=True
+                )
+                for index, person in enumerate(people)
+            ], ordered=False)
+            self.invalidate()
+        return {"responses": len(outcomes), "items": len(calibrated), "abilities": len(people)}
+
+    async def _database_responses(self, topic: Optional[str]):
+        """(people, person codes, item ids, item codes, outcomes, difficulty priors) from user_answers"""
+        match = {"topic": topic} if topic else {"topic": {"$ne": None}}
+        users, items, topics, outcomes = [], [], [], []
+        cursor = user_answers_collection.find(match, {"user_id": 1, "question_id": 1, "topic": 1, "is_correct": 1},
+                                              batch_size=10000)
+        async for answer in cursor:
+            users.append(answer["user_id"])
+            items.append(answer["question_id"])
+            topics.append(answer["topic"])
+            outcomes.append(bool(answer["is_correct"]))
+        if not outcomes:
+            return None
+
+        # Abilities are per (user, topic)
+        people, person_codes = np.unique(np.array([f"{user}\0{topic}" for user, topic in zip(users, topics)],
+                                                  dtype=object), return_inverse=True)
+        item_ids, item_codes = np.unique(np.array(items, dtype=object), return_inverse=True)
+        outcomes = np.array(outcomes, dtype=np.float64)
+        priors = await self._difficulty_priors(item_ids)
+        return people, person_codes, item_ids, item_codes, outcomes, priors
+
+    def _snapshot_responses(self, snapshot: AnswerSnapshot, topic: Optional[str]):
+        """The same arrays from a columnar snapshot: codes are already integers, so no string work per answer"""
+        columns = snapshot.load(["user", "question", "topic", "difficulty", "is_correct"], topic=topic)
+        known = columns["topic"] >= 0
+        if not known.any():
+            return None
+        # Abilities are per (user, topic): one int64 key per pair
+        users, topics = columns["user"][known].astype(np.int64), columns["topic"][known].astype(np.int64)
+        stride = int(topics.max()) + 1
+        person_keys, person_codes = np.unique(users * stride + topics, return_inverse=True)
+        item_keys, first, item_codes = np.unique(columns["question"][known], return_index=True, return_inverse=True)
+
+        user_values, topic_values = snapshot.dictionary("user"), snapshot.dictionary("topic")
+        people = np.array([f"{user_values[key // stride]}\0{topic_values[key % stride]}" for key in person_keys],
+                          dtype=object)
+        item_ids = np.array([str(value) for value in snapshot.dictionary("question")[item_keys]], dtype=object)
+        # Difficulty priors from the bucket recorded with each item's answers
+        difficulty_values = snapshot.dictionary("difficulty")
+        priors = np.array([
+            DIFFICULTY_PRIORS.get(difficulty_values[code] if code >= 0 else None, 0.0)
+            for code in columns["difficulty"][known][first]
+        ], dtype=np.float64)
+        return people, person_codes, item_ids, item_codes, columns["is_correct"][known].astype(np.float64), priors
+
+    async def _difficulty_priors(self, item_ids: Iterable[str]) -> np.ndarray:
+        """Prior mean difficulty per item, from its difficulty bucket"""
+        ids = [ObjectId(item_id) if ObjectId.is_valid(item_id) else item_id for item_id in item_ids]
+        buckets = {}
+        async for question in questions_collection.find({"_id": {"$in": ids}}, {"difficulty": 1}):
+            buckets[str(question["_id"])] = question.get("difficulty")
+        return np.array([DIFFICULTY_PRIORS.get(buckets.get(item_id), 0.0) for item_id in item_ids], dtype=np.float64)
+
+def fit_item_parameters(person_codes: np.ndarray, item_codes: np.ndarray, outcomes: np.ndarray,
+                        difficulty_priors: np.ndarray, two_parameter: bool = False, iterations: int = 50,
+                        ability_sd: float = 1.0, difficulty_sd: float = 1.5, discrimination_sd: float = 0.5,
+                        tolerance: float = 1e-4) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Alternating Newton steps for abilities, difficulties and (2PL) discriminations"""
+    people = int(person_codes.max()) + 1
+    items = len(difficulty_priors)
+    abilities = np.zeros(people)
+    difficulties = difficulty_priors.astype(np.float64).copy()
+    discriminations = np.ones(items)
+
+    for _ in range(iterations):
+        a = discriminations[item_codes]
+        expected = _probability(abilities[person_codes], difficulties[item_codes], a)
+        residual = outcomes - expected
+        weight = expected * (1 - expected)
+        ability_step = (
+            (np.bincount(person_codes, weights=a * residual, minlength=people) - abilities / ability_sd ** 2)
+            / (np.bincount(person_codes, weights=a ** 2 * weight, minlength=people) + 1 / ability_sd ** 2)
+        )
+        abilities += ability_step
+
+        expected = _probability(abilities[person_codes], difficulties[item_codes], a)
+        residual = outcomes - expected
+        weight = expected * (1 - expected)
+        difficulty_step = (
+            (-np.bincount(item_codes, weights=a * residual, minlength=items)
+             - (difficulties - difficulty_priors) / difficulty_sd ** 2)
+            / (np.bincount(item_codes, weights=a ** 2 * weight, minlength=items) + 1 / difficulty_sd ** 2)
+        )
+        difficulties += difficulty_step
+
+        change = max(np.abs(ability_step).max(), np.abs(difficulty_step).max())
+        if two_parameter:
+            distance = abilities[person_codes] - difficulties[item_codes]
+            expected = _probability(abilities[person_codes], difficulties[item_codes], a)
+            discrimination_step = (
+                (np.bincount(item_codes, weights=distance * (outcomes - expected), minlength=items)
+                 - (discriminations - 1) / discrimination_sd ** 2)
+                / (np.bincount(item_codes, weights=distance ** 2 * expected * (1 - expected), minlength=items)
+                   + 1 / discrimination_sd ** 2)
+            )
+            discriminations = np.clip(discriminations + discrimination_step, 0.2, 4.0)
+            change = max(change, np.abs(discrimination_step).max())
+        if change < tolerance:
+            break
+    return abilities, difficulties, discriminations
+
+# Global instance
+ability_engine = AbilityEngine(
+    model=settings.IRT_MODEL,
+    ability_k=settings.IRT_ABILITY_K,
+    min_ability_k=settings.IRT_MIN_ABILITY_K,
+    cache_ttl_seconds=settings.QUESTION_POOL_REFRESH_SECONDS
+)
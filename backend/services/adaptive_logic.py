@@ -1,42 +1,92 @@
-from typing import List, Dict, Optional
-from database.mongo import user_answers_collection
+from typing import Any, List, Dict, Optional
+from datetime import datetime
+from database.mongo import user_answers_collection, skill_state_collection
+from config.settings import settings
+from models.quiz import SkillStateModel, UserAnswerModel
+from services.ability import ability_engine
+from services.question_pool import question_pool_index
 from bson import ObjectId
+from pymongo import UpdateOne
 import asyncio
+import numpy as np
+
+# $subtract of two dates gives milliseconds
+EPOCH = datetime(1970, 1, 1)
 
 class AdaptiveLogic:
     def __init__(self):
         self.difficulty_levels = ["easy", "medium", "hard"]
         self.correct_threshold = 3  # Number of correct answers to increase difficulty
         self.incorrect_threshold = 2  # Number of incorrect answers to decrease difficulty
+        self.min_answers_at_difficulty = 3  # Answers needed before the difficulty may change
+        self.recent_window = 10  # Number of outcomes kept on each skill state document
+        self.estimator = settings.ADAPTIVE_ESTIMATOR  # "streak" or "irt" (continuous ability)
+
+    async def record_answers(self, answers: List[UserAnswerModel]) -> None:
+        """Fold a batch of answers into skill state with one ordered bulk write"""
+        if not answers:
+            return
+        # Ordered, so repeated updates to one (topic, difficulty) keep their streak semantics
+        operations = [
+            UpdateOne(
+                {"user_id": answer.user_id, "topic": answer.topic, "difficulty": answer.difficulty},
+                self._skill_state_update(answer.is_correct, answer.timestamp),
+                upsert=True
+            )
+            for answer in answers
+        ]
+        await skill_state_collection.bulk_write(operations, ordered=True, comment="adaptive.record_answers")
+        if self.estimator == "irt":
+            await ability_engine.record_answers(answers)
+
+    def _skill_state_update(self, is_correct: bool, timestamp: datetime) -> Dict:
+        """Build the in-place update applied to a skill state document for one answer"""
+        if is_correct:
+            streaks = {"$inc": {"consecutive_correct": 1, "correct_count": 1},
+                       "$set": {"consecutive_incorrect": 0}}
+        else:
+            streaks = {"$inc": {"consecutive_incorrect": 1},
+                       "$set": {"consecutive_correct": 0}}
+        
+        streaks["$inc"]["total_answered"] = 1
+        streaks["$set"]["updated_at"] = timestamp
+        streaks["$push"] = {"recent_outcomes": {
+            "$each": [{"is_correct": is_correct, "timestamp": timestamp}],
+            "$slice": -self.recent_window
+        }}
+        return streaks
+
+    async def _get_topic_skill_states(self, user_id: str, topic: str) -> Dict[str, SkillStateModel]:
+        """Load the (at most one per difficulty) skill state documents for a topic"""
+        cursor = skill_state_collection.find({"user_id": user_id, "topic": topic},
+                                             comment="adaptive.topic_skill_states")
+        states = await cursor.to_list(length=len(self.difficulty_levels))
+        return {state["difficulty"]: SkillStateModel.from_dict(state) for state in states}
 
     async def get_user_performance_history(self, user_id: str, topic: str) -> Dict:
         """Get user's recent performance for a specific topic"""
-        pipeline = [
-            {"$match": {"user_id": user_id}},
-            {"$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "question"
-            }},
-            {"$unwind": "$question"},
-            {"$match": {"question.topic": topic}},
-            {"$sort": {"timestamp": -1}},
-            {"$limit": 10}
+        states = await self._get_topic_skill_states(user_id, topic)
+        return self._summarize_performance(states)
+
+    def _summarize_performance(self, states: Dict[str, SkillStateModel]) -> Dict:
+        """Summarize the last N outcomes across all difficulties of a topic"""
+        recent_answers = [
+            (outcome["timestamp"], difficulty, outcome["is_correct"])
+            for difficulty, state in states.items()
+            for outcome in state.recent_outcomes
         ]
-        
-        cursor = user_answers_collection.aggregate(pipeline)
-        recent_answers = await cursor.to_list(length=10)
+        recent_answers.sort(key=lambda answer: answer[0], reverse=True)
+        recent_answers = recent_answers[:self.recent_window]
         
         if not recent_answers:
             return {"difficulty": "medium", "confidence": 0.5}
         
-        correct_count = sum(1 for answer in recent_answers if answer["is_correct"])
+        correct_count = sum(1 for answer in recent_answers if answer[2])
         total_count = len(recent_answers)
         accuracy = correct_count / total_count if total_count > 0 else 0.5
         
         # Calculate average difficulty of recent questions
-        difficulties = [answer["question"]["difficulty"] for answer in recent_answers]
+        difficulties = [answer[1] for answer in recent_answers]
         avg_difficulty = self._calculate_average_difficulty(difficulties)
         
         return {
@@ -64,69 +114,29 @@ class AdaptiveLogic:
 
     async def determine_next_difficulty(self, user_id: str, topic: str, current_difficulty: str) -> str:
         """Determine the next difficulty level based on user performance"""
-        performance = await self.get_user_performance_history(user_id, topic)
-        
-        # Get recent answers for the current difficulty
-        recent_answers = await self._get_recent_answers_by_difficulty(user_id, topic, current_difficulty)
-        
-        if len(recent_answers) < 3:
+        if self.estimator == "irt":
+            return await ability_engine.difficulty_bucket(user_id, topic)
+        state = await skill_state_collection.find_one({
+            "user_id": user_id,
+            "topic": topic,
+            "difficulty": current_difficulty
+        }, comment="adaptive.next_difficulty")
+        return self._next_difficulty(SkillStateModel.from_dict(state) if state else None, current_difficulty)
+
+    def _next_difficulty(self, state: Optional[SkillStateModel], current_difficulty: str) -> str:
+        """Apply the streak thresholds to a skill state"""
+        if state is None or state.total_answered < self.min_answers_at_difficulty:
             # Not enough data, maintain current difficulty
             return current_difficulty
         
-        # Check for streaks
-        consecutive_correct = self._get_consecutive_correct(recent_answers)
-        consecutive_incorrect = self._get_consecutive_incorrect(recent_answers)
-        
         # Adaptive logic
-        if consecutive_correct >= self.correct_threshold:
+        if state.consecutive_correct >= self.correct_threshold:
             return self._increase_difficulty(current_difficulty)
-        elif consecutive_incorrect >= self.incorrect_threshold:
+        elif state.consecutive_incorrect >= self.incorrect_threshold:
             return self._decrease_difficulty(current_difficulty)
         else:
             return current_difficulty
 
-    async def _get_recent_answers_by_difficulty(self, user_id: str, topic: str, difficulty: str) -> List[Dict]:
-        """Get recent answers for a specific difficulty level"""
-        pipeline = [
-            {"$match": {"user_id": user_id}},
-            {"$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "question"
-            }},
-            {"$unwind": "$question"},
-            {"$match": {
-                "question.topic": topic,
-                "question.difficulty": difficulty
-            }},
-            {"$sort": {"timestamp": -1}},
-            {"$limit": 5}
-        ]
-        
-        cursor = user_answers_collection.aggregate(pipeline)
-        return await cursor.to_list(length=5)
-
-    def _get_consecutive_correct(self, answers: List[Dict]) -> int:
-        """Get the number of consecutive correct answers"""
-        count = 0
-        for answer in reversed(answers):  # Start from most recent
-            if answer["is_correct"]:
-                count += 1
-            else:
-                break
-        return count
-
-    def _get_consecutive_incorrect(self, answers: List[Dict]) -> int:
-        """Get the number of consecutive incorrect answers"""
-        count = 0
-        for answer in reversed(answers):  # Start from most recent
-            if not answer["is_correct"]:
-                count += 1
-            else:
-                break
-        return count
-
     def _increase_difficulty(self, current_difficulty: str) -> str:
         """Increase difficulty level"""
         difficulty_map = {"easy": "medium", "medium": "hard", "hard": "hard"}
@@ -139,18 +149,149 @@ class AdaptiveLogic:
 
     async def get_question_recommendations(self, user_id: str, topic: str, num_questions: int = 10) -> List[str]:
         """Get recommended questions based on user's adaptive profile"""
-        performance = await self.get_user_performance_history(user_id, topic)
-        recommended_difficulty = await self.determine_next_difficulty(user_id, topic, performance.get("recent_difficulty", "medium"))
+        if self.estimator == "irt":
+            # Most informative questions for the learner's current ability
+            return await ability_engine.recommend(user_id, topic, num_questions)
+        states = await self._get_topic_skill_states(user_id, topic)
+        performance = self._summarize_performance(states)
+        current_difficulty = performance.get("recent_difficulty", "medium")
+        recommended_difficulty = self._next_difficulty(states.get(current_difficulty), current_difficulty)
         
-        # Get questions of the recommended difficulty
-        from database.mongo import questions_collection
-        cursor = questions_collection.find({
-            "topic": topic,
-            "difficulty": recommended_difficulty
-        }).limit(num_questions)
+        # Sample unseen questions of the recommended difficulty from the in-memory pool
+        return question_pool_index.sample(topic, recommended_difficulty, num_questions, user_id)
+
+    async def get_batch_recommendations(self, user_ids: List[str], topic: str,
+                                        num_questions: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Recommendations for many learners at once (class assignments, pre-generation)
+        
+        One skill state query covers every user (the recent outcomes kept on those
+        documents are the answer history the streak rules need). Next difficulties
+        are computed for all users together, and questions come from the in-memory
+        pools. Returns {user_id: {"difficulty", "question_ids"}}.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if self.estimator == "irt":
+            return await ability_engine.recommend_many(user_ids, topic, num_questions)
+        
+        # Outcome times come back as epoch milliseconds, so no datetimes are built per outcome
+        pipeline = [
+            {"$match": {"user_id": {"$in": user_ids}, "topic": topic}},
+            {"$project": {
+                "_id": 0,
+                "user_id": 1,
+                "difficulty": 1,
+                "total_answered": 1,
+                "consecutive_correct": 1,
+                "consecutive_incorrect": 1,
+                "recent_times": {"$map": {
+                    "input": {"$ifNull": ["$recent_outcomes", []]},
+                    "in": {"$subtract": ["$$this.timestamp", EPOCH]}
+                }}
+            }}
+        ]
+        cursor = skill_state_collection.aggregate(pipeline, comment="adaptive.batch_recommendations")
+        states = await cursor.to_list(length=None)
+        
+        difficulties = self._next_difficulties(user_ids, states)
+        return {
+            user_id: {
+                "difficulty": difficulty,
+                "question_ids": question_pool_index.sample(topic, difficulty, num_questions, user_id)
+            }
+            for user_id, difficulty in zip(user_ids, difficulties)
+        }
+
+    def _next_difficulties(self, user_ids: List[str], states: List[Dict[str, Any]]) -> List[str]:
+        """
+        Vectorized _summarize_performance + _next_difficulty over many users' skill states
+        
+        states are skill state documents whose recent outcomes are reduced to
+        recent_times (epoch milliseconds).
+        """
+        users = len(user_ids)
+        levels = len(self.difficulty_levels)
+        owner_of = {user_id: owner for owner, user_id in enumerate(user_ids)}
+        level_of = {difficulty: level for level, difficulty in enumerate(self.difficulty_levels)}
         
-        questions = await cursor.to_list(length=num_questions)
-        return [str(q["_id"]) for q in questions]
+        # One entry per kept outcome; difficulties outside the levels count as medium
+        owners, outcome_levels, times = [], [], []
+        cells, counters = [], []
+        for state in states:
+            owner = owner_of[state["user_id"]]
+            level = level_of.get(state["difficulty"])
+            recent_times = state.get("recent_times") or []
+            owners.extend([owner] * len(recent_times))
+            outcome_levels.extend([1 if level is None else level] * len(recent_times))
+            times.extend(recent_times)
+            if level is not None:
+                cells.append(owner * levels + level)
+                counters.append((state.get("total_answered", 0), state.get("consecutive_correct", 0),
+                                 state.get("consecutive_incorrect", 0)))
+        
+        # Newest recent_window outcomes per user -> average level -> current difficulty
+        current = np.ones(users, dtype=np.int64)
+        if owners:
+            owners = np.array(owners, dtype=np.int64)
+            outcome_levels = np.array(outcome_levels, dtype=np.float64)
+            order = np.lexsort((-np.array(times, dtype=np.float64), owners))
+            owners, outcome_levels = owners[order], outcome_levels[order]
+            first = np.searchsorted(owners, owners, side="left")
+            recent = np.arange(len(owners)) - first < self.recent_window
+            counts = np.bincount(owners[recent], minlength=users)
+            sums = np.bincount(owners[recent], weights=outcome_levels[recent], minlength=users)
+            average = np.divide(sums, counts, out=np.ones(users), where=counts > 0)
+            # Same cut points as _calculate_average_difficulty (scores 1-3 are levels 0-2)
+            current = np.digitize(average, [0.5, 1.5])
+        
+        # (total, correct streak, incorrect streak) per user and level, read at the current level
+        table = np.zeros((users * levels, 3), dtype=np.int64)
+        if cells:
+            table[np.array(cells, dtype=np.int64)] = np.array(counters, dtype=np.int64)
+        total, correct_streak, incorrect_streak = table[np.arange(users) * levels + current].T
+        enough = total >= self.min_answers_at_difficulty
+        increase = enough & (correct_streak >= self.correct_threshold)
+        decrease = enough & ~increase & (incorrect_streak >= self.incorrect_threshold)
+        next_levels = np.clip(current + increase - decrease, 0, levels - 1)
+        return [self.difficulty_levels[level] for level in next_levels]
+
+    async def rebuild_skill_state(self, user_id: str) -> int:
+        """Recompute a user's skill state documents from their full answer history"""
+        pipeline = [
+            {"$match": {"user_id": user_id, "topic": {"$ne": None}}},
+            {"$sort": {"timestamp": 1}},
+            {"$project": {
+                "topic": 1,
+                "difficulty": 1,
+                "is_correct": 1,
+                "timestamp": 1
+            }}
+        ]
+        
+        states: Dict[tuple, SkillStateModel] = {}
+        async for answer in user_answers_collection.aggregate(pipeline, comment="adaptive.rebuild_skill_state"):
+            key = (answer["topic"], answer["difficulty"])
+            state = states.setdefault(key, SkillStateModel(user_id, answer["topic"], answer["difficulty"]))
+            self._apply_outcome(state, answer["is_correct"], answer["timestamp"])
+        
+        await skill_state_collection.delete_many({"user_id": user_id})
+        if states:
+            await skill_state_collection.insert_many([state.to_dict() for state in states.values()])
+        return len(states)
+
+    def _apply_outcome(self, state: SkillStateModel, is_correct: bool, timestamp: datetime) -> None:
+        """In-memory counterpart of _skill_state_update"""
+        state.total_answered += 1
+        if is_correct:
+            state.correct_count += 1
+            state.consecutive_correct += 1
+            state.consecutive_incorrect = 0
+        else:
+            state.consecutive_incorrect += 1
+            state.consecutive_correct = 0
+        state.recent_outcomes.append({"is_correct": is_correct, "timestamp": timestamp})
+        state.recent_outcomes = state.recent_outcomes[-self.recent_window:]
+        state.updated_at = timestamp
 
 # Global instance
-adaptive_logic = AdaptiveLogic() 
\ No newline at end of file
+adaptive_logic = AdaptiveLogic()
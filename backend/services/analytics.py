@@ -1,166 +1,272 @@
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from database.mongo import user_answers_collection, quiz_attempts_collection, questions_collection
+from config.settings import settings
+from services.snapshot import AnswerSnapshot
+from services.versions import data_versions
+from database.mongo import (
+    user_answers_collection, quiz_attempts_collection, questions_collection,
+    daily_topic_rollup_collection, hourly_topic_rollup_collection, daily_user_rollup_collection
+)
 from bson import ObjectId
 import asyncio
+import time
+import numpy as np
+
+# Counters kept on every rollup document (see services/rollups.py)
+ROLLUP_COUNTERS = [
+    "answers", "correct_answers", "time_taken_total", "timed_answers",
+    "attempts", "scored_attempts", "score_total"
+]
+
+EMPTY_TRENDS = {"daily_performance": [], "overall_trend": "insufficient_data"}
 
 class AnalyticsService:
-    def __init__(self):
-        pass
+    def __init__(self, max_concurrency: int = settings.ANALYTICS_MAX_CONCURRENCY,
+                 section_timeout: float = settings.ANALYTICS_SECTION_TIMEOUT_SECONDS,
+                 single_pass: bool = settings.ANALYTICS_SINGLE_PASS):
+        self.max_concurrency = max_concurrency
+        self.section_timeout = section_timeout
+        # Build the user dashboard from one $facet aggregation instead of one query per section
+        self.single_pass = single_pass
+
+    def user_analytics_etag(self, user_id: str) -> str:
+        """Changes when the user's answers or attempts are written (see services/ingestion.py)"""
+        return data_versions.etag(("answers", user_id), variant=self.single_pass)
+
+    def admin_analytics_etag(self, days: int) -> str:
+        """Changes with any answer, attempt, question or user write, and every hour (the dashboard's windows move)"""
+        hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        return data_versions.etag(("answers", None), ("questions", None), ("users", None), variant=(days, hour))
 
     async def get_user_analytics(self, user_id: str) -> Dict:
         """Get comprehensive analytics for a specific user"""
-        # Get basic stats
-        total_quizzes = await self._get_total_quizzes(user_id)
-        total_questions = await self._get_total_questions_answered(user_id)
-        average_score = await self._get_average_score(user_id)
-        accuracy_rate = await self._get_accuracy_rate(user_id)
-        
-        # Get topic-wise performance
-        topic_performance = await self._get_topic_performance(user_id)
-        
-        # Get difficulty-wise performance
-        difficulty_performance = await self._get_difficulty_performance(user_id)
-        
-        # Get recent activity
-        recent_activity = await self._get_recent_activity(user_id)
-        
-        # Get improvement trends
-        improvement_trends = await self._get_improvement_trends(user_id)
+        if self.single_pass:
+            sections = await self._run_sections({
+                # Totals, topic, difficulty and trends from one $facet aggregation
+                "rollup_facets": (lambda: self._get_user_sections_single_pass(user_id), {}),
+                # Get recent activity
+                "recent_activity": (lambda: self._get_recent_activity(user_id), [])
+            })
+            facets = sections.pop("rollup_facets")
+            sections.update({
+                "totals": facets.get("totals"),
+                "topic_performance": facets.get("topic_performance", []),
+                "difficulty_performance": facets.get("difficulty_performance", []),
+                "improvement_trends": facets.get("improvement_trends", EMPTY_TRENDS)
+            })
+        else:
+            sections = await self._run_sections({
+                # Get basic stats (one read of the user's rollup rows)
+                "totals": (lambda: self._get_user_totals(user_id), None),
+                # Get topic-wise and difficulty-wise performance
+                "topic_performance": (lambda: self._get_topic_performance(user_id), []),
+                "difficulty_performance": (lambda: self._get_difficulty_performance(user_id), []),
+                # Get recent activity
+                "recent_activity": (lambda: self._get_recent_activity(user_id), []),
+                # Get improvement trends
+                "improvement_trends": (lambda: self._get_improvement_trends(user_id), EMPTY_TRENDS)
+            })
         
+        totals = sections.pop("totals") or {field: 0 for field in ROLLUP_COUNTERS}
         return {
-            "total_quizzes": total_quizzes,
-            "total_questions_answered": total_questions,
-            "average_score": average_score,
-            "accuracy_rate": accuracy_rate,
-            "topic_performance": topic_performance,
-            "difficulty_performance": difficulty_performance,
-            "recent_activity": recent_activity,
-            "improvement_trends": improvement_trends
+            "total_quizzes": totals["attempts"],
+            "total_questions_answered": totals["answers"],
+            "average_score": self._get_average_score(totals),
+            "accuracy_rate": self._get_accuracy_rate(totals),
+            **sections
         }
 
-    async def get_admin_analytics(self) -> Dict:
-        """Get analytics for admin dashboard"""
-        # Overall platform stats
-        total_users = await self._get_total_users()
-        total_questions = await self._get_total_questions()
-        total_quiz_attempts = await self._get_total_quiz_attempts()
+    async def get_admin_analytics(self, days: int = 30) -> Dict:
+        """Get analytics for admin dashboard over the last N days"""
+        return await self._run_sections({
+            # Overall platform stats
+            "total_users": (self._get_total_users, 0),
+            "total_questions": (self._get_total_questions, 0),
+            "total_quiz_attempts": (self._get_total_quiz_attempts, 0),
+            # Performance metrics
+            "average_platform_score": (lambda: self._get_platform_average_score(days), 0.0),
+            "popular_topics": (lambda: self._get_popular_topics(days), []),
+            # Recent activity
+            "recent_quizzes": (self._get_recent_quizzes, []),
+            "active_users": (self._get_active_users, 0),
+            "hourly_activity": (self._get_hourly_activity, [])
+        })
+
+    async def _run_sections(self, sections: Dict[str, Tuple[Callable[[], Awaitable], Any]]) -> Dict:
+        """
+        Run independent dashboard queries concurrently.
         
-        # Performance metrics
-        average_platform_score = await self._get_platform_average_score()
-        popular_topics = await self._get_popular_topics()
+        At most max_concurrency queries are in flight at once and each one gets
+        section_timeout seconds. A section that times out or fails is replaced by
+        its fallback value so the rest of the dashboard is still returned; its
+        status and duration are reported under "section_timings".
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        timings: Dict[str, Dict] = {}
+
+        async def run(name: str, query: Callable[[], Awaitable], fallback: Any) -> Any:
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(query(), timeout=self.section_timeout)
+                    status = "ok"
+                except asyncio.TimeoutError:
+                    result, status = fallback, "timeout"
+                except Exception as e:
+                    result, status = fallback, f"error: {type(e).__name__}"
+                timings[name] = {
+                    "status": status,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+                }
+                return result
         
-        # Recent activity
-        recent_quizzes = await self._get_recent_quizzes()
-        active_users = await self._get_active_users()
+        names = list(sections)
+        results = await asyncio.gather(*(run(name, *sections[name]) for name in names))
         
-        return {
-            "total_users": total_users,
-            "total_questions": total_questions,
-            "total_quiz_attempts": total_quiz_attempts,
-            "average_platform_score": average_platform_score,
-            "popular_topics": popular_topics,
-            "recent_quizzes": recent_quizzes,
-            "active_users": active_users
-        }
+        response = dict(zip(names, results))
+        response["section_timings"] = timings
+        return response
+
+    def get_history_performance(self, snapshot: AnswerSnapshot, start: Optional[datetime] = None,
+                                end: Optional[datetime] = None) -> List[Dict]:
+        """
+        Accuracy and answer time per topic and difficulty over the full history
 
-    async def _get_total_quizzes(self, user_id: str) -> int:
-        """Get total number of quizzes taken by user"""
-        count = await quiz_attempts_collection.count_documents({"user_id": user_id})
-        return count
+        Reads the columnar answer snapshot (services/snapshot.py) instead of
+        MongoDB: one bincount pass over the memory-mapped columns.
+        """
+        columns = snapshot.load(["topic", "difficulty", "is_correct", "time_taken"], start, end)
+        topic_values, difficulty_values = snapshot.dictionary("topic"), snapshot.dictionary("difficulty")
+        # Code -1 (missing) goes to the extra last slot of each dimension
+        topics = np.where(columns["topic"] >= 0, columns["topic"], len(topic_values))
+        difficulties = np.where(columns["difficulty"] >= 0, columns["difficulty"], len(difficulty_values))
+        groups = topics.astype(np.int64) * (len(difficulty_values) + 1) + difficulties
+        size = (len(topic_values) + 1) * (len(difficulty_values) + 1)
+        answers = np.bincount(groups, minlength=size)
+        correct = np.bincount(groups, weights=columns["is_correct"], minlength=size)
+        timed = columns["time_taken"] >= 0
+        timed_answers = np.bincount(groups[timed], minlength=size)
+        time_total = np.bincount(groups[timed], weights=columns["time_taken"][timed], minlength=size)
 
-    async def _get_total_questions_answered(self, user_id: str) -> int:
-        """Get total number of questions answered by user"""
-        count = await user_answers_collection.count_documents({"user_id": user_id})
-        return count
+        performance = []
+        for group in np.flatnonzero(answers):
+            topic, difficulty = divmod(int(group), len(difficulty_values) + 1)
+            performance.append({
+                "topic": topic_values[topic] if topic < len(topic_values) else None,
+                "difficulty": difficulty_values[difficulty] if difficulty < len(difficulty_values) else None,
+                "total_questions": int(answers[group]),
+                "correct_answers": int(correct[group]),
+                "accuracy": float(correct[group] / answers[group]),
+                "average_time": float(time_total[group] / timed_answers[group]) if timed_answers[group] else None
+            })
+        return performance
 
-    async def _get_average_score(self, user_id: str) -> float:
+    def _get_average_score(self, totals: Dict) -> float:
         """Get average score for user"""
+        if totals["scored_attempts"] == 0:
+            return 0.0
+        
+        return totals["score_total"] / totals["scored_attempts"]
+
+    def _get_accuracy_rate(self, totals: Dict) -> float:
+        """Get accuracy rate for user"""
+        if totals["answers"] == 0:
+            return 0.0
+        
+        return totals["correct_answers"] / totals["answers"]
+
+    async def _get_user_totals(self, user_id: str) -> Dict:
+        """Sum a user's daily rollup rows into lifetime counters"""
         pipeline = [
-            {"$match": {"user_id": user_id, "score": {"$exists": True}}},
-            {"$group": {"_id": None, "avg_score": {"$avg": "$score"}}}
+            {"$match": {"user_id": user_id}},
+            self._totals_stage()
         ]
         
-        cursor = quiz_attempts_collection.aggregate(pipeline)
+        cursor = daily_user_rollup_collection.aggregate(pipeline, comment="analytics.user_totals")
         result = await cursor.to_list(length=1)
-        
-        return result[0]["avg_score"] if result else 0.0
+        return self._totals_from(result)
 
-    async def _get_accuracy_rate(self, user_id: str) -> float:
-        """Get accuracy rate for user"""
+    def _totals_stage(self) -> Dict:
+        return {"$group": {"_id": None, **{field: {"$sum": f"${field}"} for field in ROLLUP_COUNTERS}}}
+
+    def _totals_from(self, result: List[Dict]) -> Dict:
+        totals = {field: 0 for field in ROLLUP_COUNTERS}
+        if result:
+            totals.update({field: result[0][field] for field in ROLLUP_COUNTERS})
+        return totals
+
+    async def _get_user_sections_single_pass(self, user_id: str, days: int = 30) -> Dict:
+        """
+        Compute totals, topic, difficulty and trend sections in one aggregation.
+        
+        The user's rollup rows are matched once and fanned out with $facet
+        instead of being re-read by four separate queries.
+        """
         pipeline = [
             {"$match": {"user_id": user_id}},
-            {"$group": {
-                "_id": None,
-                "total_answers": {"$sum": 1},
-                "correct_answers": {"$sum": {"$cond": ["$is_correct", 1, 0]}}
+            {"$facet": {
+                "totals": [self._totals_stage()],
+                "topic_performance": self._performance_stages("$topic", "topic"),
+                "difficulty_performance": self._performance_stages("$difficulty", "difficulty"),
+                "daily_performance": self._trend_stages(self._start_of_window(days))
             }}
         ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
-        result = await cursor.to_list(length=1)
-        
-        if not result or result[0]["total_answers"] == 0:
-            return 0.0
+        cursor = daily_user_rollup_collection.aggregate(pipeline, comment="analytics.user_sections_single_pass")
+        facets = (await cursor.to_list(length=1))[0]
         
-        return result[0]["correct_answers"] / result[0]["total_answers"]
+        return {
+            "totals": self._totals_from(facets["totals"]),
+            "topic_performance": facets["topic_performance"],
+            "difficulty_performance": facets["difficulty_performance"],
+            "improvement_trends": {
+                "daily_performance": facets["daily_performance"],
+                "overall_trend": self._calculate_trend(facets["daily_performance"])
+            }
+        }
 
-    async def _get_topic_performance(self, user_id: str) -> List[Dict]:
-        """Get performance by topic"""
-        pipeline = [
-            {"$match": {"user_id": user_id}},
-            {"$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "question"
-            }},
-            {"$unwind": "$question"},
+    def _performance_stages(self, group_id, label: str) -> List[Dict]:
+        """$group/$project stages turning rollup counters into accuracy and average time"""
+        return [
             {"$group": {
-                "_id": "$question.topic",
-                "total_questions": {"$sum": 1},
-                "correct_answers": {"$sum": {"$cond": ["$is_correct", 1, 0]}},
-                "avg_time": {"$avg": "$time_taken"}
+                "_id": group_id,
+                "total_questions": {"$sum": "$answers"},
+                "correct_answers": {"$sum": "$correct_answers"},
+                "time_taken_total": {"$sum": "$time_taken_total"},
+                "timed_answers": {"$sum": "$timed_answers"}
             }},
+            {"$match": {"total_questions": {"$gt": 0}}},
             {"$project": {
-                "topic": "$_id",
+                label: "$_id",
                 "total_questions": 1,
                 "correct_answers": 1,
                 "accuracy": {"$divide": ["$correct_answers", "$total_questions"]},
-                "avg_time": 1
+                "avg_time": {"$cond": [
+                    {"$gt": ["$timed_answers", 0]},
+                    {"$divide": ["$time_taken_total", "$timed_answers"]},
+                    None
+                ]}
             }}
         ]
+
+    async def _get_topic_performance(self, user_id: str) -> List[Dict]:
+        """Get performance by topic"""
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            *self._performance_stages("$topic", "topic")
+        ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
+        cursor = daily_user_rollup_collection.aggregate(pipeline, comment="analytics.topic_performance")
         return await cursor.to_list(length=None)
 
     async def _get_difficulty_performance(self, user_id: str) -> List[Dict]:
         """Get performance by difficulty level"""
         pipeline = [
             {"$match": {"user_id": user_id}},
-            {"$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "question"
-            }},
-            {"$unwind": "$question"},
-            {"$group": {
-                "_id": "$question.difficulty",
-                "total_questions": {"$sum": 1},
-                "correct_answers": {"$sum": {"$cond": ["$is_correct", 1, 0]}},
-                "avg_time": {"$avg": "$time_taken"}
-            }},
-            {"$project": {
-                "difficulty": "$_id",
-                "total_questions": 1,
-                "correct_answers": 1,
-                "accuracy": {"$divide": ["$correct_answers", "$total_questions"]},
-                "avg_time": 1
-            }}
+            *self._performance_stages("$difficulty", "difficulty")
         ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
+        cursor = daily_user_rollup_collection.aggregate(pipeline, comment="analytics.difficulty_performance")
         return await cursor.to_list(length=None)
 
     async def _get_recent_activity(self, user_id: str, days: int = 7) -> List[Dict]:
@@ -172,57 +278,42 @@ class AnalyticsService:
                 "user_id": user_id,
                 "timestamp": {"$gte": start_date}
             }},
+            {"$sort": {"timestamp": -1}},
+            {"$limit": 20},
+            # Only the content needs the question document, so join the 20 rows kept
+            {"$addFields": {"question_oid": {
+                "$convert": {"input": "$question_id", "to": "objectId", "onError": "$question_id"}
+            }}},
             {"$lookup": {
                 "from": "questions",
-                "localField": "question_id",
+                "localField": "question_oid",
                 "foreignField": "_id",
                 "as": "question"
             }},
             {"$unwind": "$question"},
-            {"$sort": {"timestamp": -1}},
-            {"$limit": 20},
             {"$project": {
                 "question_content": "$question.content",
-                "topic": "$question.topic",
-                "difficulty": "$question.difficulty",
+                "topic": 1,
+                "difficulty": 1,
                 "is_correct": 1,
                 "time_taken": 1,
                 "timestamp": 1
             }}
         ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
+        cursor = user_answers_collection.aggregate(pipeline, comment="analytics.recent_activity")
         return await cursor.to_list(length=20)
 
     async def _get_improvement_trends(self, user_id: str, days: int = 30) -> Dict:
         """Get improvement trends over time"""
-        start_date = datetime.utcnow() - timedelta(days=days)
+        start_date = self._start_of_window(days)
         
         pipeline = [
-            {"$match": {
-                "user_id": user_id,
-                "timestamp": {"$gte": start_date}
-            }},
-            {"$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "question"
-            }},
-            {"$unwind": "$question"},
-            {"$group": {
-                "_id": {
-                    "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                    "topic": "$question.topic"
-                },
-                "total_questions": {"$sum": 1},
-                "correct_answers": {"$sum": {"$cond": ["$is_correct", 1, 0]}},
-                "avg_time": {"$avg": "$time_taken"}
-            }},
-            {"$sort": {"_id.date": 1}}
+            {"$match": {"user_id": user_id}},
+            *self._trend_stages(start_date)
         ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
+        cursor = daily_user_rollup_collection.aggregate(pipeline, comment="analytics.improvement_trends")
         trends = await cursor.to_list(length=None)
         
         return {
@@ -230,6 +321,35 @@ class AnalyticsService:
             "overall_trend": self._calculate_trend(trends)
         }
 
+    def _trend_stages(self, start_date: datetime) -> List[Dict]:
+        """Stages grouping a user's rollup rows into per-day, per-topic performance"""
+        return [
+            {"$match": {"date": {"$gte": start_date}}},
+            {"$group": {
+                "_id": {
+                    "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+                    "topic": "$topic"
+                },
+                "total_questions": {"$sum": "$answers"},
+                "correct_answers": {"$sum": "$correct_answers"},
+                "time_taken_total": {"$sum": "$time_taken_total"},
+                "timed_answers": {"$sum": "$timed_answers"}
+            }},
+            {"$match": {"total_questions": {"$gt": 0}}},
+            {"$addFields": {"avg_time": {"$cond": [
+                {"$gt": ["$timed_answers", 0]},
+                {"$divide": ["$time_taken_total", "$timed_answers"]},
+                None
+            ]}}},
+            {"$project": {"time_taken_total": 0, "timed_answers": 0}},
+            {"$sort": {"_id.date": 1}}
+        ]
+
+    def _start_of_window(self, days: int) -> datetime:
+        """Midnight (UTC) of the first day in a window of the last N days"""
+        start = datetime.utcnow() - timedelta(days=days)
+        return start.replace(hour=0, minute=0, second=0, microsecond=0)
+
     def _calculate_trend(self, trends: List[Dict]) -> str:
         """Calculate overall trend (improving, declining, stable)"""
         if len(trends) < 2:
@@ -248,74 +368,95 @@ class AnalyticsService:
             return "declining"
         else:
             return "stable"
-
+    
     # Admin analytics methods
     async def _get_total_users(self) -> int:
         """Get total number of users"""
         from database.mongo import users_collection
-        return await users_collection.count_documents({})
+        return await users_collection.estimated_document_count(comment="analytics.total_users")
 
     async def _get_total_questions(self) -> int:
         """Get total number of questions"""
-        return await questions_collection.count_documents({})
+        return await questions_collection.estimated_document_count(comment="analytics.total_questions")
 
     async def _get_total_quiz_attempts(self) -> int:
         """Get total number of quiz attempts"""
-        return await quiz_attempts_collection.count_documents({})
+        return await quiz_attempts_collection.estimated_document_count(comment="analytics.total_quiz_attempts")
 
-    async def _get_platform_average_score(self) -> float:
-        """Get average score across all users"""
+    async def _get_platform_average_score(self, days: int = 30) -> float:
+        """Get average score across all users over the last N days"""
         pipeline = [
-            {"$match": {"score": {"$exists": True}}},
-            {"$group": {"_id": None, "avg_score": {"$avg": "$score"}}}
+            {"$match": {"date": {"$gte": self._start_of_window(days)}}},
+            {"$group": {
+                "_id": None,
+                "score_total": {"$sum": "$score_total"},
+                "scored_attempts": {"$sum": "$scored_attempts"}
+            }}
         ]
         
-        cursor = quiz_attempts_collection.aggregate(pipeline)
+        cursor = daily_topic_rollup_collection.aggregate(pipeline, comment="analytics.platform_average_score")
         result = await cursor.to_list(length=1)
         
-        return result[0]["avg_score"] if result else 0.0
+        if not result or result[0]["scored_attempts"] == 0:
+            return 0.0
+        
+        return result[0]["score_total"] / result[0]["scored_attempts"]
 
-    async def _get_popular_topics(self) -> List[Dict]:
-        """Get most popular topics"""
+    async def _get_popular_topics(self, days: int = 30) -> List[Dict]:
+        """Get most popular topics over the last N days"""
         pipeline = [
-            {"$lookup": {
-                "from": "questions",
-                "localField": "question_id",
-                "foreignField": "_id",
-                "as": "question"
-            }},
-            {"$unwind": "$question"},
+            {"$match": {"date": {"$gte": self._start_of_window(days)}}},
             {"$group": {
-                "_id": "$question.topic",
-                "total_attempts": {"$sum": 1},
-                "avg_accuracy": {"$avg": {"$cond": ["$is_correct", 1, 0]}}
+                "_id": "$topic",
+                "total_attempts": {"$sum": "$answers"},
+                "correct_answers": {"$sum": "$correct_answers"}
+            }},
+            {"$match": {"total_attempts": {"$gt": 0}}},
+            {"$project": {
+                "total_attempts": 1,
+                "avg_accuracy": {"$divide": ["$correct_answers", "$total_attempts"]}
             }},
             {"$sort": {"total_attempts": -1}},
             {"$limit": 10}
         ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
+        cursor = daily_topic_rollup_collection.aggregate(pipeline, comment="analytics.popular_topics")
         return await cursor.to_list(length=10)
 
     async def _get_recent_quizzes(self, limit: int = 10) -> List[Dict]:
         """Get recent quiz attempts"""
-        cursor = quiz_attempts_collection.find().sort("started_at", -1).limit(limit)
+        cursor = quiz_attempts_collection.find(comment="analytics.recent_quizzes").sort("started_at", -1).limit(limit)
         return await cursor.to_list(length=limit)
 
     async def _get_active_users(self, days: int = 7) -> int:
         """Get number of active users in the last N days"""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
         pipeline = [
-            {"$match": {"timestamp": {"$gte": start_date}}},
+            {"$match": {"date": {"$gte": self._start_of_window(days)}, "answers": {"$gt": 0}}},
             {"$group": {"_id": "$user_id"}},
             {"$count": "active_users"}
         ]
         
-        cursor = user_answers_collection.aggregate(pipeline)
+        cursor = daily_user_rollup_collection.aggregate(pipeline, comment="analytics.active_users")
         result = await cursor.to_list(length=1)
         
         return result[0]["active_users"] if result else 0
 
+    async def _get_hourly_activity(self, hours: int = 24) -> List[Dict]:
+        """Get answer volume and accuracy per hour for the last N hours"""
+        start_hour = (datetime.utcnow() - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+        
+        pipeline = [
+            {"$match": {"hour": {"$gte": start_hour}}},
+            {"$group": {
+                "_id": "$hour",
+                "total_answers": {"$sum": "$answers"},
+                "correct_answers": {"$sum": "$correct_answers"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        
+        cursor = hourly_topic_rollup_collection.aggregate(pipeline, comment="analytics.hourly_activity")
+        return await cursor.to_list(length=None)
+
 # Global instance
 analytics_service = AnalyticsService() 
\ No newline at end of file
@@ -1,13 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
-from bson import ObjectId
 
 from models.user import UserInDB
-from utils.auth import get_password_hash, verify_password, create_access_token
-from config.database import users_collection
+from utils.auth import get_password_hash_async, verify_password_async, create_access_token
+from storage import get_collection
+from services.user_cache import user_cache
+from services.versions import data_versions
 from schemas.user import UserCreate, UserOut, Token
 
+users_collection = get_collection("users")
+
 class AuthService:
     """Authentication service for user management"""
     
@@ -40,16 +43,17 @@ class AuthService:
         user = UserInDB(
             name=user_data.name,
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await get_password_hash_async(user_data.password),
             role=user_data.role.value
         )
         
         # Insert into database
-        result = await users_collection.insert_one(user.to_dict())
+        user_id = await users_collection.insert_one(user.to_dict())
+        data_versions.bump("users")
         
         return {
             "message": "User registered successfully",
-            "user_id": str(result["inserted_id"]),
+            "user_id": user_id,
             "email": user_data.email
         }
     
@@ -73,7 +77,7 @@ class AuthService:
             return None
         
         # Verify password
-        if not verify_password(password, user_data["password_hash"]):
+        if not await verify_password_async(password, user_data["password_hash"]):
             return None
         
         # Check if user is active
@@ -146,12 +150,15 @@ class AuthService:
         Returns:
             User data if found, None otherwise
         """
-        # JSON database is always available
+        cached = user_cache.get(email)
+        if cached is not None:
+            return cached
         
         user_data = await users_collection.find_one({"email": email})
         if not user_data:
             return None
         
+        user_cache.put(user_data)
         return user_data
     
     @staticmethod
@@ -166,7 +173,7 @@ class AuthService:
             User data if found, None otherwise
         """
         try:
-            user_data = await users_collection.find_one({"_id": ObjectId(user_id)})
+            user_data = await users_collection.find_one({"_id": user_id})
             if not user_data:
                 return None
             
@@ -191,18 +198,23 @@ class AuthService:
             update_data["updated_at"] = datetime.utcnow()
             
             # Update user
-            result = await users_collection.update_one(
-                {"_id": ObjectId(user_id)},
+            modified_count = await users_collection.update_one(
+                {"_id": user_id},
                 {"$set": update_data}
             )
             
-            if result.modified_count == 0:
+            if modified_count == 0:
                 return None
             
             # Get updated user data
-            updated_user = await users_collection.find_one({"_id": ObjectId(user_id)})
+            updated_user = await users_collection.find_one({"_id": user_id})
+            if updated_user:
+                user_cache.put(updated_user)
+            else:
+                user_cache.invalidate(user_id=user_id)
             return updated_user
         except Exception:
+            user_cache.invalidate(user_id=user_id)
             return None
     
     @staticmethod
@@ -220,20 +232,20 @@ class AuthService:
         """
         try:
             # Get user data
-            user_data = await users_collection.find_one({"_id": ObjectId(user_id)})
+            user_data = await users_collection.find_one({"_id": user_id})
             if not user_data:
                 return False
             
             # Verify old password
-            if not verify_password(old_password, user_data["password_hash"]):
+            if not await verify_password_async(old_password, user_data["password_hash"]):
                 return False
             
             # Hash new password
-            new_password_hash = get_password_hash(new_password)
+            new_password_hash = await get_password_hash_async(new_password)
             
             # Update password
-            result = await users_collection.update_one(
-                {"_id": ObjectId(user_id)},
+            modified_count = await users_collection.update_one(
+                {"_id": user_id},
                 {
                     "$set": {
                         "password_hash": new_password_hash,
@@ -242,6 +254,12 @@ class AuthService:
                 }
             )
             
-            return result.modified_count > 0
+            # The cached document still holds the old hash
+            user_cache.invalidate(email=user_data["email"], user_id=user_id)
+            
+            return modified_count > 0
+        except HTTPException:
+            # Hashing pool saturated (429); let the caller see it
+            raise
         except Exception:
             return False 
\ No newline at end of file
@@ -0,0 +1,128 @@
+import csv
+import io
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+from config.settings import settings
+from database.mongo import quiz_attempts_collection, user_answers_collection
+from utils.responses import dumps
+
+# Exportable collection -> where it lives, its time field and the CSV columns
+EXPORTS: Dict[str, Dict[str, Any]] = {
+    "answers": {
+        "collection": user_answers_collection,
+        "time_field": "timestamp",
+        "columns": ["_id", "user_id", "quiz_id", "question_id", "topic", "difficulty",
+                    "selected_option", "is_correct", "time_taken", "timestamp"],
+    },
+    "attempts": {
+        "collection": quiz_attempts_collection,
+        "time_field": "started_at",
+        "columns": ["_id", "user_id", "topic", "difficulty", "questions", "score", "total_questions",
+                    "started_at", "ended_at"],
+    },
+}
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored times are naive UTC; convert an aware bound so the two can be compared"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class ExportService:
+    """
+    Streams user_answers / quiz_attempts as NDJSON or CSV in bounded memory.
+
+    Documents come off a Motor cursor batch_size at a time and each batch is
+    encoded into one chunk, so memory stays proportional to the batch size
+    whatever the export's length. Rows are in time order, read through the
+    time indexes (no server-side sort of the whole result).
+    """
+
+    def __init__(self, batch_size: int, gzip_level: int):
+        self.batch_size = batch_size
+        self.gzip_level = gzip_level
+
+    def query(self, kind: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              topic: Optional[str] = None, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Filter for an export: [start, end) on the time field, plus topic and user"""
+        query: Dict[str, Any] = {}
+        start, end = naive_utc(start), naive_utc(end)
+        time_range = {}
+        if start is not None:
+            time_range["$gte"] = start
+        if end is not None:
+            time_range["$lt"] = end
+        if time_range:
+            query[EXPORTS[kind]["time_field"]] = time_range
+        if topic is not None:
+            query["topic"] = topic
+        if user_id is not None:
+            query["user_id"] = user_id
+        return query
+
+    async def batches(self, kind: str, query: Dict[str, Any]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """The matching documents, batch_size at a time"""
+        export = EXPORTS[kind]
+        cursor = export["collection"].find(
+            query, batch_size=self.batch_size, comment=f"export.{kind}"
+        ).sort(export["time_field"], 1)
+        batch = []
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def ndjson(self, kind: str, query: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """One JSON document per line; ObjectIds as strings, datetimes in ISO 8601"""
+        async for batch in self.batches(kind, query):
+            yield b"".join(dumps(document) + b"\n" for document in batch)
+
+    async def csv(self, kind: str, query: Dict[str, Any]) -> AsyncIterator[bytes]:
+        """A header row, then the export's columns; list fields are joined with ';'"""
+        columns = EXPORTS[kind]["columns"]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+        async for batch in self.batches(kind, query):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(document.get(column)) for column in columns] for document in batch)
+            yield buffer.getvalue().encode()
+
+    async def stream(self, kind: str, format: str, query: Dict[str, Any], gzip: bool = False) -> AsyncIterator[bytes]:
+        """Encoded chunks of an export, optionally as one gzip stream"""
+        chunks = self.ndjson(kind, query) if format == "ndjson" else self.csv(kind, query)
+        if not gzip:
+            async for chunk in chunks:
+                yield chunk
+            return
+        # wbits=31 writes the gzip header and trailer, so the output is a regular .gz file
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        async for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def filename(self, kind: str, format: str, gzip: bool = False) -> str:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        return f"{kind}-{stamp}.{format}" + (".gz" if gzip else "")
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    return value if isinstance(value, (str, int, float, bool)) else str(value)
+
+# Global instance
+export_service = ExportService(settings.EXPORT_BATCH_SIZE, settings.EXPORT_GZIP_LEVEL)
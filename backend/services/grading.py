@@ -0,0 +1,173 @@
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId
+from config.settings import settings
+from database.mongo import questions_collection
+from schemas.quiz import QuizSubmission
+from utils.cache import TTLCache
+import numpy as np
+
+# Fields of a question document needed to grade answers to it
+ANSWER_KEY_PROJECTION = {"correct_option": 1, "correct_answer": 1, "difficulty": 1, "topic": 1}
+
+def _normalize_option(option: Optional[str]) -> str:
+    return (option or "").strip().upper()
+
+class AnswerKeyTable:
+    """Cache of question id -> answer key, filled with one $in query per batch of misses"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._keys = TTLCache(max_entries, ttl_seconds)
+
+    def put(self, question: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache the answer key of a question document and return it"""
+        key = {
+            # Quiz questions use correct_option; QuestionService questions use correct_answer
+            "correct_option": _normalize_option(question.get("correct_option") or question.get("correct_answer")),
+            "difficulty": question.get("difficulty"),
+            "topic": question.get("topic")
+        }
+        self._keys.set(str(question["_id"]), key)
+        return key
+
+    def invalidate(self, question_id: str) -> None:
+        self._keys.invalidate(str(question_id))
+
+    async def load(self, question_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Answer keys for the given ids; unknown ids are left out"""
+        keys = {}
+        missing = []
+        for question_id in set(question_ids):
+            key = self._keys.get(question_id)
+            if key is None:
+                missing.append(question_id)
+            else:
+                keys[question_id] = key
+
+        if missing:
+            ids = [ObjectId(question_id) if ObjectId.is_valid(question_id) else question_id
+                   for question_id in missing]
+            cursor = questions_collection.find({"_id": {"$in": ids}}, ANSWER_KEY_PROJECTION)
+            async for question in cursor:
+                keys[str(question["_id"])] = self.put(question)
+        return keys
+
+    def stats(self) -> Dict[str, Any]:
+        return self._keys.stats()
+
+class GradingService:
+    """
+    Grades QuizSubmission payloads with NumPy.
+
+    All submissions in a call are flattened into parallel arrays (owner,
+    selected, expected, difficulty, time) and reduced with bincount, so
+    grading cost is a handful of vector operations regardless of how many
+    submissions or questions are involved. An empty selected option counts
+    as unanswered.
+    """
+
+    def __init__(self, key_table: AnswerKeyTable):
+        self.key_table = key_table
+
+    async def grade(self, submission: QuizSubmission,
+                    answer_keys: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Grade one submission"""
+        return (await self.grade_many([submission], answer_keys))[0]
+
+    async def grade_many(self, submissions: List[QuizSubmission],
+                         answer_keys: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Grade a batch of submissions (e.g. for bulk or offline re-grading)
+
+        answer_keys may be passed by callers that already hold them (an active
+        quiz session); otherwise they are loaded through the key table.
+        """
+        if answer_keys is None:
+            answer_keys = await self.key_table.load(
+                question_id for submission in submissions for question_id in submission.question_ids
+            )
+        return self._grade(submissions, answer_keys)
+
+    def _grade(self, submissions: List[QuizSubmission],
+               answer_keys: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        count = len(submissions)
+        sizes = np.array([len(submission.question_ids) for submission in submissions], dtype=np.int64)
+        owner = np.repeat(np.arange(count), sizes)
+
+        question_ids = [question_id for submission in submissions for question_id in submission.question_ids]
+        keys = [answer_keys.get(question_id) for question_id in question_ids]
+        selected = np.array([
+            _normalize_option(option) for submission in submissions
+            for option in self._padded(submission.selected_options, len(submission.question_ids), None)
+        ], dtype=str)
+        # Unknown questions expect "", which no answered option can equal
+        expected = np.array([_normalize_option(key["correct_option"]) if key else "" for key in keys], dtype=str)
+        times = np.array([
+            np.nan if time_taken is None else time_taken for submission in submissions
+            for time_taken in self._padded(submission.time_taken_per_question or [],
+                                           len(submission.question_ids), None)
+        ], dtype=np.float64)
+
+        answered = selected != ""
+        correct = answered & (selected == expected)
+
+        labels, difficulty_codes = np.unique(
+            np.array([(key or {}).get("difficulty") or "unknown" for key in keys], dtype=str),
+            return_inverse=True
+        )
+        levels = len(labels)
+        cells = owner * levels + difficulty_codes
+
+        totals = sizes
+        answered_counts = np.bincount(owner, weights=answered, minlength=count)
+        correct_counts = np.bincount(owner, weights=correct, minlength=count)
+        difficulty_totals = np.bincount(cells, minlength=count * levels).reshape(count, levels)
+        difficulty_correct = np.bincount(cells, weights=correct, minlength=count * levels).reshape(count, levels)
+
+        timed = ~np.isnan(times)
+        time_totals = np.bincount(owner, weights=np.where(timed, times, 0.0), minlength=count)
+        timed_counts = np.bincount(owner, weights=timed, minlength=count)
+        time_max = np.full(count, -np.inf)
+        np.maximum.at(time_max, owner[timed], times[timed])
+
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        unknown = np.array([key is None for key in keys], dtype=bool)
+
+        results = []
+        for index in range(count):
+            start, end = offsets[index], offsets[index + 1]
+            total = int(totals[index])
+            correct_count = int(correct_counts[index])
+            accuracy = correct_count / total if total else 0.0
+            has_times = timed_counts[index] > 0
+            results.append({
+                "total_questions": total,
+                "answered": int(answered_counts[index]),
+                "correct_count": correct_count,
+                "accuracy": accuracy,
+                "score": round(accuracy * 100),
+                "is_correct": correct[start:end].tolist(),
+                "by_difficulty": {
+                    str(label): {
+                        "total": int(difficulty_totals[index, level]),
+                        "correct": int(difficulty_correct[index, level]),
+                        "accuracy": float(difficulty_correct[index, level] / difficulty_totals[index, level])
+                    }
+                    for level, label in enumerate(labels) if difficulty_totals[index, level]
+                },
+                "time": {
+                    "total": int(time_totals[index]) if has_times else None,
+                    "mean": float(time_totals[index] / timed_counts[index]) if has_times else None,
+                    "max": int(time_max[index]) if has_times else None
+                },
+                "unknown_questions": [question_ids[start + position]
+                                      for position in np.flatnonzero(unknown[start:end])]
+            })
+        return results
+
+    def _padded(self, values: List[Any], length: int, fill: Any) -> List[Any]:
+        return list(values[:length]) + [fill] * (length - len(values))
+
+# Global instance
+grading_service = GradingService(
+    AnswerKeyTable(settings.ANSWER_KEY_CACHE_MAX_ENTRIES, settings.ANSWER_KEY_CACHE_TTL_SECONDS)
+)
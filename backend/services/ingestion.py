@@ -0,0 +1,204 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+from config.settings import settings
+from database.mongo import quiz_attempts_collection, user_answers_collection
+from models.quiz import QuizAttemptModel, UserAnswerModel
+from services.rollups import rollup_service
+from services.versions import data_versions
+import asyncio
+
+DUPLICATE_KEY = 11000
+
+class BufferedWriter:
+    """
+    Buffers documents for one collection and writes them with unordered insert_many.
+
+    A batch is flushed when batch_size documents are waiting or every
+    flush_interval seconds. add() blocks while max_buffered documents are
+    waiting (backpressure). Documents get their _id before the first attempt,
+    so a retried insert that already landed fails with a duplicate key and is
+    counted as delivered: delivery is at-least-once and never duplicates rows.
+    on_flush runs once for every delivered batch.
+    """
+
+    def __init__(self, collection, batch_size: int, flush_interval: float, max_buffered: int,
+                 max_retries: int, on_flush: Optional[Callable[[List[Dict]], Awaitable[None]]] = None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max(max_buffered, batch_size)
+        self.max_retries = max_retries
+        self.on_flush = on_flush
+        self._buffer: List[Dict[str, Any]] = []
+        self._space = asyncio.Condition()
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.delivered = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+        self.backpressure_waits = 0
+
+    async def add(self, documents: List[Dict[str, Any]]) -> None:
+        """Queue documents for writing; waits while the buffer is full"""
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+
+        async with self._space:
+            if not self._has_room(len(documents)):
+                self.backpressure_waits += 1
+                self._flush_requested.set()
+            await self._space.wait_for(lambda: self._has_room(len(documents)))
+            self._buffer.extend(documents)
+
+        if self._task is None:
+            # Not started (scripts, tests): write through
+            await self.flush()
+        elif len(self._buffer) >= self.batch_size:
+            self._flush_requested.set()
+
+    def _has_room(self, count: int) -> bool:
+        return not self._buffer or len(self._buffer) + count <= self.max_buffered
+
+    async def flush(self) -> None:
+        """Write everything buffered so far"""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                async with self._space:
+                    self._space.notify_all()
+                await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """insert_many with retries of the documents that failed"""
+        pending = batch
+        attempt = 0
+        while pending:
+            try:
+                await self.collection.insert_many(pending, ordered=False)
+                delivered, pending = pending, []
+            except BulkWriteError as e:
+                failed = {error["index"]: error["code"] for error in e.details.get("writeErrors", [])}
+                delivered = [document for index, document in enumerate(pending)
+                             if failed.get(index, DUPLICATE_KEY) == DUPLICATE_KEY]
+                pending = [document for index, document in enumerate(pending)
+                           if failed.get(index, DUPLICATE_KEY) != DUPLICATE_KEY]
+            except PyMongoError as e:
+                # Outcome unknown (network error, failover): retry the whole batch
+                delivered = []
+                print(f"⚠️  Buffered write to {self.collection.name} failed: {e}")
+
+            if delivered:
+                self.delivered += len(delivered)
+                self.batches += 1
+                await self._notify(delivered)
+
+            if pending:
+                attempt += 1
+                if attempt > self.max_retries:
+                    self.dropped += len(pending)
+                    print(f"❌ Dropped {len(pending)} {self.collection.name} documents after {self.max_retries} retries")
+                    return
+                self.retries += 1
+                await asyncio.sleep(min(0.1 * 2 ** attempt, 5.0))
+
+    async def _notify(self, documents: List[Dict[str, Any]]) -> None:
+        if self.on_flush is None:
+            return
+        try:
+            await self.on_flush(documents)
+        except Exception as e:
+            print(f"⚠️  Post-flush hook for {self.collection.name} failed: {e}")
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️  Flush of {self.collection.name} failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the flush loop after it drains the buffer"""
+        if self._task is not None:
+            self._closing = True
+            self._flush_requested.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "retries": self.retries,
+            "dropped": self.dropped,
+            "backpressure_waits": self.backpressure_waits
+        }
+
+class IngestionService:
+    """Buffered writes of quiz answers and attempts, with rollups updated per flushed batch"""
+
+    def __init__(self, batch_size: int, flush_interval: float, max_buffered: int, max_retries: int):
+        self.answers = BufferedWriter(user_answers_collection, batch_size, flush_interval, max_buffered,
+                                      max_retries, on_flush=self._answers_flushed)
+        self.attempts = BufferedWriter(quiz_attempts_collection, batch_size, flush_interval, max_buffered,
+                                       max_retries, on_flush=self._attempts_flushed)
+
+    async def submit(self, answers: List[UserAnswerModel], attempt: Optional[QuizAttemptModel] = None) -> None:
+        """Queue one quiz's answers (and its attempt) for writing"""
+        writes = []
+        if answers:
+            writes.append(self.answers.add([answer.to_dict() for answer in answers]))
+        if attempt is not None:
+            document = attempt.to_dict()
+            if attempt._id is not None:
+                document["_id"] = attempt._id
+            writes.append(self.attempts.add([document]))
+        await asyncio.gather(*writes)
+
+    async def _answers_flushed(self, documents: List[Dict]) -> None:
+        try:
+            await rollup_service.record_answers([UserAnswerModel.from_dict(document) for document in documents])
+        finally:
+            # The raw answers are written either way, so these users' analytics ETags change
+            data_versions.bump("answers", (document["user_id"] for document in documents))
+
+    async def _attempts_flushed(self, documents: List[Dict]) -> None:
+        try:
+            await rollup_service.record_attempts([QuizAttemptModel.from_dict(document) for document in documents])
+        finally:
+            data_versions.bump("answers", (document["user_id"] for document in documents))
+
+    def start(self) -> None:
+        self.answers.start()
+        self.attempts.start()
+
+    async def close(self) -> None:
+        """Flush both buffers; called on graceful shutdown"""
+        await asyncio.gather(self.answers.close(), self.attempts.close())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"user_answers": self.answers.stats(), "quiz_attempts": self.attempts.stats()}
+
+# Global instance
+ingestion_service = IngestionService(
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL_SECONDS,
+    max_buffered=settings.INGEST_MAX_BUFFERED,
+    max_retries=settings.INGEST_MAX_RETRIES
+)
@@ -0,0 +1,324 @@
+import codecs
+import csv
+import hashlib
+import re
+import unicodedata
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple, Union
+import orjson
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from config.settings import settings
+from database.mongo import questions_collection
+from schemas.question import QuestionCreate
+from services.ability import ability_engine
+from services.grading import grading_service
+from services.question_pool import question_pool_index
+from services.versions import data_versions
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+OPTIONS = ("A", "B", "C", "D")
+
+# Longest CSV record (a quoted field spanning lines) before its quote counts as stray
+MAX_RECORD_LINES = 50
+
+_WHITESPACE = re.compile(r"\s+")
+
+def content_hash(content: str) -> str:
+    """Hash of a question's text that ignores case, Unicode form and whitespace"""
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", content)).strip().casefold()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+# A parsed input row: (line number, fields) or (line number, error message)
+Row = Tuple[int, Union[Dict[str, Any], str]]
+
+async def gunzip(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Decompress a gzip byte stream chunk by chunk"""
+    # wbits=47 accepts a gzip or zlib header
+    decompressor = zlib.decompressobj(47)
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    data = decompressor.flush()
+    if data:
+        yield data
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """UTF-8 text lines of a byte stream, whatever the chunk boundaries"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def _ndjson_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[Row]:
+    number = 0
+    async for line in _lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield number, f"invalid JSON: {e}"
+            continue
+        yield number, row if isinstance(row, dict) else "expected a JSON object"
+
+class _CsvRecords:
+    """
+    Groups CSV lines into records, keyed by the header row
+
+    A quoted field may span lines, but at most MAX_RECORD_LINES: past that
+    (a stray unbalanced quote) the first line is reported as malformed and
+    parsing resumes on the line after it, so memory stays bounded and the
+    rest of the file is still imported.
+    """
+
+    def __init__(self):
+        self.header: Optional[List[str]] = None
+        self.lines: List[Tuple[int, str]] = []
+        self.quotes = 0
+
+    def feed(self, number: int, line: str) -> List[Row]:
+        rows: List[Row] = []
+        pending = [(number, line)]
+        while pending:
+            number, line = pending.pop(0)
+            self.lines.append((number, line))
+            # Quotes are escaped by doubling, so a record is complete once they pair up
+            self.quotes += line.count('"')
+            if self.quotes % 2 == 0:
+                rows.extend(self._record())
+            elif len(self.lines) >= MAX_RECORD_LINES:
+                pending = self._malformed(rows) + pending
+        return rows
+
+    def finish(self) -> List[Row]:
+        rows: List[Row] = []
+        while self.lines:
+            for number, line in self._malformed(rows):
+                rows.extend(self.feed(number, line))
+        return rows
+
+    def _malformed(self, rows: List[Row]) -> List[Tuple[int, str]]:
+        """Report the record's first line; returns the lines to parse again"""
+        (start, _), *rest = self.lines
+        rows.append((start, "malformed CSV: unbalanced quote"))
+        self.lines, self.quotes = [], 0
+        return rest
+
+    def _record(self) -> List[Row]:
+        start = self.lines[0][0]
+        text = "\n".join(line for _, line in self.lines)
+        self.lines, self.quotes = [], 0
+        if not text.strip():
+            return []
+        values = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return []
+        if len(values) != len(self.header):
+            return [(start, f"expected {len(self.header)} columns, got {len(values)}")]
+        # Empty cells are missing values, so optional columns can be left blank
+        return [(start, {name: value for name, value in zip(self.header, values) if value != ""})]
+
+async def _csv_rows(chunks: AsyncIterable[bytes]) -> AsyncIterator[Row]:
+    records = _CsvRecords()
+    number = 0
+    async for line in _lines(chunks):
+        number += 1
+        for row in records.feed(number, line):
+            yield row
+    for row in records.finish():
+        yield row
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}" for detail in error.errors()
+    )
+
+class QuestionImportService:
+    """
+    Bulk import of quiz questions (schemas/question.py QuestionCreate) from NDJSON or CSV.
+
+    Input is read as a stream and handled batch_size rows at a time: each
+    batch is validated, deduplicated and written with one $in lookup and one
+    unordered bulk_write of upserts, so memory stays proportional to the batch
+    and 100k rows take a few hundred round trips instead of 200k.
+
+    Questions are identified by content_hash (content_hash() of the text,
+    unique index in database/indexes.py); a row whose question already
+    exists is counted as a duplicate, or overwrites it with update=True.
+    Invalid rows are reported by line number and never stop the import.
+    """
+
+    def __init__(self, batch_size: int, max_errors: int):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+
+    def rows(self, chunks: AsyncIterable[bytes], format: str) -> AsyncIterator[Row]:
+        return _ndjson_rows(chunks) if format == "ndjson" else _csv_rows(chunks)
+
+    def document(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """The question document for a row; raises ValueError if the row is invalid"""
+        try:
+            question = QuestionCreate.model_validate(row)
+        except ValidationError as e:
+            raise ValueError(_validation_message(e))
+        document = question.model_dump(mode="json")
+        for field in ("content", "option_a", "option_b", "option_c", "option_d", "topic"):
+            document[field] = document[field].strip()
+            if not document[field]:
+                raise ValueError(f"{field}: must not be empty")
+        # Stored the way grading compares it (services/grading.py)
+        document["correct_option"] = document["correct_option"].strip().upper()
+        if document["correct_option"] not in OPTIONS:
+            raise ValueError("correct_option: must be one of A, B, C, D")
+        document["content_hash"] = content_hash(document["content"])
+        return document
+
+    async def import_stream(self, chunks: AsyncIterable[bytes], format: str, update: bool = False,
+                            dry_run: bool = False) -> Dict[str, Any]:
+        """Import an NDJSON/CSV byte stream and return counts plus per-row errors"""
+        return await self.import_rows(self.rows(chunks, format), update=update, dry_run=dry_run)
+
+    async def import_rows(self, rows: AsyncIterable[Row], update: bool = False,
+                          dry_run: bool = False) -> Dict[str, Any]:
+        """Import already parsed (line number, row) pairs"""
+        report = {"rows": 0, "inserted": 0, "updated": 0, "duplicates": 0, "invalid": 0, "errors": []}
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for number, row in rows:
+            report["rows"] += 1
+            if isinstance(row, str):
+                self._error(report, number, row)
+                continue
+            try:
+                batch.append((number, self.document(row)))
+            except ValueError as e:
+                self._error(report, number, str(e))
+                continue
+            if len(batch) >= self.batch_size:
+                await self._write(batch, report, update, dry_run)
+                batch = []
+        if batch:
+            await self._write(batch, report, update, dry_run)
+        report["errors_truncated"] = report["invalid"] > len(report["errors"])
+        return report
+
+    async def _write(self, batch: List[Tuple[int, Dict[str, Any]]], report: Dict[str, Any],
+                     update: bool, dry_run: bool) -> None:
+        # Last row wins within a batch, as it would across batches with update=True
+        unique: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for number, document in batch:
+            if document["content_hash"] in unique:
+                report["duplicates"] += 1
+            unique[document["content_hash"]] = (number, document)
+
+        existing = {
+            question["content_hash"]: question["_id"] async for question in questions_collection.find(
+                {"content_hash": {"$in": list(unique)}}, {"content_hash": 1}, comment="import.questions"
+            )
+        }
+        if not update:
+            report["duplicates"] += len(existing)
+        elif dry_run:
+            report["updated"] += len(existing)
+        entries = [
+            (number, document) for content_hash, (number, document) in unique.items()
+            if update or content_hash not in existing
+        ]
+        if dry_run:
+            report["inserted"] += len(entries) - (len(existing) if update else 0)
+            return
+        if not entries:
+            return
+
+        now = datetime.utcnow()
+        operations = []
+        for _, document in entries:
+            if update:
+                change = {"$set": {**document, "updated_at": now}, "$setOnInsert": {"created_at": now}}
+            else:
+                # $setOnInsert keeps a question inserted concurrently since the lookup untouched
+                change = {"$setOnInsert": {**document, "created_at": now}}
+            operations.append(UpdateOne({"content_hash": document["content_hash"]}, change, upsert=True))
+
+        try:
+            result = await questions_collection.bulk_write(operations, ordered=False, comment="import.questions")
+            written = result.bulk_api_result
+        except BulkWriteError as e:
+            written = e.details
+        failed = set()
+        for error in written.get("writeErrors", []):
+            failed.add(error["index"])
+            if error.get("code") == 11000:
+                # Two upserts of the same new hash raced; the other one inserted it
+                report["duplicates"] += 1
+            else:
+                self._error(report, entries[error["index"]][0], error.get("errmsg", "write failed"))
+        upserted = {entry["index"]: entry["_id"] for entry in written.get("upserted", [])}
+
+        for index, (_, document) in enumerate(entries):
+            if index in failed:
+                continue
+            if index in upserted:
+                report["inserted"] += 1
+                question_pool_index.add({**document, "_id": upserted[index]})
+            elif update and document["content_hash"] in existing:
+                report["updated"] += 1
+                question_id = existing[document["content_hash"]]
+                grading_service.key_table.invalidate(question_id)
+                question_pool_index.add({**document, "_id": question_id})
+            else:
+                report["duplicates"] += 1
+        if upserted or (update and existing):
+            ability_engine.invalidate()
+            data_versions.bump("questions")
+
+    def _error(self, report: Dict[str, Any], number: int, message: str) -> None:
+        report["invalid"] += 1
+        if len(report["errors"]) < self.max_errors:
+            report["errors"].append({"line": number, "error": message})
+
+    async def backfill_hashes(self) -> int:
+        """Set content_hash on questions stored before imports existed; returns how many were updated"""
+        updated = 0
+        operations = []
+        cursor = questions_collection.find(
+            {"content_hash": {"$exists": False}, "content": {"$type": "string"}}, {"content": 1},
+            batch_size=self.batch_size
+        )
+        seen = set()
+        async for question in cursor:
+            digest = content_hash(question["content"])
+            # Leave existing duplicates unhashed rather than break the unique index
+            if digest in seen:
+                continue
+            seen.add(digest)
+            operations.append(UpdateOne({"_id": question["_id"]}, {"$set": {"content_hash": digest}}))
+            if len(operations) >= self.batch_size:
+                updated += await self._backfill(operations)
+                operations = []
+        if operations:
+            updated += await self._backfill(operations)
+        return updated
+
+    async def _backfill(self, operations: List[UpdateOne]) -> int:
+        try:
+            result = await questions_collection.bulk_write(operations, ordered=False)
+            return result.modified_count
+        except BulkWriteError as e:
+            # Hashes already taken by imported questions stay unset on the older copy
+            return e.details.get("nModified", 0)
+
+# Global instance
+question_import_service = QuestionImportService(settings.IMPORT_BATCH_SIZE, settings.IMPORT_MAX_ERRORS)
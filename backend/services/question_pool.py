@@ -0,0 +1,191 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config.settings import settings
+from database.mongo import questions_collection
+from utils.cache import TTLCache
+import asyncio
+import numpy as np
+
+PoolKey = Tuple[str, str]
+
+class SeenBitmap:
+    """One bit per question ordinal; grows on demand"""
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, ordinal: int) -> None:
+        byte = ordinal >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        self.bits[byte] |= 1 << (ordinal & 7)
+
+    def __contains__(self, ordinal: int) -> bool:
+        byte = ordinal >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (ordinal & 7)))
+
+    def mask(self, ordinals: np.ndarray) -> np.ndarray:
+        """Vectorized membership test for an array of ordinals"""
+        bits = np.frombuffer(bytes(self.bits), dtype=np.uint8)
+        bytes_index = ordinals >> 3
+        inside = bytes_index < len(bits)
+        seen = np.zeros(len(ordinals), dtype=bool)
+        seen[inside] = (bits[bytes_index[inside]] >> (ordinals[inside] & 7)) & 1 == 1
+        return seen
+
+class QuestionPoolIndex:
+    """
+    In-memory pools of question ids per (topic, difficulty).
+
+    Each question id gets a stable integer ordinal; a pool is an int32 array
+    of ordinals, and each user's recently seen questions are a bitmap over
+    the same ordinals. Sampling draws random pool slots and rejects seen or
+    already-picked ones, so picking n questions costs O(n) expected time and
+    no database query. Pools are rebuilt from the questions collection
+    periodically and patched in place when questions change.
+
+    Only quiz-format questions (topic, difficulty, option_a..option_d,
+    correct_option: seed_data.py, import_questions.py) are pooled.
+    QuestionService's title/options/correct_answer questions carry no topic,
+    so they never reach quizzes, recommendations or the IRT item banks.
+    """
+
+    def __init__(self, refresh_interval: float, seen_max_users: int, seen_ttl_seconds: float, seed: Optional[int] = None):
+        self.refresh_interval = refresh_interval
+        self._ordinals: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._pools: Dict[PoolKey, np.ndarray] = {}
+        self._pool_of: Dict[int, PoolKey] = {}
+        self._seen = TTLCache(seen_max_users, seen_ttl_seconds)
+        self._rng = np.random.default_rng(seed)
+        self._task: Optional[asyncio.Task] = None
+        self.loaded = False
+        self.last_refresh_size = 0
+
+    def ordinal(self, question_id: str) -> int:
+        # Ordinals are never reused, so seen bitmaps stay valid across refreshes
+        ordinal = self._ordinals.get(question_id)
+        if ordinal is None:
+            ordinal = len(self._ids)
+            self._ordinals[question_id] = ordinal
+            self._ids.append(question_id)
+        return ordinal
+
+    async def refresh(self) -> int:
+        """Rebuild every pool from the questions collection and swap them in"""
+        members: Dict[PoolKey, List[int]] = {}
+        cursor = questions_collection.find(
+            {"topic": {"$ne": None}, "difficulty": {"$ne": None}},
+            {"topic": 1, "difficulty": 1}
+        )
+        async for question in cursor:
+            key = (question["topic"], question["difficulty"])
+            members.setdefault(key, []).append(self.ordinal(str(question["_id"])))
+
+        self._pools = {key: np.array(ordinals, dtype=np.int32) for key, ordinals in members.items()}
+        self._pool_of = {ordinal: key for key, ordinals in members.items() for ordinal in ordinals}
+        self.loaded = True
+        self.last_refresh_size = sum(len(ordinals) for ordinals in members.values())
+        return self.last_refresh_size
+
+    def add(self, question: Dict[str, Any]) -> None:
+        """Add a new or updated question to its pool; questions without a topic or difficulty are skipped"""
+        self.remove(str(question["_id"]))
+        if not question.get("topic") or not question.get("difficulty"):
+            return
+        key = (question["topic"], question["difficulty"])
+        ordinal = self.ordinal(str(question["_id"]))
+        pool = self._pools.get(key, np.empty(0, dtype=np.int32))
+        self._pools[key] = np.append(pool, np.int32(ordinal))
+        self._pool_of[ordinal] = key
+
+    def remove(self, question_id: str) -> None:
+        """Drop a question from whichever pool holds it"""
+        ordinal = self._ordinals.get(str(question_id))
+        key = self._pool_of.pop(ordinal, None) if ordinal is not None else None
+        if key is not None:
+            pool = self._pools[key]
+            self._pools[key] = pool[pool != ordinal]
+
+    def mark_seen(self, user_id: str, question_ids: Iterable[str]) -> None:
+        bitmap = self._seen.get(user_id) or SeenBitmap()
+        for question_id in question_ids:
+            ordinal = self._ordinals.get(str(question_id))
+            if ordinal is not None:
+                bitmap.add(ordinal)
+        # Re-setting extends the TTL: "recent" means seen within the last TTL of activity
+        self._seen.set(user_id, bitmap)
+
+    def seen(self, user_id: str) -> Optional[SeenBitmap]:
+        """The user's recently seen questions, as a bitmap over ordinals"""
+        return self._seen.get(user_id)
+
+    def pool_size(self, topic: str, difficulty: str) -> int:
+        return len(self._pools.get((topic, difficulty), ()))
+
+    def sample(self, topic: str, difficulty: str, count: int, user_id: Optional[str] = None) -> List[str]:
+        """
+        Up to count distinct question ids from the pool, preferring ones the user has not seen
+
+        When fewer than count unseen questions remain, seen ones fill the rest.
+        """
+        pool = self._pools.get((topic, difficulty))
+        if pool is None or len(pool) == 0 or count <= 0:
+            return []
+        if count >= len(pool):
+            return [self._ids[ordinal] for ordinal in self._rng.permutation(pool)]
+
+        seen = self.seen(user_id) if user_id else None
+        picked: Dict[int, None] = {}
+        # Rejection sampling: cheap while most of the pool is still eligible; slots are drawn in one call
+        for ordinal in pool[self._rng.integers(len(pool), size=4 * count + 16)].tolist():
+            if ordinal in picked or (seen is not None and ordinal in seen):
+                continue
+            picked[ordinal] = None
+            if len(picked) == count:
+                break
+
+        if len(picked) < count:
+            # Mostly-seen pool: fall back to one vectorized pass
+            eligible = pool[~np.isin(pool, list(picked))]
+            if seen is not None:
+                unseen = eligible[~seen.mask(eligible)]
+                fill = self._rng.choice(unseen, min(count - len(picked), len(unseen)), replace=False)
+                picked.update(dict.fromkeys(int(ordinal) for ordinal in fill))
+                eligible = eligible[~np.isin(eligible, list(picked))]
+            if len(picked) < count:
+                fill = self._rng.choice(eligible, count - len(picked), replace=False)
+                picked.update(dict.fromkeys(int(ordinal) for ordinal in fill))
+
+        return [self._ids[ordinal] for ordinal in picked]
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️  Question pool refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "pools": len(self._pools),
+            "questions": sum(len(pool) for pool in self._pools.values()),
+            "seen_users": self._seen.stats()["entries"]
+        }
+
+# Global instance
+question_pool_index = QuestionPoolIndex(
+    settings.QUESTION_POOL_REFRESH_SECONDS,
+    settings.SEEN_QUESTIONS_MAX_USERS,
+    settings.SEEN_QUESTIONS_TTL_SECONDS
+)
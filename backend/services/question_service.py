@@ -3,8 +3,29 @@ from typing import Optional, Dict, Any, List
 from fastapi import HTTPException, status
 
 from models.question import QuestionInDB
-from config.database import questions_collection
+from storage import DuplicateKeyError, get_collection
 from schemas.quiz import QuestionCreate, QuestionUpdate, QuestionOut, QuestionWithAnswer
+from utils.pagination import encode_cursor, keyset_filter
+from services.grading import grading_service
+from services.question_pool import question_pool_index
+from services.ability import ability_engine
+from services.versions import data_versions
+from services.question_import import content_hash
+
+questions_collection = get_collection("questions")
+
+# Fields a listing shows to everyone; anything else (answers, content_hash, new fields) stays
+# out unless it is added here. Covers both admin-created and quiz-format (option_a..) questions.
+LISTING_FIELDS = [
+    "title", "content", "question_type", "difficulty", "options", "points", "tags",
+    "option_a", "option_b", "option_c", "option_d", "topic", "created_at", "updated_at"
+]
+
+# Answer fields of both formats, only for graders and admins (include_answers)
+ANSWER_FIELDS = ["correct_answer", "correct_option", "explanation"]
+
+LISTING_PROJECTION = {field: 1 for field in LISTING_FIELDS}
+LISTING_WITH_ANSWERS_PROJECTION = {field: 1 for field in LISTING_FIELDS + ANSWER_FIELDS}
 
 class QuestionService:
     """Question service for admin operations"""
@@ -36,12 +57,24 @@ class QuestionService:
             tags=question_data.tags or []
         )
         
-        # Insert into database
-        result = await questions_collection.insert_one(question.to_dict())
+        # Insert into database; the hash lets imports recognise the question (unique index)
+        question_document = question.to_dict()
+        question_document["content_hash"] = content_hash(question_data.content)
+        try:
+            question_id = await questions_collection.insert_one(question_document)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A question with this content already exists"
+            )
+        # No-op for now: these questions have no topic, so they are not pooled for quizzes
+        question_pool_index.add({**question_document, "_id": question_id})
+        ability_engine.invalidate(question_document.get("topic"))
+        data_versions.bump("questions")
         
         return {
             "message": "Question created successfully",
-            "question_id": str(result["inserted_id"]),
+            "question_id": question_id,
             "title": question_data.title
         }
     
@@ -66,22 +99,55 @@ class QuestionService:
             return None
     
     @staticmethod
-    async def get_all_questions(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    async def get_all_questions(
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_answers: bool = False,
+        difficulty: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Get all questions with pagination
+        Get one page of questions in (created_at, _id) order
         
         Args:
-            skip: Number of questions to skip
             limit: Maximum number of questions to return
+            cursor: next_cursor from the previous page, None for the first page
+            include_answers: Include correct_answer, correct_option and explanation
+            difficulty: Only return questions of this difficulty
             
         Returns:
-            List of questions
+            Dict with the page of questions and the next_cursor (None on the last page)
+            
+        Raises:
+            HTTPException: If the cursor is malformed
         """
         try:
-            questions = await questions_collection.find()
-            return questions[skip:skip + limit]
-        except Exception:
-            return []
+            query = keyset_filter(cursor, {"difficulty": difficulty} if difficulty else None)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        # One extra row tells us whether another page exists without a count
+        questions = await questions_collection.find(
+            query,
+            LISTING_WITH_ANSWERS_PROJECTION if include_answers else LISTING_PROJECTION,
+            sort=[("created_at", 1), ("_id", 1)],
+            limit=limit + 1
+        )
+        
+        next_cursor = None
+        if len(questions) > limit:
+            questions = questions[:limit]
+            last = questions[-1]
+            next_cursor = encode_cursor(last["created_at"], last["_id"])
+        
+        return {"questions": questions, "next_cursor": next_cursor}
+    
+    @staticmethod
+    def listing_etag(**params: Any) -> str:
+        """ETag of a listing page or count, from the questions version and the query parameters"""
+        return data_versions.etag(("questions", None), variant=sorted(params.items()))
     
     @staticmethod
     async def update_question(question_id: str, question_update: QuestionUpdate) -> Optional[Dict[str, Any]]:
@@ -102,6 +168,7 @@ class QuestionService:
                 update_data["title"] = question_update.title
             if question_update.content is not None:
                 update_data["content"] = question_update.content
+                update_data["content_hash"] = content_hash(question_update.content)
             if question_update.question_type is not None:
                 update_data["question_type"] = question_update.question_type.value
             if question_update.difficulty is not None:
@@ -127,17 +194,27 @@ class QuestionService:
             update_data["updated_at"] = datetime.utcnow()
             
             # Update question
-            result = await questions_collection.update_one(
+            modified_count = await questions_collection.update_one(
                 {"_id": question_id},
                 {"$set": update_data}
             )
             
-            if result["modified_count"] == 0:
+            if modified_count == 0:
                 return None
+            grading_service.key_table.invalidate(question_id)
+            data_versions.bump("questions")
             
             # Get updated question data
             updated_question = await questions_collection.find_one({"_id": question_id})
+            if updated_question:
+                question_pool_index.add(updated_question)
+            ability_engine.invalidate()
             return updated_question
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A question with this content already exists"
+            )
         except Exception:
             return None
     
@@ -153,8 +230,12 @@ class QuestionService:
             True if successful, False otherwise
         """
         try:
-            result = await questions_collection.delete_one({"_id": question_id})
-            return result["deleted_count"] > 0
+            deleted_count = await questions_collection.delete_one({"_id": question_id})
+            grading_service.key_table.invalidate(question_id)
+            question_pool_index.remove(question_id)
+            ability_engine.invalidate()
+            data_versions.bump("questions")
+            return deleted_count > 0
         except Exception:
             return False
     
@@ -194,15 +275,19 @@ class QuestionService:
             return []
     
     @staticmethod
-    async def get_question_count() -> int:
+    async def get_question_count(difficulty: Optional[str] = None) -> int:
         """
-        Get total number of questions
+        Get number of questions
         
+        Args:
+            difficulty: Only count questions of this difficulty
+            
         Returns:
-            Total question count
+            Question count (estimated from collection metadata when unfiltered)
         """
         try:
-            questions = await questions_collection.find()
-            return len(questions)
+            if difficulty is None:
+                return await questions_collection.estimated_document_count()
+            return await questions_collection.count_documents({"difficulty": difficulty})
         except Exception:
-            return 0 
\ No newline at end of file
+            return 0
@@ -0,0 +1,244 @@
+from typing import Any, Dict, List
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi import HTTPException, status
+from config.settings import settings
+from database.mongo import questions_collection
+from models.quiz import QuizAttemptModel, UserAnswerModel
+from schemas.quiz import QuizAnswer, QuizStart, QuizSubmission
+from services.adaptive_logic import adaptive_logic
+from services.grading import grading_service
+from services.ingestion import ingestion_service
+from services.question_pool import question_pool_index
+from utils.cache import TTLCache
+import asyncio
+
+# Question fields sent to the client; the answer key stays in the session
+QUESTION_PUBLIC_FIELDS = ["content", "option_a", "option_b", "option_c", "option_d", "topic", "difficulty"]
+
+class QuizSession:
+    """Server-side state of one quiz between /quiz/start and /quiz/submit"""
+
+    def __init__(self, quiz_id: str, user_id: str, topic: str, difficulty: str,
+                 questions: List[Dict[str, Any]], ttl_seconds: float):
+        self.quiz_id = quiz_id
+        self.user_id = user_id
+        self.topic = topic
+        self.difficulty = difficulty
+        self.question_ids = [str(question["_id"]) for question in questions]
+        self.answer_key = {str(question["_id"]): question["correct_option"] for question in questions}
+        # topic/difficulty per question, stamped onto the answers at submit time
+        self.question_meta = {str(question["_id"]): question for question in questions}
+        self.answers: Dict[str, QuizAnswer] = {}
+        self.started_at = datetime.utcnow()
+        self.expires_at = self.started_at + timedelta(seconds=ttl_seconds)
+
+    def record(self, answer: QuizAnswer) -> None:
+        """Record (or replace) the answer to one question of this quiz"""
+        if answer.question_id not in self.answer_key:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Question {answer.question_id} is not part of this quiz"
+            )
+        self.answers[answer.question_id] = answer
+
+    def progress(self) -> Dict[str, Any]:
+        answered = [question_id for question_id in self.question_ids if question_id in self.answers]
+        return {
+            "quiz_id": self.quiz_id,
+            "current_question": len(answered),
+            "total_questions": len(self.question_ids),
+            "answered_questions": answered,
+            "score_so_far": sum(1 for question_id in answered if self.is_correct(self.answers[question_id])),
+            "time_elapsed": int((datetime.utcnow() - self.started_at).total_seconds())
+        }
+
+    def is_correct(self, answer: QuizAnswer) -> bool:
+        return answer.selected_option.strip().upper() == str(self.answer_key[answer.question_id]).upper()
+
+class QuizSessionStore:
+    """
+    In-process TTL store of active quiz sessions.
+
+    Sessions are not shared between uvicorn workers, so multi-worker
+    deployments need sticky sessions for the /quiz routes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._sessions = TTLCache(max_entries, ttl_seconds)
+
+    def put(self, session: QuizSession) -> None:
+        self._sessions.set(session.quiz_id, session)
+
+    def get(self, quiz_id: str, user_id: str) -> QuizSession:
+        """Return the caller's active session or raise 404"""
+        session = self._sessions.get(quiz_id)
+        if session is None or session.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Quiz not found or expired"
+            )
+        return session
+
+    def pop(self, quiz_id: str, user_id: str) -> QuizSession:
+        """Remove and return a session, so each quiz can be submitted once"""
+        session = self.get(quiz_id, user_id)
+        self._sessions.invalidate(quiz_id)
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        return self._sessions.stats()
+
+class QuizSessionService:
+    """Starts, tracks and grades quizzes from in-memory session state"""
+
+    def __init__(self, store: QuizSessionStore):
+        self.store = store
+
+    async def start_quiz(self, user_id: str, quiz_start: QuizStart) -> Dict[str, Any]:
+        """Pick the questions once and open a session holding their answer key"""
+        projection = {field: 1 for field in QUESTION_PUBLIC_FIELDS + ["correct_option"]}
+        difficulty = quiz_start.difficulty.value
+        # Pick ids without repeats from the in-memory pool, then fetch just those documents
+        question_ids = question_pool_index.sample(quiz_start.topic, difficulty, quiz_start.num_questions, user_id)
+        if question_ids:
+            cursor = questions_collection.find(
+                {"_id": {"$in": [ObjectId(question_id) if ObjectId.is_valid(question_id) else question_id
+                                 for question_id in question_ids]}},
+                projection
+            )
+            questions = await cursor.to_list(length=len(question_ids))
+            order = {question_id: position for position, question_id in enumerate(question_ids)}
+            questions.sort(key=lambda question: order[str(question["_id"])])
+        else:
+            # Pool not loaded yet, or questions added since the last refresh
+            pipeline = [
+                {"$match": {"topic": quiz_start.topic, "difficulty": difficulty}},
+                {"$sample": {"size": quiz_start.num_questions}},
+                {"$project": projection}
+            ]
+            questions = await questions_collection.aggregate(pipeline).to_list(length=quiz_start.num_questions)
+        if not questions:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No {difficulty} questions found for topic '{quiz_start.topic}'"
+            )
+
+        # The attempt id doubles as the session id, so answers can reference it before it is written
+        session = QuizSession(str(ObjectId()), user_id, quiz_start.topic, difficulty,
+                              questions, self.store.ttl_seconds)
+        self.store.put(session)
+        question_pool_index.mark_seen(user_id, session.question_ids)
+
+        return {
+            "quiz_id": session.quiz_id,
+            "topic": session.topic,
+            "difficulty": session.difficulty,
+            "total_questions": len(questions),
+            "started_at": session.started_at,
+            "expires_at": session.expires_at,
+            "questions": [
+                {"id": str(question["_id"]), **{field: question.get(field) for field in QUESTION_PUBLIC_FIELDS}}
+                for question in questions
+            ]
+        }
+
+    def answer(self, user_id: str, quiz_id: str, answer: QuizAnswer) -> Dict[str, Any]:
+        """Record one answer without grading the quiz"""
+        session = self.store.get(quiz_id, user_id)
+        session.record(answer)
+        return session.progress()
+
+    def progress(self, user_id: str, quiz_id: str) -> Dict[str, Any]:
+        return self.store.get(quiz_id, user_id).progress()
+
+    async def submit_quiz(self, user_id: str, submission: QuizSubmission) -> Dict[str, Any]:
+        """Grade against the session's answer key and persist the attempt and answers in bulk"""
+        if len(submission.selected_options) != len(submission.question_ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="question_ids and selected_options must have the same length"
+            )
+        session = self.store.get(submission.quiz_id, user_id)
+        ended_at = datetime.utcnow()
+
+        times = submission.time_taken_per_question or []
+        for index, (question_id, selected_option) in enumerate(zip(submission.question_ids,
+                                                                    submission.selected_options)):
+            session.record(QuizAnswer(
+                question_id=question_id,
+                selected_option=selected_option,
+                time_taken=times[index] if index < len(times) else None
+            ))
+        # Only a valid submission closes the session
+        self.store.pop(session.quiz_id, user_id)
+
+        # Grade every question of the quiz; unanswered ones are submitted as ""
+        graded = await grading_service.grade(
+            QuizSubmission(
+                quiz_id=session.quiz_id,
+                question_ids=session.question_ids,
+                selected_options=[session.answers[question_id].selected_option if question_id in session.answers
+                                  else "" for question_id in session.question_ids],
+                time_taken_per_question=[session.answers[question_id].time_taken if question_id in session.answers
+                                         else None for question_id in session.question_ids]
+            ),
+            answer_keys=session.question_meta
+        )
+
+        answers = [
+            UserAnswerModel.from_question(
+                session.question_meta[question_id],
+                user_id=user_id,
+                quiz_id=session.quiz_id,
+                selected_option=session.answers[question_id].selected_option,
+                is_correct=is_correct,
+                time_taken=session.answers[question_id].time_taken,
+                timestamp=ended_at
+            )
+            for question_id, is_correct in zip(session.question_ids, graded["is_correct"])
+            if question_id in session.answers
+        ]
+        time_taken = graded["time"]["total"]
+        if time_taken is None:
+            time_taken = int((ended_at - session.started_at).total_seconds())
+
+        attempt = QuizAttemptModel(
+            user_id=user_id,
+            topic=session.topic,
+            difficulty=session.difficulty,
+            questions=session.question_ids,
+            started_at=session.started_at,
+            ended_at=ended_at,
+            score=graded["score"],
+            total_questions=graded["total_questions"],
+            _id=ObjectId(session.quiz_id)
+        )
+
+        # Skill state feeds the next quiz, so it is written now; the raw rows and their
+        # rollups go through the ingestion buffers
+        await asyncio.gather(
+            ingestion_service.submit(answers, attempt),
+            adaptive_logic.record_answers(answers)
+        )
+
+        return {
+            "id": session.quiz_id,
+            "user_id": user_id,
+            "score": attempt.score,
+            "correct_count": graded["correct_count"],
+            "total_questions": graded["total_questions"],
+            "accuracy": graded["accuracy"],
+            "time_taken": time_taken,
+            "started_at": session.started_at,
+            "ended_at": ended_at,
+            "topic": session.topic,
+            "difficulty": session.difficulty,
+            "by_difficulty": graded["by_difficulty"]
+        }
+
+# Global instance
+quiz_session_service = QuizSessionService(
+    QuizSessionStore(settings.QUIZ_SESSION_MAX_ENTRIES, settings.QUIZ_SESSION_TTL_SECONDS)
+)
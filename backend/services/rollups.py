@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from pymongo import UpdateOne
+from database.mongo import (
+    user_answers_collection, quiz_attempts_collection,
+    daily_topic_rollup_collection, hourly_topic_rollup_collection, daily_user_rollup_collection
+)
+from database.indexes import index_manager
+from models.quiz import UserAnswerModel, QuizAttemptModel
+import asyncio
+
+# Rollup collection -> the fields that identify one rollup document
+ROLLUP_KEYS = {
+    "analytics_daily_topic": ["date", "topic", "difficulty"],
+    "analytics_hourly_topic": ["hour", "topic", "difficulty"],
+    "analytics_daily_user": ["date", "user_id", "topic", "difficulty"],
+}
+
+class RollupService:
+    """Maintains daily/hourly counters so dashboards never scan raw answers"""
+
+    def _truncate_day(self, timestamp: datetime) -> datetime:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _truncate_hour(self, timestamp: datetime) -> datetime:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+
+    async def record_answer(self, answer: UserAnswerModel) -> None:
+        """Add one answer to the rollups"""
+        await self.record_answers([answer])
+
+    async def record_answers(self, answers: List[UserAnswerModel]) -> None:
+        """Add a batch of answers to the rollups with one bulk write per collection"""
+        daily_topic: Dict[Tuple, Dict[str, int]] = {}
+        hourly_topic: Dict[Tuple, Dict[str, int]] = {}
+        daily_user: Dict[Tuple, Dict[str, int]] = {}
+
+        for answer in answers:
+            counters = {
+                "answers": 1,
+                "correct_answers": 1 if answer.is_correct else 0,
+                "time_taken_total": answer.time_taken or 0,
+                "timed_answers": 1 if answer.time_taken is not None else 0
+            }
+            day = self._truncate_day(answer.timestamp)
+            hour = self._truncate_hour(answer.timestamp)
+            self._accumulate(daily_topic, (day, answer.topic, answer.difficulty), counters)
+            self._accumulate(hourly_topic, (hour, answer.topic, answer.difficulty), counters)
+            self._accumulate(daily_user, (day, answer.user_id, answer.topic, answer.difficulty), counters)
+
+        await asyncio.gather(
+            self._apply(daily_topic_rollup_collection, daily_topic),
+            self._apply(hourly_topic_rollup_collection, hourly_topic),
+            self._apply(daily_user_rollup_collection, daily_user)
+        )
+
+    async def record_attempt(self, attempt: QuizAttemptModel) -> None:
+        """Add one quiz attempt to the daily rollups"""
+        await self.record_attempts([attempt])
+
+    async def record_attempts(self, attempts: List[QuizAttemptModel]) -> None:
+        """Add a batch of quiz attempts to the daily rollups"""
+        daily_topic: Dict[Tuple, Dict[str, int]] = {}
+        daily_user: Dict[Tuple, Dict[str, int]] = {}
+
+        for attempt in attempts:
+            counters = {
+                "attempts": 1,
+                "scored_attempts": 1 if attempt.score is not None else 0,
+                "score_total": attempt.score or 0
+            }
+            day = self._truncate_day(attempt.started_at)
+            self._accumulate(daily_topic, (day, attempt.topic, attempt.difficulty), counters)
+            self._accumulate(daily_user, (day, attempt.user_id, attempt.topic, attempt.difficulty), counters)
+
+        await asyncio.gather(
+            self._apply(daily_topic_rollup_collection, daily_topic),
+            self._apply(daily_user_rollup_collection, daily_user)
+        )
+
+    def _accumulate(self, rollup: Dict[Tuple, Dict[str, int]], key: Tuple, counters: Dict[str, int]) -> None:
+        totals = rollup.setdefault(key, {})
+        for field, value in counters.items():
+            totals[field] = totals.get(field, 0) + value
+
+    async def _apply(self, collection, rollup: Dict[Tuple, Dict[str, int]]) -> None:
+        """Upsert the accumulated counters into a rollup collection"""
+        if not rollup:
+            return
+
+        key_fields = ROLLUP_KEYS[collection.name]
+        operations = [
+            UpdateOne(dict(zip(key_fields, key)), {"$inc": counters}, upsert=True)
+            for key, counters in rollup.items()
+        ]
+        await collection.bulk_write(operations, ordered=False)
+
+    async def ensure_indexes(self) -> None:
+        """Unique key indexes (required by $merge) plus the per-user lookup index"""
+        await index_manager.apply(ROLLUP_KEYS)
+
+    async def rebuild(self, since: Optional[datetime] = None) -> Dict[str, int]:
+        """Regenerate the rollups from raw answers and attempts"""
+        await self.ensure_indexes()
+        since = self._truncate_day(since) if since else None
+        rollups = [
+            (daily_topic_rollup_collection, "day", ["topic", "difficulty"]),
+            (hourly_topic_rollup_collection, "hour", ["topic", "difficulty"]),
+            (daily_user_rollup_collection, "day", ["user_id", "topic", "difficulty"])
+        ]
+
+        rebuilt = {}
+        for collection, unit, group_fields in rollups:
+            key_fields = ROLLUP_KEYS[collection.name]
+            time_field = key_fields[0]
+            await collection.delete_many({time_field: {"$gte": since}} if since else {})
+
+            # Counters from the two sources are disjoint, so the second merge just adds fields
+            await self._merge_from(user_answers_collection, "timestamp", since, unit, time_field,
+                                   group_fields, collection.name, {
+                "answers": {"$sum": 1},
+                "correct_answers": {"$sum": {"$cond": ["$is_correct", 1, 0]}},
+                "time_taken_total": {"$sum": {"$ifNull": ["$time_taken", 0]}},
+                "timed_answers": {"$sum": {"$cond": [{"$gt": ["$time_taken", None]}, 1, 0]}}
+            })
+            if unit == "day":
+                await self._merge_from(quiz_attempts_collection, "started_at", since, unit, time_field,
+                                       group_fields, collection.name, {
+                    "attempts": {"$sum": 1},
+                    "scored_attempts": {"$sum": {"$cond": [{"$gt": ["$score", None]}, 1, 0]}},
+                    "score_total": {"$sum": {"$ifNull": ["$score", 0]}}
+                })
+
+            rebuilt[collection.name] = await collection.count_documents({})
+
+        return rebuilt
+
+    async def _merge_from(self, source, time_source: str, since: Optional[datetime], unit: str,
+                          time_field: str, group_fields: List[str], target: str, counters: Dict) -> None:
+        """Group a raw collection into rollup documents and $merge them into the target"""
+        group_id = {time_field: {"$dateTrunc": {"date": f"${time_source}", "unit": unit}}}
+        group_id.update({field: f"${field}" for field in group_fields})
+
+        pipeline = [
+            {"$match": {time_source: {"$gte": since}} if since else {}},
+            {"$group": {"_id": group_id, **counters}},
+            {"$replaceWith": {"$mergeObjects": ["$_id", {field: f"${field}" for field in counters}]}},
+            {"$merge": {
+                "into": target,
+                "on": ROLLUP_KEYS[target],
+                "whenMatched": "merge",
+                "whenNotMatched": "insert"
+            }}
+        ]
+        await source.aggregate(pipeline).to_list(length=None)
+
+# Global instance
+rollup_service = RollupService()
@@ -0,0 +1,243 @@
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+import numpy as np
+from config.settings import settings
+from database.mongo import user_answers_collection
+
+# Column -> dtype of the .npy files in every part. Strings are dictionary
+# encoded: the part stores integer codes (-1 for a missing value) and the
+# snapshot stores each code's value once.
+COLUMNS = {
+    "user": np.int32,
+    "question": np.int32,
+    "topic": np.int16,
+    "difficulty": np.int8,
+    "is_correct": np.bool_,
+    "time_taken": np.int32,  # seconds, -1 when not recorded
+    "timestamp": "datetime64[ms]",
+}
+
+# Encoded column -> the answer field it comes from
+DICTIONARY_FIELDS = {"user": "user_id", "question": "question_id", "topic": "topic", "difficulty": "difficulty"}
+
+class _Dictionary:
+    """Append-only value <-> code mapping, so codes stay valid across incremental runs"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class AnswerSnapshot:
+    """
+    Columnar snapshot of the user_answers history on local disk.
+
+    Layout: <root>/month=YYYY-MM/part-<run>-<n>/<column>.npy plus manifest.json
+    (high-water mark, partitions, small dictionaries) and user.npy /
+    question.npy (the id dictionaries). Rows within a part are in timestamp
+    order. update() appends the answers written since the high-water mark;
+    readers memory-map the column files, so full-history scans page data in
+    from disk instead of querying MongoDB or holding everything in RAM.
+
+    update() stops lag_seconds before now: answers are buffered before they
+    are written (services/ingestion.py), and one that lands later than the lag
+    behind its timestamp would be skipped.
+    """
+
+    def __init__(self, root: str, lag_seconds: float, rows_per_part: int):
+        self.root = root
+        self.lag_seconds = lag_seconds
+        self.rows_per_part = rows_per_part
+
+    # Writing
+
+    async def update(self) -> Dict[str, Any]:
+        """Append answers newer than the high-water mark; returns what was written"""
+        os.makedirs(self.root, exist_ok=True)
+        manifest = self.manifest()
+        self._remove_orphans(manifest)
+        dictionaries = {
+            "user": _Dictionary(self._id_dictionary("user")),
+            "question": _Dictionary(self._id_dictionary("question")),
+            "topic": _Dictionary(manifest["dictionaries"]["topic"]),
+            "difficulty": _Dictionary(manifest["dictionaries"]["difficulty"]),
+        }
+
+        high_water_mark = _parse_time(manifest["high_water_mark"])
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lag_seconds)
+        time_range = {"$lte": cutoff}
+        if high_water_mark is not None:
+            time_range["$gt"] = high_water_mark
+        cursor = user_answers_collection.find(
+            {"timestamp": time_range},
+            {"user_id": 1, "question_id": 1, "topic": 1, "difficulty": 1, "is_correct": 1, "time_taken": 1,
+             "timestamp": 1, "_id": 0},
+            batch_size=10000,
+            comment="snapshot.answers"
+        ).sort("timestamp", 1)
+
+        run = cutoff.strftime("%Y%m%dT%H%M%S")
+        # Part numbers continue across runs, so two runs within a second can't collide
+        sequence = len(manifest["partitions"])
+        rows: Dict[str, list] = {column: [] for column in COLUMNS}
+        month = None
+        written = []
+        async for answer in cursor:
+            answer_month = answer["timestamp"].strftime("%Y-%m")
+            if rows["timestamp"] and (answer_month != month or len(rows["timestamp"]) >= self.rows_per_part):
+                written.append(self._write_part(month, f"{run}-{sequence + len(written)}", rows))
+                rows = {column: [] for column in COLUMNS}
+            month = answer_month
+            for column, field in DICTIONARY_FIELDS.items():
+                rows[column].append(dictionaries[column].encode(answer.get(field)))
+            rows["is_correct"].append(bool(answer.get("is_correct")))
+            time_taken = answer.get("time_taken")
+            rows["time_taken"].append(-1 if time_taken is None else time_taken)
+            rows["timestamp"].append(answer["timestamp"])
+        if rows["timestamp"]:
+            written.append(self._write_part(month, f"{run}-{sequence + len(written)}", rows))
+
+        if written:
+            # Dictionaries before the manifest: a crash in between leaves unused
+            # trailing values, never codes the manifest's parts can't resolve
+            for column in ("user", "question"):
+                self._atomic_save(f"{column}.npy", np.array(dictionaries[column].values, dtype=str))
+            manifest["partitions"].extend(written)
+            manifest["dictionaries"] = {column: dictionaries[column].values for column in ("topic", "difficulty")}
+            manifest["high_water_mark"] = written[-1]["end"]
+            manifest["rows"] = sum(part["rows"] for part in manifest["partitions"])
+            manifest["updated_at"] = datetime.utcnow().isoformat()
+            self._atomic_write("manifest.json", json.dumps(manifest, indent=2).encode())
+        return {
+            "rows": sum(part["rows"] for part in written),
+            "parts": len(written),
+            "total_rows": manifest["rows"],
+            "high_water_mark": manifest["high_water_mark"]
+        }
+
+    def _write_part(self, month: str, name: str, rows: Dict[str, list]) -> Dict[str, Any]:
+        path = os.path.join(f"month={month}", f"part-{name}")
+        temporary = os.path.join(self.root, f".tmp-part-{name}")
+        os.makedirs(temporary, exist_ok=True)
+        for column, dtype in COLUMNS.items():
+            np.save(os.path.join(temporary, f"{column}.npy"), np.array(rows[column], dtype=dtype))
+        os.makedirs(os.path.join(self.root, f"month={month}"), exist_ok=True)
+        os.replace(temporary, os.path.join(self.root, path))
+        return {
+            "path": path,
+            "rows": len(rows["timestamp"]),
+            "start": rows["timestamp"][0].isoformat(),
+            "end": rows["timestamp"][-1].isoformat()
+        }
+
+    def _remove_orphans(self, manifest: Dict[str, Any]) -> None:
+        """Parts of an interrupted run that never made it into the manifest"""
+        listed = {part["path"] for part in manifest["partitions"]}
+        for entry in os.listdir(self.root):
+            path = os.path.join(self.root, entry)
+            if entry.startswith(".tmp-") and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif entry.startswith(".tmp-"):
+                os.remove(path)
+            elif entry.startswith("month=") and os.path.isdir(path):
+                for part in os.listdir(path):
+                    if os.path.join(entry, part) not in listed:
+                        shutil.rmtree(os.path.join(path, part), ignore_errors=True)
+
+    def _atomic_write(self, name: str, data: bytes) -> None:
+        temporary = os.path.join(self.root, f".tmp-{name}")
+        with open(temporary, "wb") as output:
+            output.write(data)
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temporary, os.path.join(self.root, name))
+
+    def _atomic_save(self, name: str, array: np.ndarray) -> None:
+        temporary = os.path.join(self.root, f".tmp-{name}")
+        np.save(temporary, array)
+        os.replace(temporary, os.path.join(self.root, name))
+
+    # Reading
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.root, "manifest.json")) as source:
+                return json.load(source)
+        except FileNotFoundError:
+            return {"high_water_mark": None, "rows": 0, "partitions": [],
+                    "dictionaries": {"topic": [], "difficulty": []}}
+
+    def _id_dictionary(self, column: str) -> np.ndarray:
+        path = os.path.join(self.root, f"{column}.npy")
+        return np.load(path, mmap_mode="r") if os.path.exists(path) else np.array([], dtype=str)
+
+    def dictionary(self, column: str) -> np.ndarray:
+        """Values of an encoded column, indexed by code"""
+        if column in ("user", "question"):
+            return self._id_dictionary(column)
+        return np.array(self.manifest()["dictionaries"][column], dtype=object)
+
+    def code(self, column: str, value: str) -> int:
+        """Code of a value in an encoded column, -1 if it never occurs"""
+        matches = np.flatnonzero(self.dictionary(column) == value)
+        return int(matches[0]) if len(matches) else -1
+
+    def scan(self, columns: Sequence[str] = tuple(COLUMNS), start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Memory-mapped columns part by part, limited to [start, end)
+
+        Parts outside the range are skipped from the manifest alone; within a
+        part the range is a binary search over the sorted timestamps.
+        """
+        for part in self.manifest()["partitions"]:
+            if (start is not None and _parse_time(part["end"]) < start) or \
+               (end is not None and _parse_time(part["start"]) >= end):
+                continue
+            path = os.path.join(self.root, part["path"])
+            arrays = {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r") for column in columns}
+            if start is not None or end is not None:
+                timestamps = np.load(os.path.join(path, "timestamp.npy"), mmap_mode="r")
+                first = np.searchsorted(timestamps, np.datetime64(start, "ms"), "left") if start else 0
+                last = np.searchsorted(timestamps, np.datetime64(end, "ms"), "left") if end else len(timestamps)
+                arrays = {column: values[first:last] for column, values in arrays.items()}
+            yield arrays
+
+    def load(self, columns: Sequence[str] = tuple(COLUMNS), start: Optional[datetime] = None,
+             end: Optional[datetime] = None, topic: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """The selected columns of every matching row as in-memory arrays"""
+        topic_code = self.code("topic", topic) if topic is not None else None
+        pieces: Dict[str, List[np.ndarray]] = {column: [] for column in columns}
+        # -1 is also the code of a missing topic, so an unknown topic must not reach the filter
+        if topic_code == -1:
+            return {column: np.array([], dtype=COLUMNS[column]) for column in columns}
+        read = list(columns) + (["topic"] if topic_code is not None and "topic" not in columns else [])
+        for arrays in self.scan(read, start, end):
+            selected = arrays["topic"] == topic_code if topic_code is not None else slice(None)
+            for column in columns:
+                pieces[column].append(np.asarray(arrays[column][selected]))
+        return {
+            column: np.concatenate(values) if values else np.array([], dtype=COLUMNS[column])
+            for column, values in pieces.items()
+        }
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+# Global instance
+answer_snapshot = AnswerSnapshot(
+    settings.ANSWER_SNAPSHOT_DIR,
+    lag_seconds=settings.ANSWER_SNAPSHOT_LAG_SECONDS,
+    rows_per_part=settings.ANSWER_SNAPSHOT_ROWS_PER_PART
+)
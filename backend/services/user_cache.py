@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+from config.settings import settings
+from utils.cache import TTLCache
+
+class UserCache:
+    """
+    Write-through cache of user documents keyed by email.
+    
+    Authenticated endpoints resolve the token's email to a user document on
+    every request; this keeps the hot ones in memory. Every code path that
+    modifies a user must call put() with the new document or invalidate().
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._by_email = TTLCache(max_entries, ttl_seconds)
+        self._email_by_id: Dict[str, str] = {}
+    
+    def get(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._by_email.get(email)
+    
+    def put(self, user_data: Dict[str, Any]) -> None:
+        """Cache a freshly read or freshly written user document"""
+        user_id = str(user_data["_id"])
+        previous_email = self._email_by_id.get(user_id)
+        if previous_email and previous_email != user_data["email"]:
+            self._by_email.invalidate(previous_email)
+        
+        self._email_by_id[user_id] = user_data["email"]
+        self._by_email.set(user_data["email"], user_data)
+        
+        # The id index only needs to cover cached entries
+        if len(self._email_by_id) > 2 * self._by_email.max_entries:
+            self._email_by_id = {user_id: user_data["email"]}
+    
+    def invalidate(self, email: Optional[str] = None, user_id: Optional[str] = None) -> None:
+        if user_id is not None:
+            email = self._email_by_id.pop(str(user_id), None) or email
+        if email is not None:
+            self._by_email.invalidate(email)
+    
+    def stats(self) -> Dict[str, Any]:
+        return self._by_email.stats()
+
+# Global instance
+user_cache = UserCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
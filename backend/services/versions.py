@@ -0,0 +1,45 @@
+import hashlib
+import time
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+from config.settings import settings
+
+class DataVersions:
+    """
+    Change counters behind the ETags of question listings and analytics.
+
+    Code that writes questions, users or answers bumps the matching counter, so
+    an ETag can be computed, and an If-None-Match answered, without a query.
+    Counters live in this process: writes made by other workers or by scripts
+    are not counted, so every tag also carries the current max_staleness
+    window and changes when the window rolls over. A poll therefore sees
+    outside writes at most max_staleness seconds late; writes made through
+    this worker show up on the next request.
+    """
+
+    def __init__(self, max_staleness: float):
+        self.max_staleness = max_staleness
+        self._versions: Dict[Tuple[str, Optional[Hashable]], int] = {}
+
+    def get(self, namespace: str, key: Optional[Hashable] = None) -> int:
+        return self._versions.get((namespace, key), 0)
+
+    def bump(self, namespace: str, keys: Iterable[Hashable] = ()) -> None:
+        """Record a change to a namespace and to the given keys within it"""
+        self._versions[(namespace, None)] = self.get(namespace) + 1
+        for key in set(keys):
+            self._versions[(namespace, key)] = self.get(namespace, key) + 1
+
+    def etag(self, *scopes: Tuple[str, Optional[Hashable]], variant: Any = ()) -> str:
+        """
+        Strong ETag over the versions of (namespace, key) scopes
+
+        variant holds whatever else selects the representation (query
+        parameters, role), so different pages of one listing get different tags.
+        """
+        window = int(time.time() // self.max_staleness) if self.max_staleness > 0 else 0
+        versions = [(namespace, key, self.get(namespace, key)) for namespace, key in scopes]
+        digest = hashlib.blake2b(repr((versions, variant, window)).encode(), digest_size=16).hexdigest()
+        return f'"{digest}"'
+
+# Global instance
+data_versions = DataVersions(settings.ETAG_MAX_STALENESS_SECONDS)
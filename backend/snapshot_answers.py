@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Append new answers to the columnar answer-history snapshot.
+
+Writes the user_answers rows newer than the snapshot's high-water mark as
+per-month .npy column files, with ids, topics and difficulties dictionary
+encoded (see services/snapshot.py). Run it nightly before model fitting;
+calibrate_items.py --from-snapshot and AnalyticsService.get_history_performance
+then scan the memory-mapped files instead of MongoDB.
+"""
+
+import argparse
+import asyncio
+from database.connection import connection_manager
+from services.analytics import analytics_service
+from services.snapshot import AnswerSnapshot, answer_snapshot
+
+async def main():
+    """Main function to update the snapshot"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dir", help="Snapshot directory (default: ANSWER_SNAPSHOT_DIR)")
+    parser.add_argument("--summary", action="store_true",
+                        help="Print accuracy per topic and difficulty over the whole snapshot")
+    args = parser.parse_args()
+
+    snapshot = answer_snapshot
+    if args.dir:
+        snapshot = AnswerSnapshot(args.dir, answer_snapshot.lag_seconds, answer_snapshot.rows_per_part)
+    try:
+        print(f"Updating answer snapshot in {snapshot.root}...")
+        result = await snapshot.update()
+        print(f"✅ Appended {result['rows']} answers in {result['parts']} part(s); "
+              f"{result['total_rows']} in total up to {result['high_water_mark']}")
+        if args.summary:
+            for row in analytics_service.get_history_performance(snapshot):
+                average_time = f"{row['average_time']:.1f}s" if row["average_time"] is not None else "-"
+                print(f"  {str(row['topic']):<20} {str(row['difficulty']):<8} {row['total_questions']:>10} answers "
+                      f"{row['accuracy']:>7.1%} correct  {average_time:>7}")
+    except Exception as e:
+        print(f"❌ Error updating the snapshot: {e}")
+    finally:
+        await connection_manager.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+# Storage package
+from typing import Optional
+
+from config.settings import settings
+from storage.base import DuplicateKeyError, StorageBackend, StorageCollection
+
+_backend: Optional[StorageBackend] = None
+
+def get_backend() -> StorageBackend:
+    """The configured storage backend (settings.STORAGE_BACKEND), created on first use"""
+    global _backend
+    if _backend is None:
+        if settings.STORAGE_BACKEND == "embedded":
+            from storage.embedded import EmbeddedBackend
+            _backend = EmbeddedBackend(
+                settings.EMBEDDED_DATA_DIR,
+                compaction_threshold=settings.EMBEDDED_COMPACTION_THRESHOLD,
+                compaction_interval=settings.EMBEDDED_COMPACTION_INTERVAL_SECONDS,
+                fsync=settings.EMBEDDED_FSYNC
+            )
+        elif settings.STORAGE_BACKEND == "mongo":
+            from database.connection import db
+            from storage.mongo import MongoBackend
+            _backend = MongoBackend(db)
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND!r}")
+    return _backend
+
+def get_collection(name: str) -> StorageCollection:
+    """Shortcut for get_backend().collection(name)"""
+    return get_backend().collection(name)
+
+__all__ = ["DuplicateKeyError", "StorageBackend", "StorageCollection", "get_backend", "get_collection"]
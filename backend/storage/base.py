@@ -0,0 +1,76 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+Document = Dict[str, Any]
+SortSpec = Sequence[Tuple[str, int]]
+IndexKeys = Union[str, Sequence[Tuple[str, int]]]
+
+class DuplicateKeyError(Exception):
+    """Raised when a write would violate a unique index"""
+
+class StorageCollection(ABC):
+    """
+    The document operations QuestionService and AuthService rely on.
+    
+    Filters, projections and updates use the MongoDB query language; the
+    embedded backend implements the subset listed in storage/embedded.py.
+    Ids are returned as strings, counts as ints, documents as plain dicts.
+    """
+    
+    name: str
+    
+    @abstractmethod
+    async def insert_one(self, document: Document) -> str:
+        """Insert a document and return its id"""
+    
+    @abstractmethod
+    async def insert_many(self, documents: List[Document]) -> List[str]:
+        """Insert documents and return their ids"""
+    
+    @abstractmethod
+    async def find_one(self, filter: Document, projection: Optional[Document] = None) -> Optional[Document]:
+        """Return the first matching document, or None"""
+    
+    @abstractmethod
+    async def find(
+        self,
+        filter: Optional[Document] = None,
+        projection: Optional[Document] = None,
+        sort: Optional[SortSpec] = None,
+        skip: int = 0,
+        limit: int = 0
+    ) -> List[Document]:
+        """Return matching documents (limit=0 means no limit)"""
+    
+    @abstractmethod
+    async def update_one(self, filter: Document, update: Document) -> int:
+        """Apply an update to the first matching document and return the modified count"""
+    
+    @abstractmethod
+    async def delete_one(self, filter: Document) -> int:
+        """Delete the first matching document and return the deleted count"""
+    
+    @abstractmethod
+    async def count_documents(self, filter: Document) -> int:
+        """Count matching documents"""
+    
+    @abstractmethod
+    async def estimated_document_count(self) -> int:
+        """Cheap total count (collection metadata where available)"""
+    
+    @abstractmethod
+    async def create_index(self, keys: IndexKeys, unique: bool = False) -> None:
+        """Declare an index; a no-op if it already exists"""
+
+class StorageBackend(ABC):
+    """Factory for collections plus lifecycle hooks"""
+    
+    @abstractmethod
+    def collection(self, name: str) -> StorageCollection:
+        """Return the collection with this name"""
+    
+    async def start(self) -> None:
+        """Open connections or load data; called once at application startup"""
+    
+    async def close(self) -> None:
+        """Flush and release resources; called at application shutdown"""
@@ -0,0 +1,525 @@
+"""
+Embedded document store for single-node and test deployments.
+
+Each collection lives in memory as a dict keyed by _id, with hash indexes
+mapping field values to ids, so equality/$in lookups on indexed fields are
+O(1) instead of a scan. Durability comes from an append-only write-ahead log
+(<data_dir>/<name>.wal, one JSON record per write) on top of a snapshot
+(<data_dir>/<name>.json, the same JSON array format the old file store
+used). When the log grows past the compaction threshold the snapshot is
+rewritten and the log truncated.
+
+Supported query language (a subset of MongoDB's):
+    filters:  equality (array fields match any element), $eq, $ne, $in, $nin,
+              $gt, $gte, $lt, $lte, $exists, and top-level $and / $or;
+              dotted paths for nested fields
+    updates:  $set, $unset, $inc
+    projections: inclusion or exclusion of top-level fields
+"""
+
+import asyncio
+import copy
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from bson import ObjectId
+
+from storage.base import (
+    Document, DuplicateKeyError, IndexKeys, SortSpec, StorageBackend, StorageCollection
+)
+
+_MISSING = object()
+
+def _encode(value: Any) -> Any:
+    """json default hook: keep datetimes distinguishable from plain strings"""
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _decode(obj: Dict) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+def _upgrade_legacy_dates(document: Document) -> Document:
+    """The old file store wrote *_at datetimes as bare ISO strings; restore them so they sort as dates"""
+    for field, value in document.items():
+        if field.endswith("_at") and isinstance(value, str):
+            try:
+                document[field] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return document
+
+def _get_path(document: Document, path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+def _comparable(value: Any):
+    """Sort key: missing/None first, then by type group, then by value"""
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (2, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, datetime):
+        return (3, value)
+    return (4, str(value))
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if value is _MISSING or value is None or operand is None:
+        return False
+    left, right = _comparable(value), _comparable(operand)
+    if left[0] != right[0]:
+        return False
+    if op == "$gt":
+        return left[1] > right[1]
+    if op == "$gte":
+        return left[1] >= right[1]
+    if op == "$lt":
+        return left[1] < right[1]
+    return left[1] <= right[1]
+
+def _candidates(value: Any) -> List[Any]:
+    """A field value plus, for arrays, each element (Mongo array-matching semantics)"""
+    if isinstance(value, list):
+        return [value, *value]
+    return [value]
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition)):
+        if value is _MISSING:
+            return condition is None
+        return any(candidate == condition for candidate in _candidates(value))
+
+    for op, operand in condition.items():
+        if op == "$eq":
+            matched = _match_condition(value, operand)
+        elif op == "$ne":
+            matched = not _match_condition(value, operand)
+        elif op == "$in":
+            matched = any(_match_condition(value, option) for option in operand)
+        elif op == "$nin":
+            matched = not any(_match_condition(value, option) for option in operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            matched = value is not _MISSING and any(
+                _compare(candidate, op, operand) for candidate in _candidates(value)
+            )
+        elif op == "$exists":
+            matched = (value is not _MISSING) == bool(operand)
+        else:
+            raise ValueError(f"Unsupported query operator for embedded storage: {op}")
+        if not matched:
+            return False
+    return True
+
+def matches(document: Document, filter: Optional[Document]) -> bool:
+    """Evaluate a Mongo-style filter against one document"""
+    for key, condition in (filter or {}).items():
+        if key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported query operator for embedded storage: {key}")
+        elif not _match_condition(_get_path(document, key), condition):
+            return False
+    return True
+
+class HashIndex:
+    """Maps each value of a field (each element, for arrays) to the ids holding it"""
+
+    def __init__(self, field: str, unique: bool = False):
+        self.field = field
+        self.unique = unique
+        self._ids_by_value: Dict[Hashable, Set[str]] = {}
+
+    def _keys(self, document: Document) -> Iterable[Hashable]:
+        value = _get_path(document, self.field)
+        if value is _MISSING:
+            return []
+        values = value if isinstance(value, list) else [value]
+        return [v for v in values if isinstance(v, Hashable)]
+
+    def check(self, document: Document) -> None:
+        if not self.unique:
+            return
+        for key in self._keys(document):
+            holders = self._ids_by_value.get(key, set()) - {document["_id"]}
+            if holders:
+                raise DuplicateKeyError(f"Duplicate value for unique field {self.field!r}: {key!r}")
+
+    def add(self, document: Document) -> None:
+        for key in self._keys(document):
+            self._ids_by_value.setdefault(key, set()).add(document["_id"])
+
+    def remove(self, document: Document) -> None:
+        for key in self._keys(document):
+            holders = self._ids_by_value.get(key)
+            if holders is not None:
+                holders.discard(document["_id"])
+                if not holders:
+                    del self._ids_by_value[key]
+
+    def lookup(self, condition: Any) -> Optional[Set[str]]:
+        """Ids that may match an equality/$in condition, or None if the index can't help"""
+        if isinstance(condition, dict):
+            if set(condition) == {"$eq"}:
+                condition = condition["$eq"]
+            elif set(condition) == {"$in"}:
+                ids: Set[str] = set()
+                for option in condition["$in"]:
+                    if not isinstance(option, Hashable) or isinstance(option, (dict, list)):
+                        return None
+                    ids |= self._ids_by_value.get(option, set())
+                return ids
+            else:
+                return None
+        if isinstance(condition, (dict, list)) or not isinstance(condition, Hashable) or condition is None:
+            return None
+        return set(self._ids_by_value.get(condition, set()))
+
+class EmbeddedCollection(StorageCollection):
+    """One in-memory collection persisted as snapshot + write-ahead log"""
+
+    def __init__(self, name: str, data_dir: str, compaction_threshold: int, fsync: bool = False,
+                 indexes: Iterable = ()):
+        self.name = name
+        self._snapshot_path = os.path.join(data_dir, f"{name}.json")
+        self._wal_path = os.path.join(data_dir, f"{name}.wal")
+        self._compacting_path = self._wal_path + ".compacting"
+        self._compaction_threshold = compaction_threshold
+        self._fsync = fsync
+        self._documents: Dict[str, Document] = {}
+        self._indexes: Dict[str, HashIndex] = {"_id": HashIndex("_id", unique=True)}
+        for field, unique in indexes:
+            self._indexes[field] = HashIndex(field, unique=unique)
+        self._wal = None
+        self._wal_entries = 0
+        self._compaction: Optional[asyncio.Task] = None
+        # Every compaction runs under this lock: two at once would race on the snapshot temp file
+        self._compaction_lock = asyncio.Lock()
+        self._loaded = False
+
+    # Persistence
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="utf-8") as snapshot:
+                for document in json.load(snapshot, object_hook=_decode):
+                    document["_id"] = str(document["_id"])
+                    self._put(_upgrade_legacy_dates(document))
+
+        # A crash mid-compaction leaves the rotated log behind; replaying it is harmless
+        # because every record is a full post-image or a delete
+        for path in (self._compacting_path, self._wal_path):
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as wal:
+                    for line in wal:
+                        if line.strip():
+                            self._replay(json.loads(line, object_hook=_decode))
+                            self._wal_entries += 1
+
+        os.makedirs(os.path.dirname(self._wal_path) or ".", exist_ok=True)
+        self._wal = open(self._wal_path, "a", encoding="utf-8")
+
+    def _replay(self, record: Dict) -> None:
+        if record["op"] == "put":
+            self._put(record["doc"])
+        elif record["op"] == "delete":
+            existing = self._documents.get(record["_id"])
+            if existing is not None:
+                self._remove(existing)
+
+    def _log(self, record: Dict) -> None:
+        self._wal.write(json.dumps(record, default=_encode) + "\n")
+        self._wal.flush()
+        if self._fsync:
+            os.fsync(self._wal.fileno())
+        self._wal_entries += 1
+        if self._wal_entries >= self._compaction_threshold:
+            self.schedule_compaction()
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Log records (or a failed compaction's rotated log) not yet in the snapshot"""
+        return bool(self._wal_entries) or os.path.exists(self._compacting_path)
+
+    def schedule_compaction(self) -> asyncio.Task:
+        """Start a background compaction unless one is already running; returns its task"""
+        if self._compaction is None or self._compaction.done():
+            self._compaction = asyncio.ensure_future(self.compact())
+            self._compaction.add_done_callback(self._compaction_done)
+        return self._compaction
+
+    def _compaction_done(self, task: asyncio.Task) -> None:
+        # A failed compaction loses nothing: its log stays in .compacting for the next one
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️  Compaction of {self.name} failed: {task.exception()}")
+
+    async def compact(self) -> None:
+        """Rewrite the snapshot from memory and drop the log records it covers"""
+        self._ensure_loaded()
+        async with self._compaction_lock:
+            # Rotate the log first so writes made while the snapshot is written land in a fresh
+            # file. A .compacting log left by a failed compaction is not in any snapshot yet, so
+            # the current log is appended to it rather than replacing it.
+            self._wal.close()
+            if os.path.exists(self._wal_path):
+                if os.path.exists(self._compacting_path):
+                    self._append_log(self._wal_path, self._compacting_path)
+                    os.remove(self._wal_path)
+                else:
+                    os.replace(self._wal_path, self._compacting_path)
+            self._wal = open(self._wal_path, "a", encoding="utf-8")
+            self._wal_entries = 0
+
+            # Documents are replaced, never mutated, on update, so a shallow list is a consistent view
+            documents = list(self._documents.values())
+            await asyncio.to_thread(self._write_snapshot, documents)
+            # Only now is every record of the rotated log in a durable snapshot
+            if os.path.exists(self._compacting_path):
+                os.remove(self._compacting_path)
+
+    def _append_log(self, source_path: str, target_path: str) -> None:
+        with open(source_path, "rb") as source, open(target_path, "ab") as target:
+            size = target.tell()
+            try:
+                shutil.copyfileobj(source, target)
+                target.flush()
+                os.fsync(target.fileno())
+            except OSError:
+                # Never leave a torn record in the middle of the log
+                target.truncate(size)
+                raise
+
+    def _write_snapshot(self, documents: List[Document]) -> None:
+        temporary_path = self._snapshot_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as snapshot:
+            json.dump(documents, snapshot, default=_encode, indent=2)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, self._snapshot_path)
+
+    async def close(self) -> None:
+        if not self._loaded:
+            return
+        if self._compaction is not None and not self._compaction.done():
+            await asyncio.wait([self._compaction])
+        if self.needs_compaction:
+            await self.compact()
+        self._wal.close()
+
+    # In-memory state
+
+    def _put(self, document: Document) -> None:
+        existing = self._documents.get(document["_id"])
+        if existing is not None:
+            for index in self._indexes.values():
+                index.remove(existing)
+        self._documents[document["_id"]] = document
+        for index in self._indexes.values():
+            index.add(document)
+
+    def _remove(self, document: Document) -> None:
+        for index in self._indexes.values():
+            index.remove(document)
+        del self._documents[document["_id"]]
+
+    def _check_unique(self, document: Document) -> None:
+        for index in self._indexes.values():
+            index.check(document)
+
+    def _plan(self, filter: Optional[Document]) -> Iterable[Document]:
+        """Narrow the scan with the most selective usable hash index"""
+        best: Optional[Set[str]] = None
+        for field, condition in (filter or {}).items():
+            index = self._indexes.get(field)
+            if index is None:
+                continue
+            ids = index.lookup(condition)
+            if ids is not None and (best is None or len(ids) < len(best)):
+                best = ids
+        if best is None:
+            return list(self._documents.values())
+        return [self._documents[_id] for _id in best if _id in self._documents]
+
+    def _select(self, filter: Optional[Document]) -> List[Document]:
+        return [document for document in self._plan(filter) if matches(document, filter)]
+
+    def _project(self, document: Document, projection: Optional[Document]) -> Document:
+        if not projection:
+            return dict(document)
+        include = {field for field, flag in projection.items() if flag}
+        if include - {"_id"}:
+            projected = {field: document[field] for field in include if field in document}
+            if projection.get("_id", 1) and "_id" in document:
+                projected["_id"] = document["_id"]
+            return projected
+        return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+    # StorageCollection API
+
+    async def insert_one(self, document: Document) -> str:
+        return (await self.insert_many([document]))[0]
+
+    async def insert_many(self, documents: List[Document]) -> List[str]:
+        self._ensure_loaded()
+        inserted = []
+        for document in documents:
+            stored = copy.deepcopy(document)
+            stored["_id"] = str(stored.get("_id") or ObjectId())
+            if stored["_id"] in self._documents:
+                raise DuplicateKeyError(f"Duplicate _id {stored['_id']!r} in {self.name}")
+            self._check_unique(stored)
+            self._put(stored)
+            self._log({"op": "put", "doc": stored})
+            document.setdefault("_id", stored["_id"])
+            inserted.append(stored["_id"])
+        return inserted
+
+    async def find_one(self, filter: Document, projection: Optional[Document] = None) -> Optional[Document]:
+        self._ensure_loaded()
+        for document in self._plan(filter):
+            if matches(document, filter):
+                return self._project(document, projection)
+        return None
+
+    async def find(
+        self,
+        filter: Optional[Document] = None,
+        projection: Optional[Document] = None,
+        sort: Optional[SortSpec] = None,
+        skip: int = 0,
+        limit: int = 0
+    ) -> List[Document]:
+        self._ensure_loaded()
+        documents = self._select(filter)
+        # Stable multi-key sort: apply keys from least to most significant
+        for field, direction in reversed(list(sort or [])):
+            documents.sort(key=lambda document: _comparable(_get_path(document, field)), reverse=direction < 0)
+        documents = documents[skip:skip + limit] if limit else documents[skip:]
+        return [self._project(document, projection) for document in documents]
+
+    async def update_one(self, filter: Document, update: Document) -> int:
+        self._ensure_loaded()
+        current = next((document for document in self._plan(filter) if matches(document, filter)), None)
+        if current is None:
+            return 0
+
+        updated = copy.deepcopy(current)
+        for op, fields in update.items():
+            for path, value in fields.items():
+                *parents, leaf = path.split(".")
+                target = updated
+                for part in parents:
+                    target = target.setdefault(part, {})
+                if op == "$set":
+                    target[leaf] = value
+                elif op == "$unset":
+                    target.pop(leaf, None)
+                elif op == "$inc":
+                    target[leaf] = target.get(leaf, 0) + value
+                else:
+                    raise ValueError(f"Unsupported update operator for embedded storage: {op}")
+
+        if updated == current:
+            return 0
+        updated["_id"] = current["_id"]
+        self._check_unique(updated)
+        self._put(updated)
+        self._log({"op": "put", "doc": updated})
+        return 1
+
+    async def delete_one(self, filter: Document) -> int:
+        self._ensure_loaded()
+        current = next((document for document in self._plan(filter) if matches(document, filter)), None)
+        if current is None:
+            return 0
+        self._remove(current)
+        self._log({"op": "delete", "_id": current["_id"]})
+        return 1
+
+    async def count_documents(self, filter: Document) -> int:
+        self._ensure_loaded()
+        if not filter:
+            return len(self._documents)
+        return len(self._select(filter))
+
+    async def estimated_document_count(self) -> int:
+        self._ensure_loaded()
+        return len(self._documents)
+
+    async def create_index(self, keys: IndexKeys, unique: bool = False) -> None:
+        """Hash indexes are single-field; for compound keys the leading field is indexed"""
+        self._ensure_loaded()
+        field = keys if isinstance(keys, str) else keys[0][0]
+        if field in self._indexes:
+            return
+        index = HashIndex(field, unique=unique)
+        for document in self._documents.values():
+            index.check(document)
+            index.add(document)
+        self._indexes[field] = index
+
+class EmbeddedBackend(StorageBackend):
+    """Embedded storage rooted at a data directory"""
+
+    # Hash indexes every deployment gets without declaring them
+    DEFAULT_INDEXES = {
+        "users": [("email", True)],
+        "questions": [("difficulty", False), ("tags", False), ("topic", False), ("content_hash", True)],
+    }
+
+    def __init__(self, data_dir: str, compaction_threshold: int = 1000, compaction_interval: float = 60.0,
+                 fsync: bool = False):
+        self.data_dir = data_dir
+        self.compaction_threshold = compaction_threshold
+        self.compaction_interval = compaction_interval
+        self.fsync = fsync
+        self._collections: Dict[str, EmbeddedCollection] = {}
+        self._compactor: Optional[asyncio.Task] = None
+
+    def collection(self, name: str) -> EmbeddedCollection:
+        if name not in self._collections:
+            # Loading is deferred to the first operation, so this is safe at import time
+            self._collections[name] = EmbeddedCollection(
+                name, self.data_dir, self.compaction_threshold, self.fsync,
+                indexes=self.DEFAULT_INDEXES.get(name, [])
+            )
+        return self._collections[name]
+
+    async def start(self) -> None:
+        if self._compactor is None and self.compaction_interval > 0:
+            self._compactor = asyncio.create_task(self._compact_periodically())
+
+    async def _compact_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            for collection in list(self._collections.values()):
+                if collection._loaded and collection.needs_compaction:
+                    # Same task as a threshold-triggered compaction, so the two never overlap
+                    await asyncio.wait([collection.schedule_compaction()])
+
+    async def close(self) -> None:
+        if self._compactor is not None:
+            self._compactor.cancel()
+            self._compactor = None
+        for collection in self._collections.values():
+            await collection.close()
@@ -0,0 +1,100 @@
+from typing import List, Optional
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+from storage.base import (
+    Document, DuplicateKeyError, IndexKeys, SortSpec, StorageBackend, StorageCollection
+)
+
+class MongoCollection(StorageCollection):
+    """StorageCollection on top of a Motor collection"""
+    
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+    
+    def _normalize_filter(self, filter: Optional[Document]) -> Document:
+        """Accept string ids (as returned by insert_one) for ObjectId _ids"""
+        filter = dict(filter or {})
+        for operator in ("$and", "$or"):
+            if operator in filter:
+                filter[operator] = [self._normalize_filter(clause) for clause in filter[operator]]
+        if "_id" in filter:
+            filter["_id"] = self._normalize_id(filter["_id"])
+        return filter
+    
+    def _normalize_id(self, value):
+        """Convert a string id, or the operands of an operator like $gt/$in, to ObjectId"""
+        if isinstance(value, str) and ObjectId.is_valid(value):
+            return ObjectId(value)
+        if isinstance(value, list):
+            return [self._normalize_id(item) for item in value]
+        if isinstance(value, dict):
+            return {operator: self._normalize_id(operand) for operator, operand in value.items()}
+        return value
+    
+    async def insert_one(self, document: Document) -> str:
+        try:
+            result = await self._collection.insert_one(document)
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e)) from e
+        return str(result.inserted_id)
+    
+    async def insert_many(self, documents: List[Document]) -> List[str]:
+        try:
+            result = await self._collection.insert_many(documents)
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e)) from e
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+    
+    async def find_one(self, filter: Document, projection: Optional[Document] = None) -> Optional[Document]:
+        return await self._collection.find_one(self._normalize_filter(filter), projection)
+    
+    async def find(
+        self,
+        filter: Optional[Document] = None,
+        projection: Optional[Document] = None,
+        sort: Optional[SortSpec] = None,
+        skip: int = 0,
+        limit: int = 0
+    ) -> List[Document]:
+        cursor = self._collection.find(self._normalize_filter(filter), projection)
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=limit or None)
+    
+    async def update_one(self, filter: Document, update: Document) -> int:
+        try:
+            result = await self._collection.update_one(self._normalize_filter(filter), update)
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e)) from e
+        return result.modified_count
+    
+    async def delete_one(self, filter: Document) -> int:
+        result = await self._collection.delete_one(self._normalize_filter(filter))
+        return result.deleted_count
+    
+    async def count_documents(self, filter: Document) -> int:
+        return await self._collection.count_documents(self._normalize_filter(filter))
+    
+    async def estimated_document_count(self) -> int:
+        return await self._collection.estimated_document_count()
+    
+    async def create_index(self, keys: IndexKeys, unique: bool = False) -> None:
+        await self._collection.create_index(keys, unique=unique)
+
+class MongoBackend(StorageBackend):
+    """Collections of the application's MongoDB database"""
+    
+    def __init__(self, database):
+        self._database = database
+        self._collections = {}
+    
+    def collection(self, name: str) -> MongoCollection:
+        if name not in self._collections:
+            self._collections[name] = MongoCollection(self._database[name])
+        return self._collections[name]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Reader tests for the columnar answer snapshot (services/snapshot.py)
+
+Runs without a server or MongoDB: python test_answer_snapshot.py (or pytest).
+"""
+import json
+import tempfile
+from datetime import datetime, timedelta
+
+from services.snapshot import AnswerSnapshot
+
+def write_snapshot(root: str) -> AnswerSnapshot:
+    """One part of four answers: two on topic "algebra", two with no topic"""
+    snapshot = AnswerSnapshot(root, lag_seconds=0, rows_per_part=100)
+    start = datetime(2026, 1, 1)
+    rows = {
+        "user": [0, 0, 1, 1],
+        "question": [0, 1, 2, 3],
+        "topic": [0, -1, 0, -1],
+        "difficulty": [0, 0, 0, 0],
+        "is_correct": [True, False, True, True],
+        "time_taken": [5, -1, 7, 3],
+        "timestamp": [start + timedelta(minutes=minute) for minute in range(4)],
+    }
+    part = snapshot._write_part("2026-01", "test-0", rows)
+    manifest = {
+        "high_water_mark": part["end"],
+        "rows": part["rows"],
+        "partitions": [part],
+        "dictionaries": {"topic": ["algebra"], "difficulty": ["easy"]},
+    }
+    snapshot._atomic_write("manifest.json", json.dumps(manifest).encode())
+    return snapshot
+
+def test_load_by_topic():
+    """A known topic selects only its own rows"""
+    with tempfile.TemporaryDirectory() as root:
+        snapshot = write_snapshot(root)
+        assert len(snapshot.load()["user"]) == 4
+        assert list(snapshot.load(["question"], topic="algebra")["question"]) == [0, 2]
+
+def test_load_unknown_topic():
+    """A topic the snapshot never saw matches nothing, not the answers without a topic"""
+    with tempfile.TemporaryDirectory() as root:
+        columns = write_snapshot(root).load(["user", "is_correct"], topic="geometry")
+        assert set(columns) == {"user", "is_correct"}
+        assert all(len(values) == 0 for values in columns.values())
+
+if __name__ == "__main__":
+    for test in (test_load_by_topic, test_load_unknown_topic):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Crash-recovery tests for the embedded storage backend (storage/embedded.py)
+
+Runs without a server or MongoDB: python test_embedded_storage.py (or pytest).
+"""
+import asyncio
+import os
+import tempfile
+
+from storage.embedded import EmbeddedBackend, EmbeddedCollection
+
+def reopen(data_dir: str, name: str = "questions") -> EmbeddedCollection:
+    """What a restarted process sees: snapshot plus whatever logs are on disk"""
+    collection = EmbeddedCollection(name, data_dir, compaction_threshold=1000)
+    collection._ensure_loaded()
+    return collection
+
+def test_overlapping_compactions():
+    """Threshold, periodic and explicit compactions at once run one after another"""
+    async def run(data_dir: str):
+        backend = EmbeddedBackend(data_dir, compaction_threshold=5, compaction_interval=0.01)
+        await backend.start()
+        collection = backend.collection("questions")
+        for number in range(200):
+            await collection.insert_one({"number": number})
+            if number % 20 == 0:
+                await asyncio.gather(collection.compact(), collection.compact())
+            await asyncio.sleep(0)
+        await backend.close()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        asyncio.run(run(data_dir))
+        assert sorted(os.listdir(data_dir)) == ["questions.json", "questions.wal"]
+        assert os.path.getsize(os.path.join(data_dir, "questions.wal")) == 0
+        assert len(reopen(data_dir)._documents) == 200
+
+def test_failed_compaction_keeps_rotated_log():
+    """Records rotated out by a failed compaction survive later compactions and a crash"""
+    async def run(data_dir: str):
+        collection = EmbeddedCollection("questions", data_dir, compaction_threshold=1000)
+        await collection.insert_many([{"number": number} for number in range(10)])
+
+        write_snapshot = collection._write_snapshot
+        def fail(documents):
+            raise OSError("disk full")
+        collection._write_snapshot = fail
+        for batch in range(2):
+            try:
+                await collection.compact()
+            except OSError:
+                pass
+            assert os.path.exists(collection._compacting_path)
+            await collection.insert_many([{"number": 10 + 10 * batch + number} for number in range(10)])
+
+        # Crash: nothing reached a snapshot, so both rotated batches must still be on disk
+        assert not os.path.exists(collection._snapshot_path)
+        assert len(reopen(data_dir)._documents) == 30
+
+        collection._write_snapshot = write_snapshot
+        await collection.compact()
+        assert not os.path.exists(collection._compacting_path)
+        await collection.close()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        asyncio.run(run(data_dir))
+        assert sorted(document["number"] for document in reopen(data_dir)._documents.values()) == list(range(30))
+
+def test_close_waits_for_running_compaction():
+    """close() returns only after a background compaction has written its snapshot"""
+    async def run(data_dir: str):
+        collection = EmbeddedCollection("questions", data_dir, compaction_threshold=3)
+        await collection.insert_many([{"number": number} for number in range(3)])
+        task = collection._compaction
+        assert task is not None and collection.schedule_compaction() is task
+        await collection.close()
+        assert task.done()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        asyncio.run(run(data_dir))
+        assert not os.path.exists(os.path.join(data_dir, "questions.wal.compacting"))
+        assert len(reopen(data_dir)._documents) == 3
+
+if __name__ == "__main__":
+    for test in (test_overlapping_compactions, test_failed_compaction_keeps_rotated_log,
+                 test_close_waits_for_running_compaction):
+        test()
+        print(f"✅ {test.__name__}")
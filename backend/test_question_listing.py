@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Answer keys stay out of GET /questions/ for students
+
+Runs without a server or MongoDB, on an embedded collection:
+python test_question_listing.py (or pytest).
+"""
+import asyncio
+import tempfile
+from datetime import datetime
+
+import orjson
+from fastapi import HTTPException
+from starlette.requests import Request
+
+import services.question_service as question_service
+from routes.question import get_questions
+from storage.embedded import EmbeddedCollection
+
+STUDENT = {"role": "student"}
+
+QUESTIONS = [
+    # Quiz format, as seed_data.py and the importer write it
+    {"content": "What is 2 + 2?", "option_a": "3", "option_b": "4", "option_c": "5", "option_d": "6",
+     "correct_option": "B", "explanation": "2 + 2 = 4", "topic": "arithmetic", "difficulty": "easy",
+     "content_hash": "0" * 64},
+    # QuestionService.create_question format
+    {"title": "Capital of France", "content": "Which city is the capital of France?",
+     "question_type": "multiple_choice", "difficulty": "easy", "options": ["London", "Paris"],
+     "correct_answer": "Paris", "explanation": "Paris is the capital of France.", "points": 1, "tags": [],
+     "content_hash": "1" * 64},
+]
+
+def listing(include_answers: bool = False, current_user: dict = STUDENT) -> list:
+    request = Request({"type": "http", "method": "GET", "path": "/questions/", "headers": []})
+    response = asyncio.run(get_questions(
+        request, limit=20, cursor=None, difficulty=None, include_answers=include_answers, current_user=current_user
+    ))
+    return orjson.loads(response.body)["questions"]
+
+def with_questions(test):
+    def run():
+        with tempfile.TemporaryDirectory() as data_dir:
+            collection = EmbeddedCollection("questions", data_dir, compaction_threshold=1000)
+            now = datetime.utcnow()
+            asyncio.run(collection.insert_many([{**question, "created_at": now} for question in QUESTIONS]))
+            original, question_service.questions_collection = question_service.questions_collection, collection
+            try:
+                test()
+            finally:
+                question_service.questions_collection = original
+    run.__name__ = test.__name__
+    run.__doc__ = test.__doc__
+    return run
+
+@with_questions
+def test_student_listing_hides_answers():
+    """Neither answer format nor the internal content_hash reaches a student"""
+    questions = listing()
+    assert len(questions) == 2
+    for question in questions:
+        for field in ("correct_option", "correct_answer", "explanation", "content_hash"):
+            assert field not in question, field
+    assert questions[0]["option_b"] == "4" and questions[1]["options"] == ["London", "Paris"]
+
+@with_questions
+def test_student_cannot_request_answers():
+    """include_answers is for admins and teachers only"""
+    try:
+        listing(include_answers=True)
+    except HTTPException as e:
+        assert e.status_code == 403
+    else:
+        raise AssertionError("expected 403")
+
+@with_questions
+def test_admin_listing_includes_answers():
+    """Admins get both answer formats, but still not content_hash"""
+    questions = listing(include_answers=True, current_user={"role": "admin"})
+    assert questions[0]["correct_option"] == "B" and questions[1]["correct_answer"] == "Paris"
+    assert all("content_hash" not in question for question in questions)
+
+if __name__ == "__main__":
+    for test in (test_student_listing_hides_answers, test_student_cannot_request_answers,
+                 test_admin_listing_includes_answers):
+        test()
+        print(f"✅ {test.__name__}")
@@ -1,10 +1,13 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from config.settings import settings
+from utils.cache import TTLCache
+from utils.password_pool import password_pool
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -12,6 +15,9 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Decoded claims of recently verified tokens, never kept past the token's exp
+token_cache = TTLCache(settings.TOKEN_CACHE_MAX_ENTRIES, settings.TOKEN_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -20,6 +26,14 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt worker pool instead of the event loop"""
+    return await password_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bcrypt worker pool instead of the event loop"""
+    return await password_pool.run(pwd_context.hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -35,6 +49,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token"""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         email: str = payload.get("sub")
@@ -42,12 +60,15 @@ def verify_token(token: str) -> Optional[dict]:
         
         if email is None:
             return None
-            
-        return {"email": email, "role": role}
+        
+        claims = {"email": email, "role": role}
+        if "exp" in payload:
+            token_cache.set(token, claims, ttl_seconds=payload["exp"] - time.time())
+        return dict(claims)
     except JWTError:
         return None
 
-async def get_current_user(token: str = oauth2_scheme) -> dict:
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """Get current user from token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,24 @@
+from typing import Dict, Optional
+from fastapi import Request, Response
+
+def cache_headers(etag: str, cache_control: str) -> Dict[str, str]:
+    """Validator and caching policy sent with both 200 and 304 responses"""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def not_modified(request: Request, etag: str, cache_control: str) -> Optional[Response]:
+    """A 304 when the client already holds this version, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag, cache_control))
+    return None
@@ -0,0 +1,254 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from a fast cache hit to a slow aggregation
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[Dict[str, str], float]
+
+class MetricsRegistry:
+    """
+    Counters and histograms in the Prometheus text format, cheap enough to leave on.
+
+    Every thread that records a value gets its own shard (a plain dict), so the
+    hot path is a dict lookup and an in-place add with no lock; the event loop,
+    the driver's monitoring threads and the bcrypt workers never contend.
+    Shards are summed when /metrics is scraped. Values that already live
+    elsewhere (cache and pool stats) are read at scrape time by collectors.
+    Each uvicorn worker process has its own registry; Prometheus tells the
+    workers apart by instance.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple, List[float]]] = []
+        self._shards_lock = threading.Lock()  # only taken when a thread records its first value
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> "Counter":
+        return self._register(Counter(self, name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> "Histogram":
+        return self._register(Histogram(self, name, help, labels, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+        """Add a callable returning (name, type, help, samples) families at scrape time"""
+        self._collectors.append(collector)
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _shard(self) -> Dict[Tuple, List[float]]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _merged(self) -> Dict[Tuple, List[float]]:
+        """Sum of every thread's shard"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged: Dict[Tuple, List[float]] = {}
+        for shard in shards:
+            # Copying under the GIL is atomic, so a writer can't resize the dict mid-iteration
+            for key, values in list(shard.items()):
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        total[index] += value
+        return merged
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        merged = self._merged()
+        by_metric: Dict[str, List[Tuple[Tuple, List[float]]]] = {}
+        for (name, label_values), values in merged.items():
+            by_metric.setdefault(name, []).append((label_values, values))
+
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for label_values, values in sorted(by_metric.get(name, [])):
+                lines.extend(metric.render(dict(zip(metric.labels, label_values)), values))
+
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, metric_type, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        shard = self.registry._shard()
+        key = (self.name, label_values)
+        values = shard.get(key)
+        if values is None:
+            shard[key] = [amount]
+        else:
+            values[0] += amount
+
+    def render(self, labels: Dict[str, str], values: List[float]) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(values[0])}"]
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Sequence[str],
+                 buckets: Sequence[float]):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one value; stored per bucket (not cumulative) plus sum and count"""
+        shard = self.registry._shard()
+        key = (self.name, label_values)
+        values = shard.get(key)
+        if values is None:
+            values = shard[key] = [0.0] * (len(self.buckets) + 3)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def time(self, *label_values: str) -> "_Timer":
+        return _Timer(self, label_values)
+
+    def render(self, labels: Dict[str, str], values: List[float]) -> List[str]:
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets + (float("inf"),), values):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} "
+                         f"{_format_value(cumulative)}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {_format_value(values[-1])}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram: Histogram, label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started_at, *self.label_values)
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def cache_collector(caches: Dict[str, Callable[[], Dict[str, Any]]]) -> Callable[[], List[Tuple]]:
+    """Collector exporting hits, misses, entries and hit ratio of TTLCache-style stats()"""
+    def collect():
+        stats = {name: read() for name, read in caches.items()}
+        return [
+            ("cache_hits_total", "counter", "Cache lookups that found a live entry",
+             [({"cache": name}, values["hits"]) for name, values in stats.items()]),
+            ("cache_misses_total", "counter", "Cache lookups that missed or found an expired entry",
+             [({"cache": name}, values["misses"]) for name, values in stats.items()]),
+            ("cache_entries", "gauge", "Entries currently cached",
+             [({"cache": name}, values["entries"]) for name, values in stats.items()]),
+            ("cache_hit_ratio", "gauge", "Hits over lookups since the process started",
+             [({"cache": name}, values["hit_ratio"]) for name, values in stats.items()]),
+        ]
+    return collect
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by method, route template and status.
+
+    The route template ("/quiz/{quiz_id}/answer") is read from the scope after
+    routing, so paths with ids don't create a series each; unmatched paths
+    share one label.
+    """
+
+    def __init__(self, app, exclude: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "<unmatched>"
+            http_request_duration.observe(time.perf_counter() - started_at, scope["method"], template)
+            http_requests.inc(scope["method"], template, str(status_code))
+
+# Global instance
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by method, route template and status", ["method", "route", "status"]
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ["method", "route"]
+)
+db_command_duration = metrics.histogram(
+    "db_command_duration_seconds",
+    "MongoDB command latency by operation (the command's comment, or command and collection)",
+    ["operation", "outcome"]
+)
+password_queue_wait = metrics.histogram(
+    "password_hash_queue_wait_seconds", "Time bcrypt calls waited for a worker thread"
+)
+password_hash_time = metrics.histogram(
+    "password_hash_duration_seconds", "Time spent inside bcrypt hash/verify", buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+password_rejected = metrics.counter(
+    "password_hash_rejected_total", "bcrypt calls rejected with 429 because the pool was saturated"
+)
@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+def encode_cursor(created_at: datetime, document_id: Any) -> str:
+    """Opaque continuation token for the (created_at, _id) position of the last item on a page"""
+    payload = json.dumps([created_at.isoformat(), str(document_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    """
+    Inverse of encode_cursor
+    
+    Raises:
+        ValueError: If the token was not produced by encode_cursor
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, document_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(document_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def keyset_filter(cursor: Optional[str], base_filter: Optional[Dict] = None) -> Dict:
+    """
+    Filter for the documents strictly after a cursor in (created_at, _id) order
+    
+    The top-level $gte bounds the index scan on (created_at, _id); the $or breaks
+    ties between documents created in the same instant.
+    """
+    query = dict(base_filter or {})
+    if cursor is None:
+        return query
+    created_at, document_id = decode_cursor(cursor)
+    query["created_at"] = {"$gte": created_at}
+    query["$or"] = [
+        {"created_at": {"$gt": created_at}},
+        {"_id": {"$gt": document_id}}
+    ]
+    return query
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from fastapi import HTTPException, status
+from config.settings import settings
+from utils.metrics import password_hash_time, password_queue_wait, password_rejected
+
+class PasswordHashPool:
+    """
+    Bounded worker pool for bcrypt hashing and verification.
+    
+    bcrypt is deliberately slow (~250ms at cost 12) and would block the event
+    loop if called inline. The C implementation releases the GIL, so a thread
+    pool gives real parallelism without the pickling cost of a process pool.
+    At most max_workers + max_queue calls may be in flight; beyond that the
+    caller gets a 429 instead of queueing without bound.
+    """
+    
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._in_flight = 0  # only touched from the event loop thread
+        
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+    
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run a blocking hash function on the pool, rejecting with 429 when saturated"""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            password_rejected.inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Authentication service is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        
+        self._in_flight += 1
+        enqueued_at = time.perf_counter()
+        
+        def timed_call():
+            started_at = time.perf_counter()
+            result = func(*args)
+            return result, started_at - enqueued_at, time.perf_counter() - started_at
+        
+        try:
+            loop = asyncio.get_running_loop()
+            result, queue_wait, hash_time = await loop.run_in_executor(self._executor, timed_call)
+        finally:
+            self._in_flight -= 1
+        
+        self.completed += 1
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.hash_time_total += hash_time
+        self.hash_time_max = max(self.hash_time_max, hash_time)
+        password_queue_wait.observe(queue_wait)
+        password_hash_time.observe(hash_time)
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Queue wait vs hash time, in milliseconds"""
+        completed = self.completed or 1
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": round(self.queue_wait_total / completed * 1000, 2),
+            "queue_wait_max_ms": round(self.queue_wait_max * 1000, 2),
+            "hash_time_avg_ms": round(self.hash_time_total / completed * 1000, 2),
+            "hash_time_max_ms": round(self.hash_time_max * 1000, 2),
+        }
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+# Global instance
+password_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
@@ -0,0 +1,273 @@
+import asyncio
+import cProfile
+import io
+import itertools
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from starlette.routing import Match
+from config.settings import settings
+
+class _SampledRequest:
+    """Stack samples of one in-flight request, taken by the sampler thread"""
+
+    def __init__(self, task: asyncio.Task, thread_id: int):
+        self.task = task
+        self.thread_id = thread_id
+        self.stacks: Counter = Counter()
+
+class RequestProfiler:
+    """
+    Runtime-switchable profiling of a chosen route.
+
+    Disabled, it costs the middleware one attribute check per request. When
+    configured, sample_rate of the matching requests are profiled either by
+    a sampling profiler (a daemon thread snapshotting the request's stack
+    every interval_ms; cheap, wall-clock, and it shows where a suspended
+    request is awaiting) or by cProfile (deterministic, one request at a time
+    because there is one profiler per thread, and it also sees whatever else
+    ran on the event loop meanwhile). Results go to a bounded ring buffer.
+    Every worker process profiles only its own requests.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.enabled = False
+        self.route: Optional[str] = None
+        self.method: Optional[str] = None
+        self.mode = "sampling"
+        self.sample_rate = 1.0
+        self.interval = 0.005
+        self.profiles: deque = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+        self._active: Dict[int, _SampledRequest] = {}
+        self._sampler: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._cprofile_busy = False
+        self.skipped_busy = 0
+
+    def configure(self, route: str, method: Optional[str] = None, mode: str = "sampling",
+                  sample_rate: float = 1.0, interval_ms: float = 5.0) -> Dict[str, Any]:
+        """Start profiling a route template (e.g. "/auth/login")"""
+        if mode not in ("sampling", "cprofile"):
+            raise ValueError("mode must be 'sampling' or 'cprofile'")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.route = route
+        self.method = method.upper() if method else None
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.interval = max(interval_ms, 1.0) / 1000
+        self.enabled = True
+        return self.status()
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.profiles.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "route": self.route,
+            "method": self.method,
+            "mode": self.mode,
+            "sample_rate": self.sample_rate,
+            "interval_ms": self.interval * 1000,
+            "stored_profiles": len(self.profiles),
+            "buffer_size": self.profiles.maxlen,
+            "skipped_busy": self.skipped_busy
+        }
+
+    def should_profile(self, scope) -> bool:
+        """Whether this request matches the configured route and falls in the sample"""
+        if self.method and scope["method"] != self.method:
+            return False
+        if random.random() >= self.sample_rate:
+            return False
+        return _route_template(scope) == self.route
+
+    async def profile(self, scope, call) -> None:
+        """Run the rest of the ASGI stack under the configured profiler"""
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        if self.mode == "cprofile":
+            if self._cprofile_busy:
+                self.skipped_busy += 1
+                await call()
+                return
+            self._cprofile_busy = True
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await call()
+            finally:
+                profile.disable()
+                self._cprofile_busy = False
+                self._store(scope, started_at, started, stats=profile)
+        else:
+            request = _SampledRequest(asyncio.current_task(), threading.get_ident())
+            self._active[id(request)] = request
+            self._ensure_sampler()
+            try:
+                await call()
+            finally:
+                self._active.pop(id(request), None)
+                self._store(scope, started_at, started, stacks=request.stacks)
+
+    def _store(self, scope, started_at: datetime, started: float, stats: Optional[cProfile.Profile] = None,
+               stacks: Optional[Counter] = None) -> None:
+        entry = {
+            "id": next(self._ids),
+            "route": self.route,
+            "method": scope["method"],
+            "path": scope["path"],
+            "mode": "cprofile" if stats is not None else "sampling",
+            "started_at": started_at,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+        if stats is not None:
+            stats.create_stats()
+            entry["pstats"] = stats.stats
+        else:
+            entry["stacks"] = dict(stacks)
+            entry["samples"] = sum(stacks.values())
+        self.profiles.append(entry)
+
+    def _ensure_sampler(self) -> None:
+        self._wake.set()
+        if self._sampler is None or not self._sampler.is_alive():
+            self._sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        while True:
+            if not self._active:
+                # Sleep until the next sampled request instead of polling; re-check after
+                # clearing so a request registered in between is not missed
+                self._wake.clear()
+                if not self._active:
+                    self._wake.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            for request in list(self._active.values()):
+                stack = _request_stack(request, frames.get(request.thread_id))
+                if stack:
+                    request.stacks[stack] += 1
+
+    def get(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        return next((entry for entry in self.profiles if entry["id"] == profile_id), None)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in entry.items() if key not in ("pstats", "stacks")}
+            for entry in self.profiles
+        ]
+
+    def collapsed(self, profile_id: Optional[int] = None) -> str:
+        """
+        Sampled stacks in the collapsed format ("frame;frame;frame count" per line)
+
+        flamegraph.pl, speedscope and inferno read it directly. Without an id,
+        every sampled profile in the buffer is merged.
+        """
+        entries = [self.get(profile_id)] if profile_id is not None else list(self.profiles)
+        merged: Counter = Counter()
+        for entry in entries:
+            if entry and "stacks" in entry:
+                merged.update(entry["stacks"])
+        return "".join(f"{stack} {count}\n" for stack, count in merged.most_common())
+
+    def pstats_text(self, profile_id: int, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+        entry = self.get(profile_id)
+        if not entry or "pstats" not in entry:
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(_StatsSource(dict(entry["pstats"])), stream=output)
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def pstats_dump(self, profile_id: int) -> Optional[bytes]:
+        """The raw stats in the format of Stats.dump_stats (snakeviz, pstats.Stats(path))"""
+        entry = self.get(profile_id)
+        if not entry or "pstats" not in entry:
+            return None
+        return marshal.dumps(entry["pstats"])
+
+class _StatsSource:
+    """Feeds stored raw stats back into pstats.Stats"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def _route_template(scope) -> Optional[str]:
+    """The path template the router will pick for this request"""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", code.co_filename)
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+def _request_stack(request: _SampledRequest, thread_frame) -> Optional[str]:
+    """
+    Collapsed stack of a request at this instant
+
+    The await chain of the request's task gives its coroutine frames. If the
+    innermost one is on the event loop thread's stack right now, the request is
+    running and the thread's frames below it are appended; otherwise it is
+    suspended and the stack ends in what it awaits.
+    """
+    chain = []
+    awaitable = request.task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        chain.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    if not chain:
+        return None
+
+    running = []
+    frame = thread_frame
+    while frame is not None and frame is not chain[-1]:
+        running.append(frame)
+        frame = frame.f_back
+    names = [_frame_name(frame) for frame in chain]
+    if frame is chain[-1]:
+        names.extend(_frame_name(frame) for frame in reversed(running))
+    else:
+        names.append(f"<await {type(awaitable).__name__}>" if awaitable is not None else "<suspended>")
+    return ";".join(names)
+
+# Global instance
+request_profiler = RequestProfiler(settings.PROFILING_BUFFER_SIZE)
+
+class ProfilingMiddleware:
+    """ASGI middleware handing matching requests to the request profiler"""
+
+    def __init__(self, app):
+        self.app = app
+        self.profiler = request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        await self.profiler.profile(scope, lambda: self.app(scope, receive, send))
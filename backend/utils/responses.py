@@ -0,0 +1,40 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from pydantic import BaseModel
+
+# Non-string dict keys (dates, ints) become strings; numpy scalars/arrays from the
+# grading and recommendation paths serialize without a conversion pass
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(value: Any) -> Any:
+    """Types orjson doesn't serialize natively; datetimes, UUIDs, enums and dataclasses are native"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes the way API responses are serialized"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(_ORJSONResponse):
+    """
+    JSON response rendered by orjson, with ObjectIds as strings.
+
+    The app's default response class. Routes that return one directly skip
+    FastAPI's response_model pass (validation plus jsonable_encoder), so
+    return it only for content built from trusted server-side data; the
+    response_model still documents the shape in OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)